@@ -0,0 +1,79 @@
+"""Cola de animaciones con repeticiones comprimidas (RLE) y prioridades.
+
+Cada entrada es [animación, repeticiones restantes, prioridad]; encolar la
+misma animación varias veces seguidas solo incrementa el contador. Cuando la
+cola se vacía se reproduce en bucle la animación de estado (p. ej. dormir),
+o None para volver a la animación por defecto.
+"""
+
+PRIORITY_NORMAL = 0
+PRIORITY_IMMEDIATE = 1  # Reacciones que se adelantan a todo lo encolado
+
+
+class AnimationQueue:
+    def __init__(self):
+        self.entries = []
+        self.state = ()  # Secuencia de animaciones de estado que se repite en bucle
+        self.state_index = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def push(self, animation_name, repeats=1, priority=PRIORITY_NORMAL):
+        if self.entries:
+            last = self.entries[-1]
+            if last[0] == animation_name and last[2] == priority:
+                last[1] += repeats
+                return
+        self.entries.append([animation_name, repeats, priority])
+
+    def _next_index(self):
+        """Índice de la primera entrada con la prioridad más alta, o -1 si está vacía."""
+        best = -1
+        for i, entry in enumerate(self.entries):
+            if best < 0 or entry[2] > self.entries[best][2]:
+                best = i
+        return best
+
+    def peek(self):
+        """Siguiente animación encolada sin sacarla (None si no hay)."""
+        i = self._next_index()
+        return self.entries[i][0] if i >= 0 else None
+
+    def upcoming(self):
+        """Animación que saldrá después: la siguiente encolada o, con la cola vacía, la de estado."""
+        animation_name = self.peek()
+        if animation_name is None and self.state:
+            animation_name = self.state[self.state_index]
+        return animation_name
+
+    def pop(self):
+        """Saca una repetición de la siguiente animación; None si la cola está vacía."""
+        i = self._next_index()
+        if i < 0:
+            return None
+        entry = self.entries[i]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            self.entries.pop(i)
+        return entry[0]
+
+    def clear(self):
+        self.entries = []
+
+    def set_state(self, animations):
+        """Fija la secuencia de estado que se repite cuando la cola está vacía (() para ninguna)."""
+        self.state = animations
+        self.state_index = 0
+
+    def next_state(self):
+        """Siguiente animación de la secuencia de estado, o None si no hay estado."""
+        if not self.state:
+            return None
+        animation_name = self.state[self.state_index]
+        self.state_index = (self.state_index + 1) % len(self.state)
+        return animation_name
+
+    def is_idle(self, animation_name):
+        """Indica si la animación es de reposo (por defecto o de estado) y puede interrumpirse."""
+        return animation_name == 'default' or animation_name in self.state
@@ -0,0 +1,91 @@
+"""Registro compilado de animaciones.
+
+La configuración de `sprite_sheets` (diccionarios anidados con claves de texto)
+se convierte al arrancar en una lista de tuplas con nombre indexada por id.
+De cada tira se guarda solo el archivo, el tamaño y el número de frames: la
+x de origen de un frame es `frame * ancho`, y solo las animaciones de
+archivos sueltos ('eat') guardan la tupla de archivos. La posición centrada
+y el rectángulo en pantalla se calculan una sola vez, y las cachés buscan
+los frames por un entero (`frame_key`), así que avanzar y dibujar frames no
+compara cadenas ni crea objetos nuevos.
+"""
+try:
+    from collections import namedtuple
+except ImportError:
+    from ucollections import namedtuple
+
+Animation = namedtuple('Animation', (
+    'id', 'name', 'one_shot', 'interval_ms', 'num_frames',
+    'file',     # tira con los frames en fila, o None si cada frame está en su archivo
+    'frames',   # tupla con el archivo de cada frame, o None en las tiras
+    'sheet',    # índice de la tira (la comparten las animaciones con el mismo archivo y tamaño de frame)
+    'rect',     # (x, y, ancho, alto) del frame centrado en pantalla: posición, tamaño y región sucia
+))
+
+
+def frame_key(anim, frame):
+    """Clave entera de un frame para las cachés: la comparten las animaciones con la misma tira."""
+    return (anim.sheet << 8) | frame
+
+
+def frame_file(anim, frame):
+    """Archivo PNG que contiene un frame."""
+    return anim.file if anim.frames is None else anim.frames[frame]
+
+
+def frame_source(anim, frame):
+    """Rectángulo de origen (x, y, w, h) de un frame en su PNG; crea la tupla, así que solo para decodificar."""
+    _, _, w, h = anim.rect
+    return (frame * w if anim.frames is None else 0, 0, w, h)
+
+
+def frame_sources(animations):
+    """Genera (archivo, origen) para cada frame de cada animación, sin repetir."""
+    seen = set()
+    for anim in animations:
+        for i in range(anim.num_frames):
+            frame = (frame_file(anim, i), frame_source(anim, i))
+            if frame not in seen:
+                seen.add(frame)
+                yield frame
+
+
+def _shared(cache, value):
+    return cache.setdefault(value, value)
+
+
+def compile_registry(sprite_sheets, one_shot, assets, width, height, y_offset=25):
+    """Devuelve (lista de Animation por id, diccionario nombre -> id).
+
+    El tamaño de frame que no venga en la configuración se toma de `assets`
+    (el manifiesto: archivo -> (ancho, alto, frames, tamaño, crc32)).
+    """
+    animations = []
+    ids = {}
+    shared = {}  # Rectángulos iguales se comparten entre animaciones
+    sheets = {}  # (archivo o archivos, ancho, alto) -> índice de la tira
+    for name, details in sprite_sheets.items():
+        if details['type'] == 'sprite_sheet':
+            num_frames = details['num_frames']
+            file = details['file']
+            frames = None
+            first = file
+        else:
+            file = None
+            frames = tuple(details['frames'])
+            num_frames = len(frames)
+            first = frames[0]
+        asset = assets.get(first)
+        if asset is None and not ('frame_width' in details and 'frame_height' in details):
+            raise ValueError(f"{first} no está en el manifiesto; ejecuta tools/build_manifest.py")
+        w = details.get('frame_width') or asset[0] // asset[2]
+        h = details.get('frame_height') or asset[1]
+        sheet = sheets.setdefault((file or frames, w, h), len(sheets))
+        x = (width - w) // 2
+        y = (height - h) // 2 + y_offset
+        ids[name] = len(animations)
+        animations.append(Animation(
+            len(animations), name, name in one_shot, 1000 // details['fps'], num_frames,
+            file, frames, sheet, _shared(shared, (x, y, w, h)),
+        ))
+    return animations, ids
@@ -0,0 +1,50 @@
+"""Manifiesto de assets generado por tools/build_manifest.py; no editar a mano."""
+
+# archivo: (ancho, alto, frames, tamaño en bytes, crc32)
+ASSETS = {
+    'pink_bean_default.png': (328, 72, 4, 3633, 0x8e4e6661),
+    'eat/pink_bean_eat-1.png.png': (112, 72, 1, 1923, 0x1e7ab66c),
+    'eat/pink_bean_eat-2.png.png': (112, 72, 1, 1902, 0x63eea20c),
+    'eat/pink_bean_eat-3.png.png': (112, 72, 1, 2421, 0x8db02dad),
+    'eat/pink_bean_eat-4.png.png': (112, 72, 1, 2256, 0xad3d9414),
+    'eat/pink_bean_eat-5.png.png': (112, 72, 1, 2052, 0x965b37da),
+    'eat/pink_bean_eat-6.png.png': (112, 72, 1, 2058, 0x1c108a1e),
+    'eat/pink_bean_eat-7.png.png': (112, 72, 1, 1866, 0x30993be7),
+    'eat/pink_bean_eat-8.png.png': (112, 72, 1, 1914, 0x56d92bb3),
+    'eat/pink_bean_eat-9.png.png': (112, 72, 1, 1878, 0x28f1a70a),
+    'eat/pink_bean_eat-10.png.png': (112, 72, 1, 1896, 0x8abadd75),
+    'eat/pink_bean_eat-11.png.png': (112, 72, 1, 1926, 0x9ec371a8),
+    'eat/pink_bean_eat-12.png.png': (112, 72, 1, 1923, 0x02cdacb2),
+    'eat/pink_bean_eat-13.png.png': (112, 72, 1, 1983, 0x73e99ec1),
+    'eat/pink_bean_eat-14.png.png': (112, 72, 1, 2031, 0x1edf093d),
+    'eat/pink_bean_eat-15.png.png': (112, 72, 1, 1995, 0x711d1ff1),
+    'eat/pink_bean_eat-16.png.png': (112, 72, 1, 1923, 0xc42896dc),
+    'pink_bean_ass.png': (112, 70, 2, 2397, 0x1a178cca),
+    'pink_bean_drunk.png': (468, 84, 6, 4254, 0x89eac5b5),
+    'pink_bean_talk.png': (344, 80, 4, 3915, 0x4bf6e0a0),
+    'pink_bean_angry_1.png': (472, 96, 4, 10110, 0x9904a6ec),
+    'pink_bean_angry_2.png': (472, 96, 4, 10268, 0x2bd27676),
+    'pink_bean_sleeping_1.png': (456, 64, 4, 9461, 0x0545a783),
+    'pink_bean_sleeping_2.png': (456, 64, 4, 8894, 0x62b55981),
+    'pink_bean_love_1.png': (624, 74, 4, 6945, 0xe286aa2b),
+    'pink_bean_love_2.png': (624, 74, 4, 8400, 0x2cf716e2),
+    'pink_bean_guitar_1.png': (390, 86, 3, 10181, 0xfbf81569),
+    'pink_bean_guitar_2.png': (389, 86, 3, 11694, 0xb37d6163),
+    'pink_bean_guitar_3.png': (391, 86, 3, 10702, 0x909444c3),
+    'pink_bean_guitar_4.png': (391, 86, 3, 10701, 0x2268789c),
+    'pink_bean_guitar_5.png': (391, 86, 3, 10359, 0x82a14582),
+    'pink_bean_guitar_6.png': (389, 86, 3, 11188, 0x1d462ccb),
+    'pink_bean_guitar_7.png': (391, 86, 3, 8264, 0x7c8c6ad0),
+    'pink_bean_happy2.png': (196, 72, 2, 3663, 0x40bc0b83),
+    'food.png': (24, 24, 1, 1347, 0xc477618a),
+    'food_s.png': (24, 24, 1, 3084, 0xaca93c4f),
+    'clear.png': (24, 24, 1, 1369, 0xea5748ce),
+    'clear_s.png': (24, 24, 1, 3189, 0x72954049),
+    'meter.png': (24, 24, 1, 1372, 0xe6e1e1f5),
+    'meter_s.png': (24, 24, 1, 3401, 0xb19e8ea2),
+    'game.png': (24, 24, 1, 1369, 0x8bb05bde),
+    'game_s.png': (24, 24, 1, 3088, 0x3cad0245),
+    'health.png': (24, 24, 1, 1385, 0x7f41e5c8),
+    'health_s.png': (24, 24, 1, 2633, 0x91e3f0a8),
+    'poop.png': (31, 29, 1, 9004, 0x31e551ee),
+}
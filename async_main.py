@@ -0,0 +1,129 @@
+"""Bucle principal con uasyncio: tareas separadas para dibujar, leer botones y mantenimiento.
+
+- render: dibuja al ritmo de la animación actual (o antes si se pulsa un botón), sin
+  pasar del periodo que fija el gestor de energía (power.py) para el estado actual
+- input: procesa las pulsaciones en cuanto la interrupción del botón lo señala (o cada
+  INPUT_PERIOD_MS si se leen los pines sin interrupciones)
+- housekeeping: fin del sueño, aparición de 'poop.png' y guardado del estado cada HOUSEKEEPING_PERIOD_MS
+- stats: bajada de estadísticas cada Menu.STATS_PERIOD_MS, en lugar del machine.Timer
+
+En el dispositivo: `import async_main; async_main.run()` desde main.py.
+En el host funciona con asyncio de CPython y los sustitutos de tools/host
+(ver tools/run_async.py).
+"""
+import time
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+if hasattr(asyncio, 'ThreadSafeFlag'):
+    ThreadSafeFlag = asyncio.ThreadSafeFlag
+else:
+    class ThreadSafeFlag(asyncio.Event):
+        """Sustituto en CPython: en el host las interrupciones se simulan en el mismo hilo."""
+
+        async def wait(self):
+            await super().wait()
+            self.clear()  # Como ThreadSafeFlag, se desactiva al despertar
+
+from frame_clock import FrameClock
+from menu import Menu
+from power import PowerGovernor
+
+INPUT_PERIOD_MS = 20
+HOUSEKEEPING_PERIOD_MS = 1000
+
+
+def sleep_ms(ms):
+    return asyncio.sleep(ms / 1000)
+
+
+async def render_task(menu, redraw, governor):
+    clock = governor.clock  # Solo se usan el periodo, la función de dormir y el tiempo dormido
+    while True:
+        handled = redraw.is_set()  # input_task ha procesado una pulsación desde el último frame
+        redraw.clear()
+        menu.draw_menu()
+        governor.update(handled)  # Ajusta clock.period_ms, clock.sleep y la retroiluminación
+        # Esperar hasta el siguiente frame de la animación o hasta una pulsación
+        wait = menu.frame_interval - time.ticks_diff(time.ticks_ms(), menu.last_frame_time)
+        if menu.prefetch(wait):  # Precargar la siguiente animación en el tiempo libre
+            wait = menu.frame_interval - time.ticks_diff(time.ticks_ms(), menu.last_frame_time)
+        menu.collect_garbage(wait)  # Recoger basura solo en el tiempo libre hasta el siguiente frame
+        wait = max(clock.period_ms, wait)
+        t0 = time.ticks_ms()
+        if clock.sleep is not None:
+            # lightsleep para todo el chip, también las demás tareas; en 'sleeping' no hay nada que hacer
+            clock.sleep(wait)
+            await asyncio.sleep(0)  # Dejar correr las demás tareas antes del siguiente frame
+        else:
+            try:
+                await asyncio.wait_for(redraw.wait(), wait / 1000)
+            except asyncio.TimeoutError:
+                pass
+        clock.slept_ms += time.ticks_diff(time.ticks_ms(), t0)
+
+
+async def input_task(menu, redraw):
+    events = menu.button_events
+    if events is None:
+        # Sin interrupciones no hay nada que esperar: se leen los pines periódicamente
+        while True:
+            if menu.navigate():
+                redraw.set()
+            await sleep_ms(INPUT_PERIOD_MS)
+    events.flag = ThreadSafeFlag()
+    while True:
+        # Primero la cola: las pulsaciones llegadas antes de esperar no se pierden
+        if menu.navigate():
+            redraw.set()
+        await events.flag.wait()
+
+
+async def housekeeping_task(menu):
+    while True:
+        menu.check_sleep_status()  # Verificar el estado de sueño
+        menu.update_poop()         # Verificar y actualizar la aparición de 'poop.png'
+        if menu.state_log is not None:
+            menu.state_log.update(menu)  # Guardar el estado si ha cambiado (agrupando escrituras)
+        if menu.profiler is not None:
+            menu.profiler.poll_serial()  # Comando `p` por el puerto serie: volcar el perfil
+        await sleep_ms(HOUSEKEEPING_PERIOD_MS)
+
+
+async def stats_task(menu):
+    while True:
+        await sleep_ms(menu.STATS_PERIOD_MS)
+        menu.decrease_stats(None)
+
+
+async def main(menu=None, duration_ms=None):
+    """Arranca las tareas. Con `duration_ms` se detienen pasado ese tiempo (para pruebas)."""
+    if menu is None:
+        menu = Menu(use_timer=False)
+    redraw = asyncio.Event()
+    governor = PowerGovernor(menu, FrameClock(menu.TARGET_FPS))  # Fps, retroiluminación y lightsleep según el estado
+    tasks = [
+        asyncio.create_task(render_task(menu, redraw, governor)),
+        asyncio.create_task(input_task(menu, redraw)),
+        asyncio.create_task(housekeeping_task(menu)),
+        asyncio.create_task(stats_task(menu)),
+    ]
+    if duration_ms is None:
+        await tasks[0]
+    else:
+        await sleep_ms(duration_ms)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return menu
+
+
+def run():
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,85 @@
+"""Atlas de sprites: todos los frames e iconos empaquetados en un solo archivo.
+
+Formato (little-endian), generado por tools/build_atlas.py:
+
+    cabecera  '<4sHH'   magic b'ATL1', número de entradas, bytes de la tabla de nombres
+    índice    '<IIHHH'  por entrada: offset, tamaño, ancho, alto, x de origen en el PNG original
+    nombres   archivo PNG original de cada entrada, separados por '\\n'
+    datos     un PNG independiente por frame (las entradas idénticas comparten offset)
+
+Cada entrada se identifica por (archivo original, x de origen), y tras
+`add_keys` también por la clave entera de `frame_key` (frames) o por el
+nombre del archivo (iconos), que es lo que buscan las cachés. El archivo se mantiene abierto y cada
+frame se lee con un `seek` + `readinto` en un buffer reutilizado, a través
+de una vista de su tamaño creada al cargar el índice.
+"""
+import struct
+
+from anim_registry import frame_file, frame_key, frame_source
+
+ATLAS_MAGIC = b'ATL1'
+HEADER_FORMAT = '<4sHH'
+ENTRY_FORMAT = '<IIHHH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+
+
+class Atlas:
+    MAGIC = ATLAS_MAGIC
+
+    def __init__(self, path, png):
+        self.png = png
+        self.file = open(path, 'rb')
+        magic, count, names_size = struct.unpack(HEADER_FORMAT, self.file.read(HEADER_SIZE))
+        if magic != self.MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} no es un archivo {self.MAGIC.decode()} válido")
+        table = self.file.read(count * ENTRY_SIZE)
+        names = self.file.read(names_size).decode().split('\n')
+
+        entries = []
+        max_size = 0
+        for i in range(count):
+            entries.append(struct.unpack_from(ENTRY_FORMAT, table, i * ENTRY_SIZE))
+            max_size = max(max_size, entries[-1][1])
+        self.buffer = bytearray(max_size)
+        self.view = memoryview(self.buffer)
+
+        # (archivo, x de origen) -> (offset, tamaño, ancho, alto, vista del buffer de ese tamaño)
+        self.index = {}
+        views = {}  # Una vista por tamaño distinto: leer un frame no crea objetos
+        for i, (offset, size, width, height, source_x) in enumerate(entries):
+            if size not in views:
+                views[size] = self.view[:size]
+            self.index[(names[i], source_x)] = (offset, size, width, height, views[size])
+        self.keys = {}  # frame_key o nombre del icono -> la misma entrada del índice
+
+    def add_keys(self, animations, names=()):
+        """Indexa las entradas de los frames de `animations` y de las imágenes `names` por su clave de caché."""
+        for anim in animations:
+            for i in range(anim.num_frames):
+                entry = self.index.get((frame_file(anim, i), frame_source(anim, i)[0]))
+                if entry is not None:
+                    self.keys[frame_key(anim, i)] = entry
+        for name in names:
+            entry = self.index.get((name, 0))
+            if entry is not None:
+                self.keys[name] = entry
+
+    def open(self, filename, source=None):
+        """Carga un frame en `pngdec` desde el atlas.
+
+        Devuelve el rectángulo de origen a usar con `decode`, o None si el
+        frame no está en el atlas.
+        """
+        entry = self.index.get((filename, source[0] if source else 0))
+        if entry is None:
+            return None
+        offset, _, width, height, data = entry
+        self.file.seek(offset)
+        self.file.readinto(data)
+        self.png.open_RAM(data)
+        return (0, 0, width, height)
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,44 @@
+"""Capa de fondo compuesta: copia del framebuffer con las partes estáticas de una pantalla."""
+
+
+class BackgroundLayer:
+    def __init__(self, display):
+        self.display = display
+        self.fb = memoryview(display)
+        self.WIDTH, self.HEIGHT = display.get_bounds()
+        # Se reserva al arrancar para no fragmentar la memoria más tarde
+        self.buffer = bytearray(len(self.fb))
+        self.view = memoryview(self.buffer)
+        self.key = None
+        self.rebuilds = 0
+
+    def update(self, key, build):
+        """Reconstruye la capa con `build()` si `key` ha cambiado.
+
+        `build` dibuja el fondo en el framebuffer, que se copia a la capa.
+        Devuelve True si se ha reconstruido: en ese caso el framebuffer ya
+        contiene el fondo.
+        """
+        if key == self.key:
+            return False
+        build()
+        self.buffer[:] = self.fb
+        self.key = key
+        self.rebuilds += 1
+        return True
+
+    def restore(self):
+        """Copia la capa completa al framebuffer."""
+        self.fb[:] = self.buffer
+
+    def restore_rect(self, x, y, w, h):
+        """Copia una región (ya recortada a la pantalla) de la capa al framebuffer."""
+        stride = self.WIDTH * 2
+        start = y * stride + x * 2
+        row_bytes = w * 2
+        for _ in range(h):
+            self.fb[start:start + row_bytes] = self.view[start:start + row_bytes]
+            start += stride
+
+    def invalidate(self):
+        self.key = None
@@ -0,0 +1,67 @@
+"""Pulsaciones de botones por interrupción con una cola circular sin asignaciones de memoria."""
+import time
+from array import array
+from machine import Pin
+
+
+class ButtonEvents:
+    SIZE = 16  # Capacidad de la cola (potencia de dos)
+
+    def __init__(self, buttons, debounce_ms):
+        self.names = tuple(buttons)
+        self.debounce_ms = debounce_ms
+        # Cola circular preasignada: índice del botón y ticks_ms de cada pulsación
+        self.buttons = array('B', bytes(self.SIZE))
+        self.times = array('i', [0] * self.SIZE)
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0  # Pulsaciones perdidas con la cola llena
+        # ticks_ms del último flanco (de bajada o de subida) de cada botón
+        start = time.ticks_add(time.ticks_ms(), -debounce_ms)
+        self.last_edge = array('i', [start] * len(self.names))
+        self.time = 0  # ticks_ms de la última pulsación devuelta por get()
+        # Opcional: bandera (asyncio.ThreadSafeFlag) que se activa con cada pulsación encolada,
+        # para que la tarea de entrada de async_main espere en lugar de consultar la cola
+        self.flag = None
+        for i, name in enumerate(self.names):
+            buttons[name].irq(handler=self._make_handler(i), trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _make_handler(self, index):
+        def handler(pin):
+            self.push(index, pin.value())
+        return handler
+
+    def push(self, index, level=0):
+        """Registra un flanco del botón y encola una pulsación si es válida.
+
+        Se ejecuta en la interrupción: no asigna memoria. Solo cuenta como
+        pulsación un flanco de bajada (`level` 0, pull-up) con la línea estable
+        en alto durante `debounce_ms`: los rebotes al pulsar y al soltar caen
+        dentro de ese tiempo desde el flanco anterior y se descartan.
+        """
+        now = time.ticks_ms()
+        stable = time.ticks_diff(now, self.last_edge[index]) >= self.debounce_ms
+        self.last_edge[index] = now
+        if level or not stable:
+            return
+        head = (self.head + 1) & (self.SIZE - 1)
+        if head == self.tail:
+            self.dropped += 1
+            return
+        self.buttons[self.head] = index
+        self.times[self.head] = now
+        self.head = head
+        if self.flag is not None:
+            self.flag.set()
+
+    def pending(self):
+        return self.head != self.tail
+
+    def get(self):
+        """Devuelve el nombre del siguiente botón pulsado, o None si no hay pulsaciones."""
+        if self.head == self.tail:
+            return None
+        index = self.buttons[self.tail]
+        self.time = self.times[self.tail]
+        self.tail = (self.tail + 1) & (self.SIZE - 1)
+        return self.names[index]
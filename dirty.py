@@ -0,0 +1,83 @@
+"""Seguimiento de regiones sucias para redibujar y enviar solo lo que cambia."""
+
+UNSET = object()  # Clave de un elemento que aún no se ha dibujado
+
+
+def overlaps(a, b):
+    """Indica si dos rectángulos (x, y, w, h) se solapan."""
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class DirtyRegions:
+    MAX_RECTS = 6  # Con más rectángulos se fusionan en uno que los englobe
+
+    def __init__(self, width, height, slots):
+        self.WIDTH = width
+        self.HEIGHT = height
+        self.rects = []  # Lista de (x, y, w, h) recortados a la pantalla
+        # Por cada elemento (índice de ranura): clave de estado y rectángulo del último dibujo.
+        # Se actualizan en su sitio, así que comparar un frame no crea objetos
+        self.keys = [UNSET] * slots
+        self.drawn = [None] * slots
+        self.invalidate()
+
+    def add(self, x, y, w, h):
+        """Marca una región como sucia, fusionándola con las que solapa."""
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.WIDTH, x + w)
+        y1 = min(self.HEIGHT, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        merged = True
+        while merged:
+            merged = False
+            for r in self.rects:
+                if x0 <= r[0] + r[2] and r[0] <= x1 and y0 <= r[1] + r[3] and r[1] <= y1:
+                    x0 = min(x0, r[0])
+                    y0 = min(y0, r[1])
+                    x1 = max(x1, r[0] + r[2])
+                    y1 = max(y1, r[1] + r[3])
+                    self.rects.remove(r)
+                    merged = True
+                    break
+        self.rects.append((x0, y0, x1 - x0, y1 - y0))
+        if len(self.rects) > self.MAX_RECTS:
+            x0 = min(r[0] for r in self.rects)
+            y0 = min(r[1] for r in self.rects)
+            x1 = max(r[0] + r[2] for r in self.rects)
+            y1 = max(r[1] + r[3] for r in self.rects)
+            self.rects = [(x0, y0, x1 - x0, y1 - y0)]
+
+    def track(self, slot, key, rect):
+        """Compara el estado del elemento de la ranura `slot` con el último dibujado.
+
+        Si la clave cambia, se marcan sucias la región anterior y la nueva.
+        `rect` es None cuando el elemento no se dibuja.
+        """
+        previous = self.keys[slot]
+        if previous is not UNSET and previous == key:
+            return
+        drawn = self.drawn[slot]
+        if previous is not UNSET and drawn is not None:
+            self.add(*drawn)
+        if rect is not None:
+            self.add(*rect)
+        self.keys[slot] = key
+        self.drawn[slot] = rect
+
+    def intersects(self, rect):
+        for r in self.rects:
+            if overlaps(rect, r):
+                return True
+        return False
+
+    def invalidate(self):
+        """Marca toda la pantalla como sucia y olvida el estado de los elementos."""
+        self.rects = [(0, 0, self.WIDTH, self.HEIGHT)]
+        for i in range(len(self.keys)):
+            self.keys[i] = UNSET
+            self.drawn[i] = None
+
+    def reset(self):
+        del self.rects[:]  # Vaciar sin crear otra lista
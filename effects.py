@@ -0,0 +1,94 @@
+"""Tabla de efectos: qué hace cada acción sobre las estadísticas, descrito como datos.
+
+Las cuatro estadísticas viven en un `array('f')` con el mismo orden que el
+log de estado (hambre, sueño, felicidad, salud). Cada acción es un `Effect`
+con su vector de incrementos, las estadísticas que la bloquean si ya pasan
+de LIMIT, los mensajes y las animaciones que encola. `compile_effects`
+convierte la tabla legible en vectores una sola vez al importar, así que
+aplicar una acción es un bucle sobre cuatro floats, sin diccionarios ni
+cadenas nuevas; añadir una opción a un menú es añadir una fila.
+"""
+from array import array
+from collections import namedtuple
+
+HUNGER = 0
+SLEEP = 1
+HAPPINESS = 2
+HEALTH = 3
+STAT_NAMES = ('hambre', 'sueno', 'felicidad', 'salud')
+STAT_MAX = 100
+LIMIT = 90  # Una acción se rechaza si alguna estadística que sube ya pasa de aquí
+
+# option: texto del menú; action: clave en el limitador de frecuencia;
+# deltas: array('f') con un incremento por estadística; limited: índices que
+# se comprueban contra LIMIT; animations: ((nombre, repeticiones), ...);
+# cooldown: tiempo de espera que se consulta antes de aplicarla (o None)
+Effect = namedtuple('Effect', ('option', 'action', 'deltas', 'limited', 'message', 'rejected',
+                               'animations', 'cooldown'))
+
+
+def effect(option, deltas, message, animations=(), rejected=None, action=None, cooldown=None):
+    """Crea un Effect a partir de `deltas` por nombre de estadística; las que suben son las limitadas."""
+    vector = array('f', [0] * len(STAT_NAMES))
+    for name, delta in deltas.items():
+        vector[STAT_NAMES.index(name)] = delta
+    limited = tuple(i for i in range(len(STAT_NAMES)) if vector[i] > 0)
+    return Effect(option, action, vector, limited, message, rejected, tuple(animations), cooldown)
+
+
+def compile_effects(menus):
+    """Convierte {menú: (rechazo, ((opción, deltas, mensaje, animaciones, cooldown), ...))} en tuplas de Effect."""
+    compiled = {}
+    for menu, (rejected, rows) in menus.items():
+        compiled[menu] = tuple(effect(option, deltas, message, animations, rejected,
+                                      f'{menu}_{option}', cooldown)
+                               for option, deltas, message, animations, cooldown in rows)
+    return compiled
+
+
+EFFECTS = compile_effects({
+    'food': ("Too full! Can't eat more", (
+        ('Coffee', {'hambre': 5, 'felicidad': 10, 'sueno': 5, 'salud': -2},
+         "Hunger +5 Happy +10 Sleep +5", (('happy2', 3),), None),
+        ('Tofu', {'hambre': 30, 'felicidad': 5, 'salud': 5},
+         "Hunger +30 Happy +5 Health +5", (('eat', 1),), None),
+        ('Moscow Mule', {'hambre': 10, 'felicidad': 20, 'salud': -10},
+         "Hunger +10 Happy +20 Health -10", (('drunk', 2),), None),
+    )),
+    'entertainment': ("Too happy! Need rest", (
+        ('Play Deftones', {'felicidad': 20}, "Happy +20",
+         tuple((f'guitar_{i}', 1) for i in range(1, 8)), None),
+        ('Read Book', {'felicidad': 10}, "Happy +10", (), None),
+        ('Go Festival', {'felicidad': 50}, "Happy +50", (), 'festival'),
+    )),
+    'health': ("Too healthy! No need", (
+        ('A hug', {'salud': 10, 'felicidad': 15}, "Health +10 Happy +15",
+         (('love_1', 1), ('love_2', 1), ('love_1', 1), ('love_2', 1)), None),
+        ('Ibuprofeno', {'salud': 30}, "Health +30", (('talk', 2),), 'ibuprofen'),
+    )),
+})
+
+# Acciones fuera de los menús de opciones (sin límite ni registro de frecuencia)
+CLEAR = effect('Clear', {'salud': 10, 'felicidad': 5}, "Health +10 Happy +5",
+               (('angry_1', 2), ('angry_2', 2)))
+NAP = effect('A nap', {'sueno': 20}, "Sleep +20")
+SLEEP_NIGHT = effect('Go to sleep', {'sueno': 60}, "Sleep +60")
+
+
+def apply_deltas(stats, deltas):
+    """Suma el vector de incrementos a las estadísticas, recortando a [0, STAT_MAX]."""
+    for i in range(len(stats)):
+        value = stats[i] + deltas[i]
+        if value < 0:
+            value = 0
+        elif value > STAT_MAX:
+            value = STAT_MAX
+        stats[i] = value
+
+
+def over_limit(stats, limited):
+    """Indica si alguna de las estadísticas `limited` ya pasa de LIMIT."""
+    for i in limited:
+        if stats[i] > LIMIT:
+            return True
+    return False
@@ -0,0 +1,216 @@
+"""Envío del frame al display desde el segundo núcleo del RP2040 (`_thread`), con doble buffer.
+
+El núcleo 0 compone siempre en el framebuffer de PicoGraphics (el buffer
+trasero, que conserva el frame anterior para el redibujado por regiones).
+Al terminar un frame, `submit()` espera a que el núcleo 1 haya acabado el
+envío anterior, copia el framebuffer al buffer delantero y avisa al núcleo 1,
+que lo envía por SPI mientras el núcleo 0 sigue con la entrada, la
+animación y la decodificación del frame siguiente.
+
+La sincronización son dos cerrojos usados como semáforos: `ready` (hay un
+frame en el buffer delantero) e `idle` (el núcleo 1 ha terminado de
+enviarlo). El núcleo 1 solo toca el buffer delantero y el SPI, nunca el
+estado de `Menu`.
+
+El envío no puede pasar por `display.update()`: ese método lee el
+framebuffer que el núcleo 0 está modificando. `st7789_sender` escribe el
+buffer delantero directamente en la RAM del panel, que PicoGraphics ya ha
+configurado (ventana, orientación y formato RGB565) al arrancar.
+
+`st7789_window_sender` envía desde el núcleo 0 solo una región del
+framebuffer: fija la ventana del panel a la región (CASET/RASET), escribe
+sus filas (RAMWR) y devuelve la ventana a la pantalla completa, que es la
+que espera `display.update()`. Es el envío por regiones de `Menu.flush`
+(PARTIAL_UPDATE); el `partial_update()` del driver ST7789 de serie no hace
+nada.
+
+El SPI0 es el mismo bus que usa el driver de PicoGraphics: mientras el
+núcleo 1 envía, nada en el núcleo 0 puede llamar a `display.update()` ni
+enviar regiones, o las dos transferencias se mezclarían en el bus. `Menu`
+lo garantiza enviando todos los frames por `Menu.flush`, que con el envío en
+el núcleo 1 solo llama a `submit()` (y desactiva PARTIAL_UPDATE). Después de
+`close()` el bus vuelve a quedar libre para el driver.
+
+El buffer delantero ocupa lo mismo que el framebuffer (64 KB), tanto como la
+capa de fondo de background.py: en el heap del RP2040 no caben los dos, así
+que `Menu` no crea la capa de fondo con el envío en el núcleo 1, y si no hay
+memoria para el buffer (MemoryError) envía desde el núcleo 0.
+"""
+import sys
+import time
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+# Pines del Pico Display (SPI0)
+PICO_DISPLAY_PINS = {'spi': 0, 'sck': 18, 'mosi': 19, 'cs': 17, 'dc': 16}
+# Posición de la pantalla de 240x135 dentro de la RAM del ST7789 (columnas, filas), la de PicoGraphics
+PICO_DISPLAY_OFFSET = (40, 52)
+CASET = b'\x2a'  # Comando del ST7789: columnas de la ventana
+RASET = b'\x2b'  # Comando del ST7789: filas de la ventana
+RAMWR = b'\x2c'  # Comando del ST7789: escribir en la memoria de imagen
+CHUNK_BYTES = 4096  # Buffer donde se juntan las filas de una región más estrecha que la pantalla
+
+
+if sys.implementation.name == 'micropython':
+    import micropython
+
+    @micropython.viper
+    def copy_rows(dst, src, fb_w: int, x: int, y: int, w: int, rows: int):
+        """Copia `rows` filas de `w` píxeles desde (x, y) del framebuffer, seguidas, en `dst`."""
+        d = ptr16(dst)  # noqa: F821 (tipos de viper)
+        s = ptr16(src)  # noqa: F821
+        o = 0
+        for row in range(rows):
+            p = (y + row) * fb_w + x
+            end = p + w
+            while p < end:
+                d[o] = s[p]
+                o += 1
+                p += 1
+else:
+    def copy_rows(dst, src, fb_w, x, y, w, rows):
+        """Copia `rows` filas de `w` píxeles desde (x, y) del framebuffer, seguidas, en `dst` (host)."""
+        row_bytes = w * 2
+        for row in range(rows):
+            p = ((y + row) * fb_w + x) * 2
+            dst[row * row_bytes:(row + 1) * row_bytes] = src[p:p + row_bytes]
+
+
+def st7789_bus(baudrate, pins):
+    """Reconfigura el SPI0 del driver de PicoGraphics con los mismos pines; devuelve (spi, cs, dc)."""
+    from machine import Pin, SPI
+    spi = SPI(pins['spi'], baudrate=baudrate, sck=Pin(pins['sck']), mosi=Pin(pins['mosi']))
+    cs = Pin(pins['cs'], Pin.OUT, value=1)
+    dc = Pin(pins['dc'], Pin.OUT, value=1)
+    return spi, cs, dc
+
+
+def st7789_sender(baudrate=62_500_000, pins=PICO_DISPLAY_PINS):
+    """Devuelve `send(buffer)`, que escribe un frame completo en el panel por SPI.
+
+    Usa el bus con la misma velocidad que el driver; solo puede usarse
+    mientras el núcleo 0 no actualice el display (ver la cabecera del módulo).
+    """
+    spi, cs, dc = st7789_bus(baudrate, pins)
+
+    def send(buffer):
+        cs(0)
+        dc(0)
+        spi.write(RAMWR)
+        dc(1)
+        spi.write(buffer)
+        cs(1)
+    return send
+
+
+def st7789_window_sender(display, baudrate=62_500_000, pins=PICO_DISPLAY_PINS, offset=PICO_DISPLAY_OFFSET):
+    """Devuelve `send_rect(x, y, w, h)`, que escribe una región del framebuffer en el panel por SPI.
+
+    Las regiones del ancho de la pantalla son filas seguidas del framebuffer
+    y se envían tal cual; las demás se copian por bloques a un buffer de
+    CHUNK_BYTES reservado aquí. Solo crea la vista de cada bloque enviado.
+    """
+    spi, cs, dc = st7789_bus(baudrate, pins)
+    fb = memoryview(display)
+    width, height = display.get_bounds()
+    stride = width * 2
+    x_offset, y_offset = offset
+    window = bytearray(4)
+    chunk = bytearray(CHUNK_BYTES)
+    chunk_view = memoryview(chunk)
+
+    def command(cmd, start, end):
+        window[0] = start >> 8
+        window[1] = start & 0xFF
+        window[2] = end >> 8
+        window[3] = end & 0xFF
+        dc(0)
+        spi.write(cmd)
+        dc(1)
+        spi.write(window)
+
+    def set_window(x, y, w, h):
+        command(CASET, x_offset + x, x_offset + x + w - 1)
+        command(RASET, y_offset + y, y_offset + y + h - 1)
+
+    def send_rect(x, y, w, h):
+        cs(0)
+        set_window(x, y, w, h)
+        dc(0)
+        spi.write(RAMWR)
+        dc(1)
+        if w == width:
+            spi.write(fb[y * stride:(y + h) * stride])
+        else:
+            row_bytes = w * 2
+            rows = CHUNK_BYTES // row_bytes
+            while h > 0:
+                n = min(rows, h)
+                copy_rows(chunk, fb, width, x, y, w, n)
+                spi.write(chunk_view[:n * row_bytes])
+                y += n
+                h -= n
+        set_window(0, 0, width, height)  # display.update() escribe sin fijar la ventana
+        cs(1)
+    return send_rect
+
+
+class DualCoreFlush:
+    def __init__(self, display, send, start_thread=None):
+        self.fb = memoryview(display)
+        self.front = bytearray(len(self.fb))  # Antes de arrancar el hilo: un MemoryError no deja nada a medias
+        self.send = send
+        self.ready = _thread.allocate_lock()
+        self.ready.acquire()  # Bloqueado hasta que haya un frame que enviar
+        self.idle = _thread.allocate_lock()
+        self.running = True
+        # Sondas de tiempo (µs acumulados): espera y copia en el núcleo 0, envío en el núcleo 1
+        self.frames = 0
+        self.wait_us = 0
+        self.copy_us = 0
+        self.send_us = 0
+        (start_thread or _thread.start_new_thread)(self.run, ())
+
+    def run(self):
+        """Bucle del núcleo 1: espera un frame, lo envía y se queda libre."""
+        while True:
+            self.ready.acquire()
+            if not self.running:
+                self.idle.release()
+                return
+            t0 = time.ticks_us()
+            self.send(self.front)
+            self.send_us += time.ticks_diff(time.ticks_us(), t0)
+            self.frames += 1
+            self.idle.release()
+
+    def submit(self):
+        """Entrega el frame compuesto al núcleo 1; solo espera si aún está enviando el anterior."""
+        t0 = time.ticks_us()
+        self.idle.acquire()
+        t1 = time.ticks_us()
+        self.front[:] = self.fb
+        self.wait_us += time.ticks_diff(t1, t0)
+        self.copy_us += time.ticks_diff(time.ticks_us(), t1)
+        self.ready.release()
+
+    def wait(self):
+        """Espera a que termine el envío en curso (p. ej. antes de apagar la pantalla)."""
+        self.idle.acquire()
+        self.idle.release()
+
+    def close(self):
+        """Detiene el bucle del núcleo 1 después del envío en curso."""
+        self.idle.acquire()
+        self.running = False
+        self.ready.release()
+        self.idle.acquire()  # El núcleo 1 lo libera al salir
+        self.idle.release()
+
+    def report(self):
+        frames = max(1, self.frames)
+        return [f"flush 2 núcleos: {self.frames} frames, espera {self.wait_us // frames} us, "
+                f"copia {self.copy_us // frames} us, envío {self.send_us // frames} us"]
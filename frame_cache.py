@@ -0,0 +1,260 @@
+"""Caché de frames decodificados en RGB565 con máscara de transparencia.
+
+Cada frame (archivo + rectángulo de origen) se decodifica una sola vez con
+`pngdec` y se guarda como un bloque RGB565 crudo más una máscara de 1 bit por
+píxel. Los frames siguientes se copian directamente al framebuffer de
+PicoGraphics sin volver a descomprimir el PNG.
+
+La clave es el frame y no la animación (el entero de `frame_key`, o el
+nombre del archivo en los iconos), así que las animaciones que usan el mismo
+archivo ('hug' y 'ass') comparten entradas, y los frames con el mismo
+contenido en archivos u orígenes distintos comparten los bytes. Dibujar un
+frame que ya está en la caché no crea objetos. Las entradas
+se descartan por orden de uso (LRU) al superar el presupuesto de bytes o
+cuando `gc.mem_free()` baja del umbral `min_free`.
+"""
+import gc
+import struct
+
+import micropython  # En el host, el sustituto de tools/host (decoradores identidad)
+
+CACHE_MAGIC = b'FC'
+HEADER_FORMAT = '<2sHH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+def cache_name(filename, source):
+    """Nombre del archivo de caché precalculado para un frame."""
+    return '{}_{}_{}.fc'.format(filename.replace('/', '_'), source[0], source[1])
+
+
+def entry_size(w, h):
+    """Bytes que ocupa un frame en la caché: RGB565 más la máscara de 1 bit por píxel."""
+    return w * h * 2 + (w * h + 7) // 8
+
+
+@micropython.native  # Decorador literal: el compilador solo emite código nativo con este nombre
+def blit(fb, fb_w, fb_h, x, y, w, h, pixels, mask):
+    """Copia los píxeles opacos de un frame al framebuffer, recortando a los bordes."""
+    for row in range(h):
+        py = y + row
+        if py < 0 or py >= fb_h:
+            continue
+        for col in range(w):
+            px = x + col
+            if px < 0 or px >= fb_w:
+                continue
+            i = row * w + col
+            if mask[i >> 3] & (1 << (i & 7)):
+                o = (py * fb_w + px) << 1
+                fb[o] = pixels[i << 1]
+                fb[o + 1] = pixels[(i << 1) + 1]
+
+
+class FrameCache:
+    # Colores clave para detectar transparencia: un píxel es opaco si queda igual
+    # al decodificar sobre ambos fondos
+    KEY_A = (255, 0, 255)
+    KEY_B = (0, 255, 0)
+
+    def __init__(self, display, png, open_png=None, max_bytes=18 * 1024, cache_dir=None, min_free=0):
+        self.display = display
+        self.png = png
+        # Función que abre un frame en `png` y devuelve el origen a decodificar
+        self.open_png = open_png or self._open_file
+        self.fb = memoryview(display)
+        self.WIDTH, self.HEIGHT = display.get_bounds()
+        self.key_a = display.create_pen(*self.KEY_A)
+        self.key_b = display.create_pen(*self.KEY_B)
+        self.max_bytes = max_bytes
+        self.min_free = min_free
+        self.cache_dir = cache_dir
+        self.entries = {}  # clave del frame -> (ancho, alto, píxeles, máscara)
+        self.order = []    # Claves de la menos a la más recientemente usada
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared = 0  # Frames nuevos cuyo contenido ya estaba en la caché
+
+    def _open_file(self, filename, source):
+        self.png.open_file(filename)
+        return source
+
+    def draw(self, key, x, y):
+        """Dibuja un frame desde la caché. Devuelve False si no está (se cuenta como fallo)."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False
+        self.hits += 1
+        if self.order[-1] != key:
+            self.order.remove(key)
+            self.order.append(key)
+        w, h, pixels, mask = entry
+        blit(self.fb, self.WIDTH, self.HEIGHT, x, y, w, h, pixels, mask)
+        return True
+
+    def admit(self, key, filename, source, x, y):
+        """Captura un frame que no estaba en la caché, lo guarda con `key` y lo dibuja.
+
+        Devuelve False si no se puede capturar: hay que decodificarlo a mano.
+        """
+        try:
+            entry = self.fetch(filename, source)
+        except MemoryError:
+            self.clear()
+            return False
+        if entry is None:
+            return False
+        self.store(key, entry)
+        w, h, pixels, mask = entry
+        blit(self.fb, self.WIDTH, self.HEIGHT, x, y, w, h, pixels, mask)
+        return True
+
+    def fits(self, size):
+        """Indica si `size` bytes de frames (los de una animación) caben a la vez en el presupuesto.
+
+        Si no caben, recorrer la animación en bucle descartaría cada frame (LRU)
+        antes de volver a usarlo: capturarlos solo costaría decodificaciones.
+        """
+        return size <= self.max_bytes
+
+    def fetch(self, filename, source):
+        """Carga o captura un frame sin guardarlo en la caché (None si no cabe en pantalla)."""
+        entry = self.load(filename, source)
+        if entry is None:
+            entry = self.capture(filename, source)
+        return entry
+
+    def store(self, key, entry):
+        for other in self.entries.values():
+            if other[:2] == entry[:2] and other[2] == entry[2] and other[3] == entry[3]:
+                # Mismo contenido con otra clave: se comparte la entrada sin gastar bytes
+                self.entries[key] = other
+                self.order.append(key)
+                self.shared += 1
+                return
+        size = entry_size(entry[0], entry[1])
+        while self.order and self.bytes_used + size > self.max_bytes:
+            self.evict()
+        self.entries[key] = entry
+        self.order.append(key)
+        self.bytes_used += size
+        self.shed()
+
+    def evict(self):
+        """Descarta la entrada usada hace más tiempo; sus bytes se liberan si ninguna otra clave la comparte."""
+        entry = self.entries.pop(self.order.pop(0))
+        self.evictions += 1
+        for other in self.entries.values():
+            if other is entry:
+                return
+        self.bytes_used -= len(entry[2]) + len(entry[3])
+
+    def shed(self):
+        """Descarta entradas (LRU) hasta que `gc.mem_free()` vuelva a superar `min_free`.
+
+        `Menu` lo llama después de cada recolección en el tiempo libre del frame,
+        y `store` después de añadir un frame.
+        """
+        if not self.min_free or not hasattr(gc, 'mem_free') or gc.mem_free() >= self.min_free:
+            return 0
+        gc.collect()  # Sin recoger, mem_free() no cuenta la basura pendiente
+        deficit = self.min_free - gc.mem_free()
+        if deficit <= 0:
+            return 0
+        target = max(0, self.bytes_used - deficit)
+        shed = 0
+        while self.order and self.bytes_used > target:
+            self.evict()
+            shed += 1
+        gc.collect()
+        return shed
+
+    def clear(self):
+        self.entries = {}
+        self.order = []
+        self.bytes_used = 0
+        gc.collect()
+
+    def report(self):
+        lookups = max(1, self.hits + self.misses)
+        return [f"caché de frames: {len(self.entries)} frames, {self.bytes_used} de {self.max_bytes} bytes, "
+                f"aciertos {self.hits * 100 // lookups}% ({self.hits}/{lookups}), "
+                f"descartes {self.evictions}, compartidos {self.shared}"]
+
+    def load(self, filename, source):
+        """Carga un frame precalculado por el conversor offline, si existe."""
+        if self.cache_dir is None:
+            return None
+        try:
+            f = open(self.cache_dir + '/' + cache_name(filename, source or (0, 0)), 'rb')
+        except OSError:
+            return None
+        with f:
+            magic, w, h = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            if magic != CACHE_MAGIC:
+                return None
+            pixels = bytearray(f.read(w * h * 2))
+            mask = bytearray(f.read((w * h + 7) // 8))
+        return w, h, pixels, mask
+
+    def capture(self, filename, source):
+        """Decodifica un frame en la esquina superior izquierda y lo copia a RAM.
+
+        La región del framebuffer usada se guarda antes y se restaura después,
+        así que se puede llamar en mitad de un frame. Sin `source` (iconos) se
+        captura la imagen completa.
+        """
+        decode_source = self.open_png(filename, source)
+        if source is None:
+            source = decode_source or (0, 0, self.png.get_width(), self.png.get_height())
+        _, _, w, h = source
+        if w > self.WIDTH or h > self.HEIGHT:
+            return None
+        fb = self.fb
+        row_bytes = w * 2
+        stride = self.WIDTH * 2
+        saved = bytearray(row_bytes * h)
+        pixels = bytearray(row_bytes * h)
+        mask = bytearray((w * h + 7) // 8)
+        for row in range(h):
+            saved[row * row_bytes:(row + 1) * row_bytes] = fb[row * stride:row * stride + row_bytes]
+
+        # Primera pasada sobre KEY_A: se guardan los píxeles
+        self.display.set_pen(self.key_a)
+        self.display.rectangle(0, 0, w, h)
+        self.png.decode(0, 0, source=decode_source)
+        for row in range(h):
+            pixels[row * row_bytes:(row + 1) * row_bytes] = fb[row * stride:row * stride + row_bytes]
+
+        # Segunda pasada sobre KEY_B: los píxeles que no cambian son opacos
+        self.display.set_pen(self.key_b)
+        self.display.rectangle(0, 0, w, h)
+        self.png.decode(0, 0, source=decode_source)
+        for row in range(h):
+            o = row * stride
+            p = row * row_bytes
+            for col in range(w):
+                if fb[o] == pixels[p] and fb[o + 1] == pixels[p + 1]:
+                    i = row * w + col
+                    mask[i >> 3] |= 1 << (i & 7)
+                o += 2
+                p += 2
+
+        for row in range(h):
+            fb[row * stride:row * stride + row_bytes] = saved[row * row_bytes:(row + 1) * row_bytes]
+        return w, h, pixels, mask
+
+    def save(self, filename, source, path):
+        """Escribe un frame capturado en el formato del conversor offline."""
+        entry = self.capture(filename, source)
+        if entry is None:
+            return 0
+        w, h, pixels, mask = entry
+        with open(path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, CACHE_MAGIC, w, h))
+            f.write(pixels)
+            f.write(mask)
+        return HEADER_SIZE + len(pixels) + len(mask)
@@ -0,0 +1,69 @@
+"""Reloj de frames en milisegundos basado en `time.ticks_ms`.
+
+Toda la aritmética usa `ticks_diff`/`ticks_add`, así que sigue siendo correcta
+cuando el contador de ticks da la vuelta.
+"""
+import time
+
+try:
+    from machine import Timer, idle
+except ImportError:
+    Timer = None
+
+
+def frames_due(last_tick, interval_ms, now):
+    """Número de frames de `interval_ms` transcurridos desde `last_tick`."""
+    elapsed = time.ticks_diff(now, last_tick)
+    if elapsed < interval_ms:
+        return 0
+    return elapsed // interval_ms
+
+
+class FrameClock:
+    def __init__(self, fps=20):
+        self.period_ms = 1000 // fps
+        self.next_tick = time.ticks_add(time.ticks_ms(), self.period_ms)
+        self.late_frames = 0  # Frames que terminaron después de su plazo
+        self.slept_ms = 0  # Tiempo total dormido en wait()
+        # Si no es None, función para dormir el resto del frame de una vez sin que las
+        # pulsaciones lo corten; el gestor de energía pone aquí lightsleep
+        self.sleep = None
+        # Alarma del final del frame para salir de machine.idle(); el callback se crea una vez
+        self.alarm = Timer() if Timer is not None else None
+        self.alarm_callback = self.on_alarm
+
+    def remaining_ms(self):
+        """Milisegundos que faltan para el siguiente frame (negativo si vamos tarde)."""
+        return time.ticks_diff(self.next_tick, time.ticks_ms())
+
+    def on_alarm(self, timer):
+        pass  # Solo interesa la interrupción, que saca a wait() de machine.idle()
+
+    def wait(self, wake=None):
+        """Duerme lo que quede del periodo descontando lo que ha tardado el frame.
+
+        Si se pasa `wake` y devuelve True (p. ej. hay pulsaciones pendientes) se
+        vuelve antes de tiempo sin mover el plazo del siguiente frame. Se duerme
+        con machine.idle() hasta la siguiente interrupción: la alarma del final
+        del frame o la del botón, que deja la pulsación en la cola que mira `wake`.
+        """
+        remaining = self.remaining_ms()
+        if remaining <= 0:
+            # Frame retrasado: no se intenta recuperar el tiempo perdido con frames
+            # seguidos; las animaciones ya saltan frames según el tiempo real
+            self.late_frames += 1
+            self.next_tick = time.ticks_add(time.ticks_ms(), self.period_ms)
+            return
+        start = time.ticks_ms()
+        if self.sleep is not None:
+            self.sleep(remaining)
+        elif wake is None or self.alarm is None:
+            time.sleep_ms(remaining)
+        else:
+            self.alarm.init(mode=Timer.ONE_SHOT, period=remaining, callback=self.alarm_callback)
+            while not wake() and self.remaining_ms() > 0:
+                idle()
+            self.alarm.deinit()
+        self.slept_ms += time.ticks_diff(time.ticks_ms(), start)
+        if self.remaining_ms() <= 0:
+            self.next_tick = time.ticks_add(self.next_tick, self.period_ms)
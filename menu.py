@@ -1,18 +1,285 @@
 import time
 import gc
+import os
 import random  # Importar el módulo random para generar tiempos aleatorios
+from array import array
 from picographics import PicoGraphics, DISPLAY_PICO_DISPLAY, PEN_RGB565
 from machine import Pin, Timer
 from pngdec import PNG
+from frame_cache import FrameCache, entry_size
+from prefetch import Prefetcher
+from text_cache import TextCache
+from screens import default_screens, REDRAW_ALL
+from rate_limit import RateLimiter
+from effects import HUNGER, SLEEP, HAPPINESS, HEALTH, LIMIT, CLEAR, apply_deltas
+import pet_model
+from atlas import Atlas
+from sprite_rle import RleSprites
+from dirty import DirtyRegions, overlaps
+from background import BackgroundLayer
+from frame_clock import FrameClock, frames_due
+from buttons import ButtonEvents
+from power import PowerGovernor
+from anim_registry import compile_registry, frame_file, frame_key, frame_source
+from anim_queue import AnimationQueue, PRIORITY_IMMEDIATE, PRIORITY_NORMAL
+from state_log import StateLog
+from flush import DualCoreFlush, st7789_sender, st7789_window_sender, _thread
+from profiler import FrameProfiler, STAGE_PET, STAGE_ICONS, STAGE_TEXT, STAGE_UPDATE, STAGE_GC
+
+try:
+    from asset_manifest import ASSETS
+except ImportError:
+    print("Falta asset_manifest.py; ejecuta tools/build_manifest.py")
+    ASSETS = {}
+
+# Ranuras de DirtyRegions de los elementos de la pantalla principal; los iconos van a partir de SLOT_ICONS
+SLOT_PET = 0
+SLOT_POOP = 1
+SLOT_STATUS = 2
+SLOT_PROFILE = 3
+SLOT_ICONS = 4
+
+
+def sprite_sheet_config():
+    """Configuración de las animaciones del murciélago.
+
+    Menu la compila en registros compactos (anim_registry) y no guarda el diccionario.
+    El tamaño de cada frame sale del manifiesto de assets (ancho de la tira /
+    'num_frames'); 'frame_width' y 'frame_height' solo se indican para forzarlo.
+    """
+    return {
+        'default': {
+            'type': 'sprite_sheet',
+            'fps': 6,
+            'file': 'pink_bean_default.png',
+            'num_frames': 4
+        },
+        'eat': {
+            'type': 'frames',
+            'fps': 12,
+            'frames': [
+                'eat/pink_bean_eat-1.png.png',
+                'eat/pink_bean_eat-2.png.png',
+                'eat/pink_bean_eat-3.png.png',
+                'eat/pink_bean_eat-4.png.png',
+                'eat/pink_bean_eat-5.png.png',
+                'eat/pink_bean_eat-6.png.png',
+                'eat/pink_bean_eat-7.png.png',
+                'eat/pink_bean_eat-8.png.png',
+                'eat/pink_bean_eat-9.png.png',
+                'eat/pink_bean_eat-10.png.png',
+                'eat/pink_bean_eat-11.png.png',
+                'eat/pink_bean_eat-12.png.png',
+                'eat/pink_bean_eat-13.png.png',
+                'eat/pink_bean_eat-14.png.png',
+                'eat/pink_bean_eat-15.png.png',
+                'eat/pink_bean_eat-16.png.png'
+            ]
+        },
+        'hug': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_ass.png',
+            'num_frames': 2
+        },
+        'drunk': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_drunk.png',
+            'num_frames': 6
+        },
+        'talk': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_talk.png',
+            'num_frames': 4
+        },
+        'angry_1': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_angry_1.png',
+            'num_frames': 4
+        },
+        'angry_2': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_angry_2.png',
+            'num_frames': 4
+        },
+        'sleep_1': {  # Nueva animación agregada
+            'type': 'sprite_sheet',
+            'fps': 3,
+            'file': 'pink_bean_sleeping_1.png',
+            'num_frames': 4      # Ajusta según tus PNG
+        },
+        'sleep_2': {  # Nueva animación agregada
+            'type': 'sprite_sheet',
+            'fps': 3,
+            'file': 'pink_bean_sleeping_2.png',
+            'num_frames': 4      # Ajusta según tus PNG
+        },
+        'love_1': {  # Nueva animación agregada
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_love_1.png',
+            'num_frames': 4,
+            'frame_height': 64  # Recorta las 10 filas inferiores de la tira (74 px)
+        },
+        'love_2': {  # Nueva animación agregada
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_love_2.png',
+            'num_frames': 4,
+            'frame_height': 64  # Recorta las 10 filas inferiores de la tira (74 px)
+        },
+        # Nuevas animaciones para Play Deftones
+        'guitar_1': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_1.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_2': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_2.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_3': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_3.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_4': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_4.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_5': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_5.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_6': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_6.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        'guitar_7': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_guitar_7.png',
+            'num_frames': 3,
+            'frame_width': 130  # Igual en las 7 tiras (389-391 px) para que no se desplace
+        },
+        # Nuevos sprite sheets agregados
+        'ass': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_ass.png',
+            'num_frames': 2
+        },
+        'happy2': {
+            'type': 'sprite_sheet',
+            'fps': 8,
+            'file': 'pink_bean_happy2.png',
+            'num_frames': 2,
+        }
+    }
+
+
+def file_crc32(filename, chunk_size=1024):
+    """CRC32 de un archivo leído por bloques, para compararlo con el manifiesto."""
+    import binascii
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    crc = 0
+    with open(filename, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                return crc
+            crc = binascii.crc32(view[:n], crc)
+
 
 class Menu:
     DEBOUNCE_TIME = 200  # Tiempo de debounce en milisegundos
-
-    def __init__(self):
+    USE_BUTTON_IRQ = True  # Pulsaciones por interrupción; si es False se leen los pines en cada frame
+    TARGET_FPS = 20  # Frecuencia del bucle principal
+    STATS_PERIOD_MS = 60000  # Cada cuánto bajan las estadísticas
+    # Iconos de la pantalla principal: (normal, seleccionado)
+    ICONS = (
+        ("food.png", "food_s.png"),
+        ("sleep.png", "sleep_s.png"),
+        ("clear.png", "clear_s.png"),
+        ("meter.png", "meter_s.png"),
+        ("game.png", "game_s.png"),
+        ("health.png", "health_s.png")
+    )
+    POOP_IMAGE = 'poop.png'
+    PERSIST_STATE = True  # Guardar el estado de la mascota en flash y restaurarlo al arrancar
+    STATE_FILE = 'state.log'
+    PROFILER = True  # Perfilador de frames; se activa con el combo oculto (X tres veces)
+    PROFILE_RECT = (24, 0, 192, 75)  # Superposición con los tiempos por etapa y de los cambios de animación
+    VERIFY_CHECKSUMS = False  # Al arrancar, comprobar también el CRC32 de cada PNG (lento)
+    # Animaciones que se reproducen una vez y dan paso a la siguiente de la cola; el resto hacen looping
+    ONE_SHOT_ANIMATIONS = (
+        'eat', 'eat_1', 'eat_2', 'eat_3', 'eat_4',
+        'hug', 'drunk', 'sleep_1', 'sleep_2', 'talk',
+        'angry_1', 'angry_2', 'love_1', 'love_2',
+        'guitar_1', 'guitar_2', 'guitar_3', 'guitar_4',
+        'guitar_5', 'guitar_6', 'guitar_7',
+        'ass', 'happy2'  # Añadido para las nuevas animaciones
+    )
+    USE_FRAME_CACHE = True  # Copiar frames pre-decodificados en lugar de decodificar el PNG cada frame
+    FRAME_CACHE_DIR = 'cache'  # Frames generados por tools/build_frame_cache.py
+    # Frames e iconos decodificados: 32 KB en total. Es lo que deja el heap (~190 KB) tras el framebuffer
+    # (64 KB), BackgroundLayer (64 KB, o en su lugar el buffer delantero de DUAL_CORE_FLUSH) y la caché
+    # de textos, con margen para el resto del programa.
+    # - FRAME_CACHE_BYTES: los iconos (24x24, ~1.2 KB cada uno) y las animaciones que caben enteras
+    #   ('ass' y 'hug', ~16 KB); el resto se decodifica en cada frame sin pasar por la caché.
+    # - PREFETCH_BYTES: el primer frame de la siguiente animación de la cola si ocupa hasta 14 KB
+    #   ('default', 'drunk', 'ass', 'hug'); al empezarla pasa a la caché de frames.
+    FRAME_CACHE_BYTES = 18 * 1024  # Presupuesto de la caché de frames e iconos decodificados (LRU)
+    FRAME_CACHE_MIN_FREE = 16 * 1024  # Si gc.mem_free() baja de aquí, la caché de frames suelta entradas
+    USE_PREFETCH = True  # Decodificar en el tiempo libre los primeros frames de la siguiente animación de la cola
+    PREFETCH_BYTES = 14 * 1024  # Presupuesto del área de espera de la precarga
+    PREFETCH_IDLE_MS = 10  # Tiempo libre mínimo del frame para precargar
+    ATLAS_FILE = 'sprites.atlas'  # Atlas generado por tools/build_atlas.py
+    RLE_FILE = 'sprites.rle'  # Sprites RLE generados por tools/build_rle.py; se dibujan sin pngdec
+    USE_TEXT_CACHE = True  # Copiar textos ya rasterizados en lugar de dibujarlos con display.text
+    TEXT_CACHE_BYTES = 6 * 1024  # Presupuesto de la caché de textos (máscaras de 1 bit por píxel)
+    USE_BACKGROUND_CACHE = True  # Guardar el fondo estático de cada pantalla en lugar de redibujarlo
+    PARTIAL_UPDATE = True  # Enviar solo las regiones sucias con una ventana del ST7789 (flush.st7789_window_sender)
+    DUAL_CORE_FLUSH = False  # Enviar el frame desde el núcleo 1 mientras el núcleo 0 compone el siguiente (flush.py)
+    ICON_SIZE = 24  # Tamaño de los iconos principales en píxeles
+    # Recolección de basura: en lugar de gc.collect() en cada frame, se recoge en el tiempo
+    # libre del frame cuando se ha asignado GC_BUDGET desde la última vez; gc.threshold es el respaldo
+    GC_BUDGET = 8 * 1024
+    GC_THRESHOLD = 24 * 1024
+    GC_IDLE_MS = 8  # Tiempo libre mínimo del frame para recoger
+    # Las reglas de la mascota (bajada, acciones, sueño, caca) están en pet_model, compartidas con las simulaciones del host
+    SELECTION_LIMIT = pet_model.SELECTION_LIMIT
+    COOLDOWNS = pet_model.COOLDOWNS
+    LIMITER_ACTIONS = 16  # Acciones distintas que caben en el limitador (opciones de menú y tiempos de espera)
+
+    def __init__(self, use_timer=True):
         # Status message variables
         self.status_message = None
-        self.message_start_time = 0
-        self.MESSAGE_DURATION = 5  # Duration in seconds
+        self.status_expires = 0  # ticks_ms en que desaparece el mensaje
+        self.MESSAGE_DURATION = 5000  # Duration in milliseconds
+        self.status_lines = ()  # Líneas (texto, x, y) del mensaje, calculadas una vez al mostrarlo
+        self.status_rect = None
         
         # Inicialización de los botones
         self.buttons = {
@@ -28,6 +295,8 @@ class Menu:
             'x': 0,
             'y': 0
         }
+        # Cola de pulsaciones alimentada por las interrupciones de los pines
+        self.button_events = ButtonEvents(self.buttons, self.DEBOUNCE_TIME) if self.USE_BUTTON_IRQ else None
 
         # Configuración del display
         self.display = PicoGraphics(display=DISPLAY_PICO_DISPLAY, pen_type=PEN_RGB565, rotate=0)
@@ -36,6 +305,27 @@ class Menu:
         # Inicialización del gestor de PNG
         self.png = PNG(self.display)
 
+        # Atlas de sprites empaquetado; si no existe se usan los PNG sueltos
+        try:
+            self.atlas = Atlas(self.ATLAS_FILE, self.png)
+        except OSError:
+            self.atlas = None
+        try:
+            self.sprites = RleSprites(self.RLE_FILE, self.display)
+        except OSError:
+            self.sprites = None
+        self.frame_cache = FrameCache(self.display, self.png, open_png=self.open_png, max_bytes=self.FRAME_CACHE_BYTES,
+                                      cache_dir=self.FRAME_CACHE_DIR, min_free=self.FRAME_CACHE_MIN_FREE) if self.USE_FRAME_CACHE else None
+        # Precarga de la siguiente animación de la cola (deja los frames en la caché de frames)
+        self.prefetcher = None
+        if self.USE_PREFETCH and self.frame_cache is not None:
+            self.prefetcher = Prefetcher(self.frame_cache, self.PREFETCH_BYTES, self.PREFETCH_IDLE_MS, self.sprites)
+        self.animation_started = False  # Empieza una animación: el próximo frame dibujado es un cambio
+        self.cache_frames = True  # La animación actual cabe entera en la caché de frames
+
+        # Caché de textos rasterizados (mensajes de estado, menús y estadísticas)
+        self.text_cache = TextCache(self.display, self.TEXT_CACHE_BYTES) if self.USE_TEXT_CACHE else None
+
         # Definición de colores
         self.BLACK = self.display.create_pen(0, 0, 0)
         self.WHITE = self.display.create_pen(255, 255, 255)
@@ -45,27 +335,81 @@ class Menu:
         # Obtener las dimensiones del display
         self.WIDTH, self.HEIGHT = self.display.get_bounds()
 
+        # Perfilador de frames: las sondas solo miden cuando `profile` no es None
+        self.profiler = FrameProfiler() if self.PROFILER else None
+        self.profile = None
+        if self.frame_cache is not None and self.profiler is not None:
+            self.profiler.sources.append(self.frame_cache)
+        if self.prefetcher is not None and self.profiler is not None:
+            self.profiler.sources.append(self.prefetcher)
+
+        # Envío del frame en el segundo núcleo, con doble buffer
+        self.flusher = None
+        if self.DUAL_CORE_FLUSH:
+            if _thread is None:
+                print("DUAL_CORE_FLUSH requiere _thread; se envía desde el núcleo 0")
+            else:
+                try:
+                    self.flusher = DualCoreFlush(self.display, self.flush_sender())
+                except MemoryError:
+                    # El buffer delantero se reserva antes de arrancar el hilo: no queda nada a medias
+                    print("Sin memoria para el buffer delantero; se envía desde el núcleo 0")
+                except (OSError, RuntimeError) as e:
+                    print(f"No se pudo arrancar el núcleo 1: {e}")
+            if self.flusher is not None and self.PARTIAL_UPDATE:
+                # El núcleo 1 usa el bus SPI del driver: desde el núcleo 0 no se puede enviar nada
+                print("PARTIAL_UPDATE no se usa con DUAL_CORE_FLUSH; se envía el frame completo")
+                self.PARTIAL_UPDATE = False
+            if self.flusher is not None and self.profiler is not None:
+                self.profiler.sources.append(self.flusher)
+
+        # Envío por regiones desde el núcleo 0
+        self.send_rect = None
+        if self.PARTIAL_UPDATE:
+            try:
+                self.send_rect = self.window_sender()
+            except ImportError:
+                # Sin machine.SPI (sustitutos del host): el partial_update del sustituto cuenta los píxeles
+                self.send_rect = self.display.partial_update
+
+        # Regiones de la pantalla principal que hay que redibujar
+        self.dirty = DirtyRegions(self.WIDTH, self.HEIGHT, SLOT_ICONS + len(self.ICONS))
+        self.icon_rects = tuple(self.icon_rect(i) for i in range(len(self.ICONS)))
+        self.poop_rect = None  # Se recalcula solo cuando cambia la posición
+
+        # Presupuesto de recolección de basura (gc.mem_alloc solo existe en MicroPython)
+        self.gc_collections = 0
+        self.gc_last_alloc = 0
+        if hasattr(gc, 'threshold'):
+            gc.threshold(self.GC_THRESHOLD)
+
+        # Capa de fondo (iconos o texto de los menús), reconstruida solo cuando cambia
+        self.background = None
+        # Clave de la capa de fondo de los menús; aumenta cada vez que cambia su fondo. La
+        # pantalla principal usa -1 - icono seleccionado, así que nunca coinciden
+        self.background_scene = 0
+        if self.USE_BACKGROUND_CACHE and self.flusher is not None:
+            # El buffer delantero del núcleo 1 ocupa los 64 KB de la capa de fondo: no caben los dos
+            print("La capa de fondo no se usa con DUAL_CORE_FLUSH; se redibuja en cada frame.")
+        elif self.USE_BACKGROUND_CACHE:
+            try:
+                self.background = BackgroundLayer(self.display)
+            except MemoryError:
+                print("Sin memoria para la capa de fondo; se redibuja en cada frame.")
+
         # Inicialización de estadísticas
-        self.hambre = 70
-        self.sueno = 70
-        self.felicidad = 70
-        self.salud = 70
+        self.stats = array('f', (70, 70, 70, 70))  # hambre, sueño, felicidad, salud (índices de effects)
 
         # Estado del menú
-        self.in_food_menu = False
-        self.in_entertainment_menu = False
-        self.in_health_menu = False
-        self.in_menu = False
-        self.in_sleep_menu = False  # Nuevo estado para el menú de sueño
+        self.screens = default_screens()  # Pila de pantallas; la activa es self.screens.top
         self.selected_food = 0
         self.selected_entertainment = 0
         self.selected_health = 0
         self.selected_sleep_option = 0  # Opción seleccionada en el menú de sueño
         self.selected_icon = 0
 
-        # Tiempos de últimas acciones
-        self.last_festival_time = 0
-        self.last_ibuprofen_time = 0
+        # Historial de selecciones y tiempos de espera (festival, ibuprofeno)
+        self.limiter = RateLimiter(self.LIMITER_ACTIONS, self.SELECTION_LIMIT + 1)
 
         # Estado de sueño
         self.is_sleeping = False  # Indica si la mascota está durmiendo
@@ -74,498 +418,618 @@ class Menu:
         # Inicialización para la funcionalidad de 'poop.png'
         self.poop_visible = False
         self.poop_position = (0, 0)
-        self.next_poop_time = time.time() + random.uniform(60, 120)  # Tiempo aleatorio entre 1 y 2 minutos
-        self.poop_image = 'poop.png'
-        self.poop_size = (31, 29)  # Tamaño de la imagen 'poop.png'
-
-        # Temporizador para disminuir las estadísticas cada minuto
-        self.timer = Timer()
-        self.timer.init(period=60000, mode=Timer.PERIODIC, callback=self.decrease_stats)
+        self.next_poop_time = pet_model.next_poop_time(time.time())  # Tiempo aleatorio entre 1 y 2 minutos
+        self.poop_image = self.POOP_IMAGE
+        self.poop_size = ASSETS[self.POOP_IMAGE][:2] if self.POOP_IMAGE in ASSETS else (31, 29)
+
+        # Temporizador para disminuir las estadísticas cada minuto (async_main usa su propia tarea)
+        self.timer = None
+        self.last_stats_tick = time.ticks_ms()
+        self.stats_ticks = 0    # Minutos contados por el Timer (solo lo escribe el callback)
+        self.stats_applied = 0  # Minutos ya aplicados (solo lo escribe el bucle principal)
+        if use_timer:
+            self.timer = Timer()
+            self.timer.init(period=self.STATS_PERIOD_MS, mode=Timer.PERIODIC, callback=self.stats_timer)
 
         # Definición de iconos
-        self.icons = [
-            ("food.png", "food_s.png"),
-            ("sleep.png", "sleep_s.png"),
-            ("clear.png", "clear_s.png"),
-            ("meter.png", "meter_s.png"),
-            ("game.png", "game_s.png"),
-            ("health.png", "health_s.png")
-        ]
-
-        # Configuración de las animaciones del murciélago
-        self.sprite_sheets = {
-            'default': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_default.png',
-                'frame_width': 82,
-                'num_frames': 4,
-                'frame_height': 72
-            },
-            'eat': {
-                'type': 'frames',
-                'frames': [
-                    'eat/pink_bean_eat-1.png.png',
-                    'eat/pink_bean_eat-2.png.png',
-                    'eat/pink_bean_eat-3.png.png',
-                    'eat/pink_bean_eat-4.png.png',
-                    'eat/pink_bean_eat-5.png.png',
-                    'eat/pink_bean_eat-6.png.png',
-                    'eat/pink_bean_eat-7.png.png',
-                    'eat/pink_bean_eat-8.png.png',
-                    'eat/pink_bean_eat-9.png.png',
-                    'eat/pink_bean_eat-10.png.png',
-                    'eat/pink_bean_eat-11.png.png',
-                    'eat/pink_bean_eat-12.png.png',
-                    'eat/pink_bean_eat-13.png.png',
-                    'eat/pink_bean_eat-14.png.png',
-                    'eat/pink_bean_eat-15.png.png',
-                    'eat/pink_bean_eat-16.png.png'
-                ],
-                'frame_width': 112,  # Cada frame es de 112 px de ancho
-                'frame_height': 72    # Cada frame es de 72 px de alto
-            },
-            'hug': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_ass.png',
-                'frame_width': 56,  # 112 / 2 = 56
-                'num_frames': 2,
-                'frame_height': 70
-            },
-            'drunk': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_drunk.png',
-                'frame_width': 78,  # 468 / 6 = 78
-                'num_frames': 6,
-                'frame_height': 84
-            },
-            'talk': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_talk.png',
-                'frame_width': 86,  # 344 / 4 = 86
-                'num_frames': 4,
-                'frame_height': 80
-            },
-            'angry_1': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_angry_1.png',
-                'frame_width': 118,  # 472 / 4 = 118
-                'num_frames': 4,
-                'frame_height': 96
-            },
-            'angry_2': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_angry_2.png',
-                'frame_width': 118,  # 472 / 4 = 118
-                'num_frames': 4,
-                'frame_height': 96
-            },
-            'sleep_1': {  # Nueva animación agregada
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_sleeping_1.png',
-                'frame_width': 114,  # Ajusta según tus PNG
-                'num_frames': 4,      # Ajusta según tus PNG
-                'frame_height': 64
-            },
-            'sleep_2': {  # Nueva animación agregada
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_sleeping_2.png',
-                'frame_width': 114,  # Ajusta según tus PNG
-                'num_frames': 4,      # Ajusta según tus PNG
-                'frame_height': 64
-            },
-            'love_1': {  # Nueva animación agregada
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_love_1.png',
-                'frame_width': 156,  # 624 / 4 = 156 px por frame
-                'num_frames': 4,
-                'frame_height': 64
-            },
-            'love_2': {  # Nueva animación agregada
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_love_2.png',
-                'frame_width': 156,  # 624 / 4 = 156 px por frame
-                'num_frames': 4,
-                'frame_height': 64
-            },
-            # Nuevas animaciones para Play Deftones
-            'guitar_1': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_1.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_2': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_2.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_3': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_3.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_4': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_4.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_5': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_5.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_6': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_6.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            'guitar_7': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_guitar_7.png',
-                'frame_width': 130,
-                'num_frames': 3,
-                'frame_height': 86
-            },
-            # Nuevos sprite sheets agregados
-            'ass': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_ass.png',
-                'frame_width': 56,   # 112 / 2 = 56
-                'num_frames': 2,
-                'frame_height': 70
-            },
-            'happy2': {
-                'type': 'sprite_sheet',
-                'file': 'pink_bean_happy2.png',
-                'frame_width': 98,   # 196 / 2 = 98
-                'num_frames': 2,
-                'frame_height': 72
-            }
-        }
+        self.icons = self.ICONS
 
-        # Cola de animaciones
-        self.animation_queue = []
+        # Configuración de las animaciones del murciélago, compilada en registros por id
+        self.animations, self.animation_ids = compile_registry(sprite_sheet_config(), self.ONE_SHOT_ANIMATIONS, ASSETS, self.WIDTH, self.HEIGHT)
+        if self.sprites is not None:
+            # Los frames se buscan por frame_key y los iconos por su nombre, sin crear tuplas
+            self.sprites.add_keys(self.animations, [name for pair in self.ICONS for name in pair] + [self.POOP_IMAGE])
 
-        # Verificación de la carga de PNGs
-        self.verify_pngs()
+        # Cola de animaciones (con repeticiones comprimidas y prioridades)
+        self.animation_queue = AnimationQueue()
 
-        # Iniciar la animación por defecto
-        self.start_animation('default')
-
-        # Inicialización del historial de selecciones
-        self.selection_history = {}
+        # Estado guardado en flash: se restaura el último registro válido del log
+        self.state_log = StateLog(self.STATE_FILE) if self.PERSIST_STATE else None
+        saved_at = self.state_log.restore(self) if self.state_log is not None else None
+        if saved_at is not None:
+            print("Estado de la mascota restaurado.")
+            if self.is_sleeping:
+                self.animation_queue.set_state(('sleep_1', 'sleep_2'))
 
-    def verify_pngs(self):
-        """Verifica que todos los PNGs estén correctamente cargados."""
-        for anim, details in self.sprite_sheets.items():
-            try:
-                if details['type'] == 'sprite_sheet':
-                    self.png.open_file(details['file'])
-                    # Intentar decodificar el primer frame para verificar la carga
-                    self.png.decode(0, 0, source=(0, 0, details['frame_width'], details['frame_height']))
-                elif details['type'] == 'frames':
-                    for frame in details['frames']:
-                        self.png.open_file(frame)
-                        self.png.decode(0, 0, source=(0, 0, details['frame_width'], details['frame_height']))
-                print(f"Animación '{anim}' cargada correctamente.")
-            except Exception as e:
-                print(f"Error al cargar {details['file']} o uno de sus frames para la animación '{anim}': {e}")
-
-        # Cargar la imagen 'poop.png'
-        try:
-            self.png.open_file(self.poop_image)
-            self.png.decode(0, 0, source=(0, 0, self.poop_size[0], self.poop_size[1]))
-            print(f"Imagen '{self.poop_image}' cargada correctamente.")
-        except Exception as e:
-            print(f"Error al cargar {self.poop_image}: {e}")
+        # Comprobación rápida de los assets contra el manifiesto (sin decodificar)
+        self.verify_assets()
 
-    def record_selection(self, option_name):
-        """Registra la selección de una opción con la marca de tiempo actual."""
-        current_time = time.time()
-        if option_name not in self.selection_history:
-            self.selection_history[option_name] = []
-        self.selection_history[option_name].append(current_time)
-        # Eliminar marcas de tiempo que tienen más de 60 segundos
-        self.selection_history[option_name] = [t for t in self.selection_history[option_name] if current_time - t <= 60]
-
-    def check_selection_frequency(self, option_name):
-        """Verifica si una opción ha sido seleccionada más de dos veces en el último minuto."""
-        if option_name in self.selection_history and len(self.selection_history[option_name]) > 2:
-            return True
-        return False
+        # Iniciar la animación por defecto (o la de dormir si se ha restaurado durmiendo)
+        self.start_animation('default')
+        if saved_at is not None:
+            self.catch_up(saved_at)  # Aplicar de una vez el tiempo que ha estado apagada
+        if self.is_sleeping:
+            self.trigger_next_animation()
 
-    def check_high_parameters(self):
-        """Verifica si alguno de los parámetros supera el 90%."""
-        return any(param > 90 for param in [self.hambre, self.felicidad, self.sueno, self.salud])
+    def verify_assets(self):
+        """Comprueba con os.stat que los PNGs del manifiesto existen y no han cambiado de tamaño.
+
+        Con VERIFY_CHECKSUMS también se compara el CRC32, lo que obliga a leer todos los archivos.
+        Los PNGs que están en el atlas o en los sprites RLE no se comprueban: se leen de ahí.
+        """
+        for filename, (width, height, frames, size, crc) in ASSETS.items():
+            if self.atlas is not None and (filename, 0) in self.atlas.index:
+                continue
+            if self.sprites is not None and (filename, 0) in self.sprites.index:
+                continue
+            try:
+                if os.stat(filename)[6] != size:
+                    print(f"{filename} no coincide con el manifiesto; ejecuta tools/build_manifest.py")
+                elif self.VERIFY_CHECKSUMS and file_crc32(filename) != crc:
+                    print(f"Checksum incorrecto en {filename}")
+            except OSError as e:
+                print(f"Error al cargar {filename}: {e}")
+
+    def cooldown_active(self, action):
+        """Indica si la acción ('festival' o 'ibuprofen') sigue en su tiempo de espera."""
+        return self.limiter.remaining(action, self.COOLDOWNS[action], time.time()) > 0
+
+    def start_cooldown(self, action):
+        self.limiter.record(action, time.time())
+
+    # Los tiempos de espera se guardan en el log de estado como estas dos marcas
+    @property
+    def last_festival_time(self):
+        return self.limiter.last('festival')
+
+    @last_festival_time.setter
+    def last_festival_time(self, when):
+        self.limiter.set_last('festival', when)
+
+    @property
+    def last_ibuprofen_time(self):
+        return self.limiter.last('ibuprofen')
+
+    @last_ibuprofen_time.setter
+    def last_ibuprofen_time(self, when):
+        self.limiter.set_last('ibuprofen', when)
+
+    # Nombres de las estadísticas sobre el array (los usan el log de estado y los menús)
+    @property
+    def hambre(self):
+        return self.stats[HUNGER]
+
+    @hambre.setter
+    def hambre(self, value):
+        self.stats[HUNGER] = value
+
+    @property
+    def sueno(self):
+        return self.stats[SLEEP]
+
+    @sueno.setter
+    def sueno(self, value):
+        self.stats[SLEEP] = value
+
+    @property
+    def felicidad(self):
+        return self.stats[HAPPINESS]
+
+    @felicidad.setter
+    def felicidad(self, value):
+        self.stats[HAPPINESS] = value
+
+    @property
+    def salud(self):
+        return self.stats[HEALTH]
+
+    @salud.setter
+    def salud(self, value):
+        self.stats[HEALTH] = value
+
+    def stats_timer(self, timer):
+        """Callback del machine.Timer: solo cuenta el minuto.
+
+        Las estadísticas se bajan en apply_due_stats desde el bucle principal, en el
+        núcleo 0 y entre frames, así que nunca cambian a mitad de un frame ni de una acción.
+        """
+        self.stats_ticks += 1
+
+    def apply_due_stats(self):
+        """Aplica de una vez los minutos contados por el Timer desde la última llamada."""
+        due = self.stats_ticks - self.stats_applied
+        if due:
+            self.stats_applied += due
+            self.last_stats_tick = time.ticks_ms()
+            self.decay_stats(due)
 
     def decrease_stats(self, timer):
         """Disminuye las estadísticas cada minuto."""
-        self.hambre = max(0, self.hambre - 0.023148)  # 100% -> 0% in 72 hours
-        self.sueno = max(0, self.sueno - 0.069444)    # 100% -> 0% in 24 hours
-        self.felicidad = max(0, self.felicidad - 0.034722)  # 100% -> 0% in 48 hours
-        # Health does not decrease with time
+        self.last_stats_tick = time.ticks_ms()
+        self.decay_stats(1)
+
+    def decay_stats(self, minutes):
+        """Aplica `minutes` minutos de bajada de estadísticas en un solo paso (lineal y con suelo en 0)."""
+        pet_model.decay(self.stats, minutes)
+
+    def advance_time(self, elapsed_s):
+        """Avanza el estado `elapsed_s` segundos de golpe, con el mismo coste para un minuto que para una semana.
+
+        Los enfriamientos (festival, ibuprofeno) son marcas de time.time() y no
+        necesitan nada más; el fin del sueño y la caca pendiente se resuelven aquí.
+        """
+        if elapsed_s > 0:
+            self.decay_stats(elapsed_s / 60)
+        self.check_sleep_status()  # Despertar si el sueño terminó mientras tanto
+        self.update_poop()         # Solo se ve una caca: basta una aparición aunque se hayan perdido varias
+
+    def catch_up(self, saved_at):
+        """Pone al día el estado restaurado, guardado cuando time.time() valía `saved_at`."""
+        now = time.time()
+        elapsed = now - saved_at
+        if elapsed < 0:
+            # El RTC se ha reiniciado (sin batería vuelve a 2021): no se sabe cuánto tiempo
+            # ha pasado, así que se trasladan las marcas al reloj actual como si no hubiera pasado
+            print("RTC sin hora válida: no se aplica el tiempo apagado.")
+            shift = now - saved_at
+            self.limiter.shift(shift)
+            self.next_poop_time += shift
+            if self.is_sleeping:
+                self.sleep_end_time += shift
+            elapsed = 0
+        else:
+            print(f"Aplicando {int(elapsed)} s transcurridos desde el último guardado.")
+        self.advance_time(elapsed)
 
-    def enqueue_animation(self, animation_name, repeats=1):
+    def enqueue_animation(self, animation_name, repeats=1, priority=PRIORITY_NORMAL):
         """Añade una animación a la cola de animaciones."""
-        for _ in range(repeats):
-            self.animation_queue.append(animation_name)
+        self.animation_queue.push(animation_name, repeats, priority)
         print(f"Encolando animación '{animation_name}' {repeats} vez(es).")
-        # Si la animación por defecto está en curso y no hay otra animación en cola, iniciar la nueva animación
-        if self.current_animation == 'default' and len(self.animation_queue) == repeats:
+        # Si está en curso una animación de reposo (por defecto o de estado), iniciar la nueva animación
+        if self.animation_queue.is_idle(self.current_animation):
             self.trigger_next_animation()
 
     def trigger_next_animation(self):
         """Inicia la siguiente animación en la cola, si existe."""
-        if self.animation_queue:
-            next_anim = self.animation_queue.pop(0)
+        next_anim = self.animation_queue.pop()
+        if next_anim is not None:
             self.start_animation(next_anim)
             print(f"Iniciando animación '{next_anim}'.")
-        else:
-            # No hay más animaciones en la cola, volver a la animación por defecto
-            if self.current_animation != 'default':
-                self.start_animation('default')
-                print("Volviendo a la animación por defecto.")
+            return
+        # No hay más animaciones en la cola: animación de estado (p. ej. dormir) o por defecto
+        next_anim = self.animation_queue.next_state()
+        if next_anim is not None:
+            self.start_animation(next_anim)
+        elif self.current_animation != 'default':
+            self.start_animation('default')
+            print("Volviendo a la animación por defecto.")
 
     def start_animation(self, animation_name):
         """Inicia una animación específica."""
-        if animation_name not in self.sprite_sheets:
+        anim_id = self.animation_ids.get(animation_name)
+        if anim_id is None:
             print(f"Animación '{animation_name}' no definida.")
             return
 
-        anim_details = self.sprite_sheets[animation_name]
+        self.anim = self.animations[anim_id]
         self.current_animation = animation_name
-
-        if anim_details['type'] == 'sprite_sheet':
-            self.current_sprite_sheet = anim_details['file']
-            self.frame_width = anim_details['frame_width']
-            self.num_frames = anim_details['num_frames']
-            self.frame_height = anim_details['frame_height']
-        elif anim_details['type'] == 'frames':
-            self.eat_frames = anim_details['frames']
-            self.num_frames = len(self.eat_frames)
-            self.frame_width = anim_details['frame_width']
-            self.frame_height = anim_details['frame_height']
-            self.current_frame = 0
+        self.frame_width = self.anim.rect[2]
+        self.frame_height = self.anim.rect[3]
+        self.num_frames = self.anim.num_frames
 
         self.current_frame = 0
-        self.last_frame_time = time.time()
-        self.frame_interval = 0.05  # Puedes ajustar el intervalo para controlar la velocidad de la animación
+        self.last_frame_time = time.ticks_ms()
+        self.frame_interval = self.anim.interval_ms  # Milisegundos por frame según los fps de la animación
 
         # Repeticiones de animación
         self.max_repeats = 1  # Cada animación en la cola se reproduce una vez
         self.current_repeats = 0
 
-        # Recalcular posición para centrar el sprite con el nuevo tamaño
-        self.bat_x = (self.WIDTH - self.frame_width) // 2
-        self.bat_y = ((self.HEIGHT - self.frame_height) // 2) + 25
+        # Posición precalculada para centrar el sprite con el nuevo tamaño
+        self.bat_x, self.bat_y = self.anim.rect[0], self.anim.rect[1]
+        self.animation_started = True
+        if self.frame_cache is not None:
+            _, _, w, h = self.anim.rect
+            self.cache_frames = self.frame_cache.fits(self.anim.num_frames * entry_size(w, h))
+        if self.prefetcher is not None:
+            self.prefetcher.started(self.anim)
         print(f"Animación '{animation_name}' iniciada.")
 
+    def upcoming_animation(self):
+        """Animación que empezará al terminar la actual, o None si la actual se repite en bucle."""
+        if not self.anim.one_shot:
+            return None  # Lo siguiente depende de una pulsación, que empieza su animación al momento
+        anim_id = self.animation_ids.get(self.animation_queue.upcoming() or 'default')
+        return None if anim_id is None else self.animations[anim_id]
+
+    def prefetch(self, idle_ms):
+        """Precarga frames de la siguiente animación si quedan `idle_ms` libres en el frame.
+
+        Se llama justo antes de esperar al siguiente frame. Devuelve True si ha decodificado.
+        """
+        if self.prefetcher is None:
+            return False
+        return self.prefetcher.step(self.upcoming_animation(), idle_ms)
+
     def update_animation(self):
-        """Actualiza el frame de la animación si ha pasado el intervalo."""
-        current_time = time.time()
-        if current_time - self.last_frame_time >= self.frame_interval:
-            self.current_frame += 1
-            if self.current_frame >= self.num_frames:
-                self.current_repeats += 1
-                if self.current_repeats >= self.max_repeats:
-                    if self.current_animation in [
-                        'eat', 'eat_1', 'eat_2', 'eat_3', 'eat_4',
-                        'hug', 'drunk', 'sleep_1', 'sleep_2', 'talk',
-                        'angry_1', 'angry_2', 'love_1', 'love_2',
-                        'guitar_1', 'guitar_2', 'guitar_3', 'guitar_4',
-                        'guitar_5', 'guitar_6', 'guitar_7',
-                        'ass', 'happy2'  # Añadido para las nuevas animaciones
-                    ]:
-                        # Termina la animación actual y verifica la cola
-                        self.trigger_next_animation()
-                    else:
-                        # Looping para animaciones por defecto
-                        self.current_frame = 0
+        """Avanza los frames que tocan según el tiempo transcurrido.
+
+        Si el bucle va con retraso se saltan frames en lugar de ralentizar la animación.
+        """
+        steps = frames_due(self.last_frame_time, self.frame_interval, time.ticks_ms())
+        if not steps:
+            return
+        self.last_frame_time = time.ticks_add(self.last_frame_time, steps * self.frame_interval)
+        # Con más pasos que frames solo se daría vueltas a la misma animación
+        for _ in range(min(steps, self.num_frames)):
+            if self.advance_frame():
+                # Ha empezado otra animación, que cuenta su tiempo desde ahora
+                break
+
+    def advance_frame(self):
+        """Avanza un frame. Devuelve True si la animación ha terminado y se ha iniciado la siguiente."""
+        self.current_frame += 1
+        if self.current_frame >= self.num_frames:
+            self.current_repeats += 1
+            if self.current_repeats >= self.max_repeats:
+                if self.anim.one_shot:
+                    # Termina la animación actual y verifica la cola
+                    self.trigger_next_animation()
+                    return True
                 else:
-                    # Reiniciar la animación para repetir
+                    # Looping para animaciones por defecto
                     self.current_frame = 0
             else:
-                # Para animaciones por defecto, hacer looping
-                if self.current_animation == 'default':
-                    self.current_frame %= self.num_frames
-            self.last_frame_time = current_time
+                # Reiniciar la animación para repetir
+                self.current_frame = 0
+        return False
 
     def draw_bat(self):
-        """Dibuja el murciélago animado en el centro de la pantalla."""
-        self.update_animation()
-        anim_details = self.sprite_sheets[self.current_animation]
+        """Dibuja el frame actual del murciélago animado en el centro de la pantalla."""
+        anim = self.anim
+        if self.current_frame < anim.num_frames:
+            p = self.profile
+            if p is not None:
+                t0 = p.start()
+            self.draw_frame(anim, self.current_frame)
+            if p is not None:
+                p.stop(STAGE_PET, t0)
+        else:
+            # Si el frame actual está fuera de rango, volver al inicio
+            self.current_frame = 0
 
-        if anim_details['type'] == 'sprite_sheet':
-            source_x = self.current_frame * self.frame_width
-            source = (source_x, 0, self.frame_width, self.frame_height)
-            try:
-                self.png.open_file(self.current_sprite_sheet)
-                self.png.decode(self.bat_x, self.bat_y, source=source)
-                # No es necesario cerrar el archivo aquí
-            except Exception as e:
-                print(f"Error al cargar {self.current_sprite_sheet}: {e}")
-        elif anim_details['type'] == 'frames':
-            if self.current_frame < len(self.eat_frames):
-                current_frame_file = self.eat_frames[self.current_frame]
-                try:
-                    self.png.open_file(current_frame_file)
-                    self.png.decode(self.bat_x, self.bat_y)
-                    # No es necesario cerrar el archivo aquí
-                except Exception as e:
-                    print(f"Error al cargar {current_frame_file}: {e}")
-            else:
-                # Si el frame actual está fuera de rango, volver al inicio
-                self.current_frame = 0
+    def draw_frame(self, anim, frame):
+        """Dibuja un frame en la posición del murciélago: sprites RLE, caché o decodificando el PNG.
+
+        Con el frame en los sprites o en la caché no se crea ningún objeto; el
+        archivo y el rectángulo de origen solo se calculan para decodificar.
+        """
+        key = frame_key(anim, frame)
+        x, y = self.bat_x, self.bat_y
+        try:
+            if self.sprites is not None and self.sprites.draw(key, x, y):
+                return
+            cache = self.frame_cache
+            if cache is not None and cache.draw(key, x, y):
+                return
+            filename = frame_file(anim, frame)
+            source = frame_source(anim, frame)
+            if cache is not None and self.cache_frames and cache.admit(key, filename, source, x, y):
+                return
+            source = self.open_png(filename, source)
+            self.png.decode(x, y, source=source)
+            # No es necesario cerrar el archivo aquí
+        except Exception as e:
+            print(f"Error al cargar {frame_file(anim, frame)}: {e}")
+
+    def open_png(self, filename, source=None):
+        """Abre un PNG desde el atlas si está empaquetado, o desde su archivo suelto.
+
+        Devuelve el rectángulo de origen que hay que pasar a `decode`.
+        """
+        if self.atlas is not None:
+            atlas_source = self.atlas.open(filename, source)
+            if atlas_source is not None:
+                return atlas_source
+        self.png.open_file(filename)
+        return source
 
     def show_status_message(self, message):
-        """Shows a status message above the pet for 5 seconds"""
+        """Shows a status message above the pet for MESSAGE_DURATION milliseconds"""
         self.status_message = message
-        self.message_start_time = time.time()
+        self.status_expires = time.ticks_add(time.ticks_ms(), self.MESSAGE_DURATION)
+        self.status_lines = self.layout_status_message(message)
+        self.status_rect = self.status_message_rect(self.status_lines)
     
     def draw_menu(self):
         """Dibuja el menú actual en la pantalla."""
+        p = self.profile
+        if p is not None:
+            p.begin_frame()
+        screen = self.screens.top
+        if not screen.ANIMATED:
+            # Pantalla estática: solo se redibuja si ha cambiado algo desde el último dibujo
+            lines = self.status_message_lines()
+            redraw = screen.changed(self, p.version if p is not None else -1)
+            if redraw:
+                if redraw == REDRAW_ALL:
+                    self.background_scene += 1
+                if self.background is None:
+                    self.draw_menu_background()
+                elif not self.background.update(self.background_scene, self.draw_menu_background):
+                    self.background.restore()
+
+                # Draw status message if active (after drawing everything else)
+                self.draw_status_message(lines)
+                if p is not None:
+                    self.draw_profile_overlay()
+                self.flush(())
+        else:
+            self.draw_main_screen()
+        if p is not None:
+            p.end_frame(self.animation_started and screen.ANIMATED)
+        if screen.ANIMATED:
+            self.animation_started = False  # En los menús no se dibuja la mascota: cuenta al volver
+
+    def collect_garbage(self, idle_ms):
+        """Recoge la basura si se ha gastado el presupuesto y quedan `idle_ms` libres en el frame.
+
+        Se llama justo antes de esperar al siguiente frame. Devuelve True si ha recogido.
+        """
+        if idle_ms < self.GC_IDLE_MS or not hasattr(gc, 'mem_alloc'):
+            return False
+        if gc.mem_alloc() - self.gc_last_alloc < self.GC_BUDGET:
+            return False
+        p = self.profile
+        if p is not None:
+            t0 = p.start()
+        gc.collect()
+        if self.frame_cache is not None:
+            self.frame_cache.shed()
+        if p is not None:
+            p.stop(STAGE_GC, t0)
+        self.gc_last_alloc = gc.mem_alloc()
+        self.gc_collections += 1
+        return True
+
+    def draw_menu_background(self):
+        """Dibuja la parte estática del menú abierto."""
         # Limpiar la pantalla
         self.display.set_pen(self.BLACK)
         self.display.clear()
 
-        # Dibujar el murciélago animado si no está en ningún menú
-        if not self.in_menu and not self.in_food_menu and not self.in_entertainment_menu and not self.in_health_menu and not self.in_sleep_menu:
-            self.draw_bat()
-
         # Dibujar la imagen 'poop.png' si está visible
         if self.poop_visible:
             self.draw_icon(self.poop_image, self.poop_position[0], self.poop_position[1])
 
         # Dibujar el menú correspondiente
-        if self.in_food_menu:
-            self.show_food_menu()
-        elif self.in_entertainment_menu:
-            self.show_entertainment_menu()
-        elif self.in_health_menu:
-            self.show_health_menu()
-        elif self.in_sleep_menu:
-            self.show_sleep_menu()
-        elif self.in_menu:
-            self.show_stats()
-        else:
-            # Dibujar los iconos principales
-            for i, (icon, icon_selected) in enumerate(self.icons[:3]):
-                if self.selected_icon == i:
-                    self.draw_icon(icon_selected, 10, 10 + i * 45)
-                else:
-                    self.draw_icon(icon, 10, 10 + i * 45)
+        p = self.profile
+        if p is not None:
+            t0 = p.start()
+        self.screens.top.draw(self)
+        if p is not None:
+            p.stop(STAGE_TEXT, t0)
+
+    def draw_main_background(self):
+        """Dibuja el fondo de la pantalla principal: los iconos con la selección actual."""
+        self.display.set_pen(self.BLACK)
+        self.display.clear()
+        for i, (icon, icon_selected) in enumerate(self.icons):
+            x, y, _, _ = self.icon_rect(i)
+            self.draw_icon(icon_selected if self.selected_icon == i else icon, x, y)
 
-            for i, (icon, icon_selected) in enumerate(self.icons[3:]):
-                idx = i + 3
-                if self.selected_icon == idx:
-                    self.draw_icon(icon_selected, self.WIDTH - 30, 10 + i * 45)
-                else:
-                    self.draw_icon(icon, self.WIDTH - 30, 10 + i * 45)
-
-        # Draw status message if active (after drawing everything else)
-        if self.status_message:
-            current_time = time.time()
-            if current_time - self.message_start_time < self.MESSAGE_DURATION:
-                self.display.set_pen(self.HIGHLIGHT)  # Green color for status updates
-                message_y = 10  # Fixed position at top of screen
-                
-                # Split message into two lines if too long
-                if len(self.status_message) > 15:
-                    parts = self.status_message.split()
-                    line1 = ' '.join(parts[:len(parts)//2])
-                    line2 = ' '.join(parts[len(parts)//2:])
-                    
-                    # Calculate positions for both lines
-                    line1_width = len(line1) * 8 * 2  # scale=2
-                    line2_width = len(line2) * 8 * 2
-                    
-                    line1_x = (self.WIDTH - line1_width) // 2 + 30
-                    line2_x = (self.WIDTH - line2_width) // 2 + 30
-                    
-                    # Draw first line
-                    self.display.text(line1, line1_x, message_y, scale=2)
-                    # Draw second line below first
-                    self.display.text(line2, line2_x, message_y + 20, scale=2)
-                else:
-                    # Single line message
-                    message_width = len(self.status_message) * 8 * 2  # scale=2
-                    message_x = (self.WIDTH - message_width) // 2 + 25
-                    self.display.text(self.status_message, message_x, message_y, scale=2)
+    def draw_main_screen(self):
+        """Dibuja la pantalla principal redibujando solo las regiones que han cambiado."""
+        dirty = self.dirty
+        self.update_animation()
+        if self.background is not None and self.background.update(-1 - self.selected_icon, self.draw_main_background):
+            dirty.invalidate()
+
+        # Cada elemento informa de su estado y del rectángulo que ocupa. En un frame
+        # sin cambios no se crea ningún objeto: las claves son enteros y los rectángulos están precalculados
+        pet_rect = self.anim.rect
+        dirty.track(SLOT_PET, (self.anim.id << 8) | self.current_frame, pet_rect)
+        poop_rect = None
+        if self.poop_visible:
+            poop_rect = self.poop_rect
+            x, y = self.poop_position
+            if poop_rect is None or poop_rect[0] != x or poop_rect[1] != y:
+                poop_rect = self.poop_rect = (x, y, self.poop_size[0], self.poop_size[1])
+        dirty.track(SLOT_POOP, poop_rect, poop_rect)
+        icon_rects = self.icon_rects
+        for i in range(len(icon_rects)):
+            dirty.track(SLOT_ICONS + i, self.selected_icon == i, icon_rects[i])
+        lines = self.status_message_lines()
+        dirty.track(SLOT_STATUS, self.status_message, self.status_rect)
+        profile = self.profile
+        dirty.track(SLOT_PROFILE, profile.version if profile is not None else None,
+                    self.PROFILE_RECT if profile is not None else None)
+
+        if not dirty.rects:
+            return
+
+        # Limpiar solo las regiones sucias, restaurando el fondo si está en caché
+        self.display.set_pen(self.BLACK)
+        for rect in dirty.rects:
+            if self.background is None:
+                self.display.rectangle(*rect)
             else:
-                self.status_message = None
+                self.background.restore_rect(*rect)
 
-        # Actualizar el display
-        self.display.update()
-        gc.collect()
+        # Redibujar en orden los elementos que tocan una región sucia. Cada elemento
+        # redibujado ensucia su rectángulo para que se repinte lo que tiene encima.
+        if dirty.intersects(pet_rect):
+            self.draw_bat()
+            dirty.add(*pet_rect)
+        if poop_rect is not None and dirty.intersects(poop_rect):
+            self.draw_icon(self.poop_image, poop_rect[0], poop_rect[1])
+            dirty.add(*poop_rect)
+        for i, (icon, icon_selected) in enumerate(self.icons):
+            rect = icon_rects[i]
+            # Con la capa de fondo los iconos ya están pintados, salvo si la caca los tapa
+            if self.background is not None and (poop_rect is None or not overlaps(rect, poop_rect)):
+                continue
+            if dirty.intersects(rect):
+                self.draw_icon(icon_selected if self.selected_icon == i else icon, rect[0], rect[1])
+                dirty.add(*rect)
+        if lines and dirty.intersects(self.status_rect):
+            self.draw_status_message(lines)
+        if profile is not None and dirty.intersects(self.PROFILE_RECT):
+            self.draw_profile_overlay()
+
+        self.flush(dirty.rects)
+        dirty.reset()
+
+    def flush(self, rects):
+        """Envía al display las regiones indicadas (o todo con `()`), o el frame completo si no hay actualización parcial.
+
+        Es el único sitio que actualiza el display, así que con el envío en el
+        núcleo 1 (flush.py) nunca se llama al driver desde el núcleo 0.
+        """
+        p = self.profile
+        if p is not None:
+            t0 = p.start()
+        if self.flusher is not None:
+            # El núcleo 1 envía el frame completo; el driver no puede usar el bus mientras tanto
+            self.flusher.submit()
+        elif self.send_rect is not None and rects:
+            for x, y, w, h in rects:
+                self.send_rect(x, y, w, h)
+        else:
+            self.display.update()
+        if p is not None:
+            p.stop(STAGE_UPDATE, t0)
+
+    def flush_sender(self):
+        """Función que envía un buffer completo al panel desde el núcleo 1."""
+        return st7789_sender()
+
+    def window_sender(self):
+        """Función que envía una región del framebuffer al panel desde el núcleo 0."""
+        return st7789_window_sender(self.display)
+
+    def icon_rect(self, index):
+        """Rectángulo de un icono principal: tres a la izquierda y tres a la derecha."""
+        if index < 3:
+            return (10, 10 + index * 45, self.ICON_SIZE, self.ICON_SIZE)
+        return (self.WIDTH - 30, 10 + (index - 3) * 45, self.ICON_SIZE, self.ICON_SIZE)
+
+    def status_message_lines(self):
+        """Devuelve las líneas del mensaje de estado como (texto, x, y); vacía si no hay mensaje."""
+        if self.status_message and time.ticks_diff(time.ticks_ms(), self.status_expires) >= 0:
+            self.status_message = None
+            self.status_lines = ()
+            self.status_rect = None
+        return self.status_lines
+
+    def layout_status_message(self, message):
+        """Calcula una vez las líneas (texto, x, y) de un mensaje; se parte en dos si es largo."""
+        message_y = 10  # Fixed position at top of screen
+
+        # Split message into two lines if too long
+        if len(message) > 15:
+            parts = message.split()
+            line1 = ' '.join(parts[:len(parts)//2])
+            line2 = ' '.join(parts[len(parts)//2:])
+
+            # Calculate positions for both lines
+            line1_width = len(line1) * 8 * 2  # scale=2
+            line2_width = len(line2) * 8 * 2
+
+            line1_x = (self.WIDTH - line1_width) // 2 + 30
+            line2_x = (self.WIDTH - line2_width) // 2 + 30
+            return ((line1, line1_x, message_y), (line2, line2_x, message_y + 20))
+
+        # Single line message
+        message_width = len(message) * 8 * 2  # scale=2
+        message_x = (self.WIDTH - message_width) // 2 + 25
+        return ((message, message_x, message_y),)
+
+    def status_message_rect(self, lines):
+        """Rectángulo que cubre las líneas del mensaje de estado (texto a scale=2)."""
+        if not lines:
+            return None
+        x0 = min(x for _, x, _ in lines)
+        x1 = max(x + len(text) * 8 * 2 for text, x, _ in lines)
+        return (x0, lines[0][2], x1 - x0, lines[-1][2] + 16 - lines[0][2])
+
+    def draw_status_message(self, lines):
+        p = self.profile
+        if p is not None:
+            t0 = p.start()
+        for text, x, y in lines:
+            self.draw_text(text, x, y, 2, self.HIGHLIGHT)  # Green color for status updates
+        if p is not None:
+            p.stop(STAGE_TEXT, t0)
+
+    def draw_text(self, text, x, y, scale, pen):
+        """Dibuja un texto, desde la caché de textos rasterizados si está activa."""
+        if self.text_cache is not None:
+            self.text_cache.draw(text, x, y, scale, pen)
+        else:
+            self.display.set_pen(pen)
+            self.display.text(text, x, y, scale=scale)
+
+    def draw_profile_overlay(self):
+        """Dibuja los tiempos por etapa del perfilador sobre un recuadro negro."""
+        x, y, w, h = self.PROFILE_RECT
+        self.display.set_pen(self.BLACK)
+        self.display.rectangle(x, y, w, h)
+        self.display.set_pen(self.WHITE)
+        for i, line in enumerate(self.profiler.lines):
+            self.display.text(line, x + 2, y + 2 + i * 9, scale=1)
+
+    def toggle_profile(self):
+        """Activa o desactiva el perfilador; al desactivarlo vuelca las estadísticas por el puerto serie."""
+        if self.profile is None:
+            self.profiler.reset()
+            self.profile = self.profiler
+            print("Perfilador activado.")
+        else:
+            self.profile = None
+            self.profiler.dump()
 
     def draw_icon(self, filename, x, y):
         """Carga y dibuja un icono en la posición especificada."""
+        p = self.profile
+        if p is not None:
+            t0 = p.start()
         try:
-            self.png.open_file(filename)
-            self.png.decode(x, y)
+            cache = self.frame_cache
+            drawn = ((self.sprites is not None and self.sprites.draw(filename, x, y))
+                     or (cache is not None and (cache.draw(filename, x, y) or cache.admit(filename, filename, None, x, y))))
+            if not drawn:
+                source = self.open_png(filename)
+                self.png.decode(x, y, source=source)
             # No es necesario cerrar el archivo aquí
         except Exception as e:
             print(f"Error al cargar {filename}: {e}")
+        if p is not None:
+            p.stop(STAGE_ICONS, t0)
 
-    def show_food_menu(self):
-        """Muestra el menú de comida."""
-        food_options = ['Coffee', 'Tofu', 'Moscow Mule']
-        self.display.set_pen(self.WHITE)
-        self.display.text("Select food", 10, 10, scale=3)
-
-        for i, food in enumerate(food_options):
-            if self.selected_food == i:
-                self.display.set_pen(self.HIGHLIGHT)
-            else:
-                self.display.set_pen(self.WHITE)
-            self.display.text(food, 10, 50 + i * 30, scale=3)
-
-    def show_entertainment_menu(self):
-        """Muestra el menú de entretenimiento."""
-        entertainment_options = ['Play Deftones', 'Read Book', 'Go Festival']
-        current_time = time.time()
-
-        self.display.set_pen(self.WHITE)
-        self.display.text("Select type", 10, 10, scale=3)
-
-        for i, entertainment in enumerate(entertainment_options):
-            if self.selected_entertainment == i:
-                if i == 2 and (current_time - self.last_festival_time) < 120:
-                    self.display.set_pen(self.RED)
-                else:
-                    self.display.set_pen(self.HIGHLIGHT)
-            else:
-                self.display.set_pen(self.WHITE)
-            self.display.text(entertainment, 10, 50 + i * 30, scale=3)
-
-    def show_health_menu(self):
-        """Muestra el menú de salud."""
-        health_options = ['A hug', 'Ibuprofeno']
-        current_time = time.time()
-
-        self.display.set_pen(self.WHITE)
-        self.display.text("Select type", 10, 10, scale=3)
+    def show_options_menu(self, title, options, selected):
+        """Muestra un menú de opciones de la tabla de efectos; en rojo la seleccionada si está en espera."""
+        self.draw_text(title, 10, 10, 3, self.WHITE)
 
-        for i, health in enumerate(health_options):
-            if self.selected_health == i:
-                if i == 1 and (current_time - self.last_ibuprofen_time) < 28800:
-                    self.display.set_pen(self.RED)
+        for i, effect in enumerate(options):
+            if selected == i:
+                if effect.cooldown is not None and self.cooldown_active(effect.cooldown):
+                    pen = self.RED
                 else:
-                    self.display.set_pen(self.HIGHLIGHT)
+                    pen = self.HIGHLIGHT
             else:
-                self.display.set_pen(self.WHITE)
-            self.display.text(health, 10, 50 + i * 30, scale=3)
+                pen = self.WHITE
+            self.draw_text(effect.option, 10, 50 + i * 30, 3, pen)
 
     def show_sleep_menu(self):
         """Muestra el menú de sueño."""
@@ -574,321 +1038,92 @@ class Menu:
         else:
             options = ['A nap', 'Go to sleep']
 
-        self.display.set_pen(self.WHITE)
-        self.display.text("Sleep Menu", 10, 10, scale=3)
+        self.draw_text("Sleep Menu", 10, 10, 3, self.WHITE)
 
         for i, option in enumerate(options):
-            if self.selected_sleep_option == i:
-                self.display.set_pen(self.HIGHLIGHT)
-            else:
-                self.display.set_pen(self.WHITE)
-            self.display.text(option, 10, 50 + i * 30, scale=3)
+            pen = self.HIGHLIGHT if self.selected_sleep_option == i else self.WHITE
+            self.draw_text(option, 10, 50 + i * 30, 3, pen)
 
     def show_stats(self):
         """Muestra las estadísticas actuales."""
-        self.display.set_pen(self.WHITE)
-        self.display.text(f"Hunger: {round(self.hambre)}", 10, 20, scale=3)
-        self.display.text(f"Sleep: {round(self.sueno)}", 10, 50, scale=3)
-        self.display.text(f"Happiness: {round(self.felicidad)}", 10, 80, scale=3)
-        self.display.text(f"Health: {round(self.salud)}", 10, 110, scale=3)
+        self.draw_text(f"Hunger: {round(self.hambre)}", 10, 20, 3, self.WHITE)
+        self.draw_text(f"Sleep: {round(self.sueno)}", 10, 50, 3, self.WHITE)
+        self.draw_text(f"Happiness: {round(self.felicidad)}", 10, 80, 3, self.WHITE)
+        self.draw_text(f"Health: {round(self.salud)}", 10, 110, 3, self.WHITE)
 
     def navigate(self):
-        """Gestiona la navegación del menú y las interacciones de los botones."""
+        """Gestiona la navegación del menú procesando las pulsaciones pendientes.
+
+        Devuelve True si se ha procesado alguna pulsación.
+        """
+        handled = False
+        if self.button_events is not None:
+            # Pulsaciones capturadas por interrupción, en orden de llegada
+            button = self.button_events.get()
+            while button is not None:
+                self.press(button)
+                handled = True
+                button = self.button_events.get()
+            return handled
+
+        # Sin interrupciones: leer los pines con debounce
         current_time_ms = int(time.ticks_ms())
-
-        if not self.in_menu and not self.in_food_menu and not self.in_entertainment_menu and not self.in_health_menu and not self.in_sleep_menu:
-            # Navegación en el menú principal
-            if not self.buttons['a'].value():
-                if current_time_ms - self.last_press['a'] > self.DEBOUNCE_TIME:
-                    self.selected_icon = (self.selected_icon - 1) % len(self.icons)
-                    self.last_press['a'] = current_time_ms
-            if not self.buttons['b'].value():
-                if current_time_ms - self.last_press['b'] > self.DEBOUNCE_TIME:
-                    self.selected_icon = (self.selected_icon + 1) % len(self.icons)
-                    self.last_press['b'] = current_time_ms
-            if not self.buttons['y'].value():
-                if current_time_ms - self.last_press['y'] > self.DEBOUNCE_TIME:
-                    selected = self.selected_icon
-                    if selected == 3:  # Menu de estadísticas
-                        self.in_menu = True
-                        print("Ingresando al menú de estadísticas.")
-                    elif selected == 0:  # Comida
-                        self.in_food_menu = True
-                        print("Ingresando al menú de comida.")
-                    elif selected == 4:  # Entretenimiento
-                        self.in_entertainment_menu = True
-                        print("Ingresando al menú de entretenimiento.")
-                    elif selected == 5:  # Salud
-                        self.in_health_menu = True
-                        print("Ingresando al menú de salud.")
-                    elif selected == 1:  # Sueño
-                        self.in_sleep_menu = True  # Cambiado para abrir el menú de sueño
-                        print("Ingresando al menú de sueño.")
-                    elif selected == 2:  # Clear
-                        self.clear()
-                    self.last_press['y'] = current_time_ms
-        elif self.in_food_menu:
-            # Navegación en el menú de comida
-            if not self.buttons['a'].value():
-                if current_time_ms - self.last_press['a'] > self.DEBOUNCE_TIME:
-                    self.selected_food = (self.selected_food - 1) % 3
-                    self.last_press['a'] = current_time_ms
-            if not self.buttons['b'].value():
-                if current_time_ms - self.last_press['b'] > self.DEBOUNCE_TIME:
-                    self.selected_food = (self.selected_food + 1) % 3
-                    self.last_press['b'] = current_time_ms
-            if not self.buttons['y'].value():
-                if current_time_ms - self.last_press['y'] > self.DEBOUNCE_TIME:
-                    self.apply_food_effects(self.selected_food)
-                    self.in_food_menu = False
-                    self.last_press['y'] = current_time_ms
-            if not self.buttons['x'].value():
-                if current_time_ms - self.last_press['x'] > self.DEBOUNCE_TIME:
-                    self.in_food_menu = False
-                    self.last_press['x'] = current_time_ms
-        elif self.in_entertainment_menu:
-            # Navegación en el menú de entretenimiento
-            if not self.buttons['a'].value():
-                if current_time_ms - self.last_press['a'] > self.DEBOUNCE_TIME:
-                    self.selected_entertainment = (self.selected_entertainment - 1) % 3
-                    self.last_press['a'] = current_time_ms
-            if not self.buttons['b'].value():
-                if current_time_ms - self.last_press['b'] > self.DEBOUNCE_TIME:
-                    self.selected_entertainment = (self.selected_entertainment + 1) % 3
-                    self.last_press['b'] = current_time_ms
-            if not self.buttons['y'].value():
-                if current_time_ms - self.last_press['y'] > self.DEBOUNCE_TIME:
-                    if self.selected_entertainment == 2 and (time.time() - self.last_festival_time) < 120:
-                        print("Go Festival no está disponible aún")
-                    else:
-                        self.apply_entertainment_effects(self.selected_entertainment)
-                        if self.selected_entertainment == 2:
-                            self.last_festival_time = time.time()
-                        self.in_entertainment_menu = False
-                    self.last_press['y'] = current_time_ms
-            if not self.buttons['x'].value():
-                if current_time_ms - self.last_press['x'] > self.DEBOUNCE_TIME:
-                    self.in_entertainment_menu = False
-                    self.last_press['x'] = current_time_ms
-        elif self.in_health_menu:
-            # Navegación en el menú de salud
-            if not self.buttons['a'].value():
-                if current_time_ms - self.last_press['a'] > self.DEBOUNCE_TIME:
-                    self.selected_health = (self.selected_health - 1) % 2
-                    self.last_press['a'] = current_time_ms
-            if not self.buttons['b'].value():
-                if current_time_ms - self.last_press['b'] > self.DEBOUNCE_TIME:
-                    self.selected_health = (self.selected_health + 1) % 2
-                    self.last_press['b'] = current_time_ms
-            if not self.buttons['y'].value():
-                if current_time_ms - self.last_press['y'] > self.DEBOUNCE_TIME:
-                    if self.selected_health == 1 and (time.time() - self.last_ibuprofen_time) < 28800:
-                        print("Ibuprofeno no está disponible aún")
-                    else:
-                        self.apply_health_effects(self.selected_health)
-                        if self.selected_health == 1:
-                            self.last_ibuprofen_time = time.time()
-                        self.in_health_menu = False
-                    self.last_press['y'] = current_time_ms
-            if not self.buttons['x'].value():
-                if current_time_ms - self.last_press['x'] > self.DEBOUNCE_TIME:
-                    self.in_health_menu = False
-                    self.last_press['x'] = current_time_ms
-        elif self.in_sleep_menu:
-            # Navegación en el menú de sueño
-            if not self.is_sleeping:
-                options = ['A nap', 'Go to sleep']
-            else:
-                options = ['Wake Up']
-
-            if not self.buttons['a'].value():
-                if current_time_ms - self.last_press['a'] > self.DEBOUNCE_TIME:
-                    if not self.is_sleeping and len(options) > 1:
-                        self.selected_sleep_option = (self.selected_sleep_option - 1) % len(options)
-                    self.last_press['a'] = current_time_ms
-            if not self.buttons['b'].value():
-                if current_time_ms - self.last_press['b'] > self.DEBOUNCE_TIME:
-                    if not self.is_sleeping and len(options) > 1:
-                        self.selected_sleep_option = (self.selected_sleep_option + 1) % len(options)
-                    self.last_press['b'] = current_time_ms
-            if not self.buttons['y'].value():
-                if current_time_ms - self.last_press['y'] > self.DEBOUNCE_TIME:
-                    if self.is_sleeping:
-                        self.wake_up()
-                    else:
-                        if self.selected_sleep_option == 0:
-                            self.start_sleep(nap=True)
-                        elif self.selected_sleep_option == 1:
-                            self.start_sleep(nap=False)
-                    self.in_sleep_menu = False
-                    self.last_press['y'] = current_time_ms
-            if not self.buttons['x'].value():
-                if current_time_ms - self.last_press['x'] > self.DEBOUNCE_TIME:
-                    self.in_sleep_menu = False
-                    self.last_press['x'] = current_time_ms
+        for button in ('a', 'b', 'y', 'x'):
+            if not self.buttons[button].value():
+                if time.ticks_diff(current_time_ms, self.last_press[button]) > self.DEBOUNCE_TIME:
+                    self.press(button)
+                    self.last_press[button] = current_time_ms
+                    handled = True
+        return handled
+
+    def input_pending(self):
+        """Indica si hay pulsaciones esperando a ser procesadas."""
+        return self.button_events is not None and self.button_events.pending()
+
+    def press(self, button):
+        """Aplica una pulsación del botón 'a', 'b', 'x' o 'y' a la pantalla actual."""
+        screen = self.screens.top
+        screen.press(self, button)
+        screen.invalidate()
+
+    def push_screen(self, screen):
+        """Abre una pantalla encima de la actual."""
+        self.screens.push(screen)
+
+    def pop_screen(self):
+        """Cierra la pantalla actual y redibuja entera la que queda debajo."""
+        if self.screens.pop().ANIMATED:
+            self.dirty.invalidate()
+
+    def apply_effect(self, effect):
+        """Aplica una acción de la tabla de efectos (effects.EFFECTS) si ninguna estadística que sube pasa del límite."""
+        applied, penalty = pet_model.apply_action(self.stats, self.limiter, effect, time.time())
+        if not applied:
+            print(f"Acción '{effect.option}' rechazada: alguna estadística está por encima del {LIMIT}%.")
+            self.show_status_message(effect.rejected)
         else:
-            # Salir del menú de estadísticas
-            if not self.buttons['x'].value():
-                if current_time_ms - self.last_press['x'] > self.DEBOUNCE_TIME:
-                    self.in_menu = False
-                    self.last_press['x'] = current_time_ms
-
-    def is_stat_over_limit(self, stats):
-        """Verifica si alguna de las estadísticas proporcionadas ya está por encima del 90%."""
-        return any(getattr(self, stat) > 90 for stat in stats)
-
-    def apply_food_effects(self, food_index):
-        """Aplica los efectos según la comida seleccionada."""
-        food_options = ['Coffee', 'Tofu', 'Moscow Mule']
-        selected_food = food_options[food_index]
-        self.record_selection(f'food_{selected_food}')  # Registrar la selección
-
-        # Define qué estadísticas se aumentan para cada opción de comida
-        food_stat_increases = {
-            0: ['hambre', 'felicidad', 'sueno'],      # Coffee
-            1: ['hambre', 'felicidad', 'salud'],      # Tofu
-            2: ['hambre', 'felicidad']                # Moscow Mule
-        }
+            self.show_status_message(effect.message)
+            print(f"{effect.option} seleccionado")
+            for name, repeats in effect.animations:
+                self.enqueue_animation(name, repeats=repeats)
 
-        # Verificar si alguna de las estadísticas que se aumentarían ya está por encima del 90%
-        stats_to_increase = food_stat_increases.get(food_index, [])
-        if self.is_stat_over_limit(stats_to_increase):
-            print(f"Acción '{selected_food}' rechazada: alguna estadística está por encima del 90%.")
-            self.show_status_message("Too full! Can't eat more")
-            self.play_immediately('ass', repeats=3)
-            return
-
-        if food_index == 0:  # Coffee
-            self.hambre = min(100, self.hambre + 5)
-            self.felicidad = min(100, self.felicidad + 10)
-            self.sueno = min(100, self.sueno + 5)
-            self.salud = max(0, self.salud - 2)
-            self.show_status_message("Hunger +5 Happy +10 Sleep +5")
-            print("Café seleccionado")
-            # Encolar únicamente la animación 'happy2' tres veces
-            self.enqueue_animation('happy2', repeats=3)
-        elif food_index == 1:  # Tofu
-            self.hambre = min(100, self.hambre + 30)
-            self.felicidad = min(100, self.felicidad + 5)
-            self.salud = min(100, self.salud + 5)
-            self.show_status_message("Hunger +30 Happy +5 Health +5")
-            print("Tofu seleccionado")
-            # Encolar las animaciones 'eat' que consiste en 16 frames individuales
-            self.enqueue_animation('eat', repeats=1)
-        elif food_index == 2:  # Moscow Mule
-            self.hambre = min(100, self.hambre + 10)
-            self.felicidad = min(100, self.felicidad + 20)
-            self.salud = max(0, self.salud - 10)
-            self.show_status_message("Hunger +10 Happy +20 Health -10")
-            print("Moscow Mule seleccionado")
-            # Encolar la animación 'drunk' dos veces después de seleccionar "Moscow Mule"
-            self.enqueue_animation('drunk', repeats=2)
-
-        # Verificar condiciones para reproducir la animación 'ass' inmediatamente
-        if self.check_high_parameters() or self.check_selection_frequency(f'food_{selected_food}'):
-            self.play_immediately('ass', repeats=3)
-
-    def apply_entertainment_effects(self, entertainment_index):
-        """Aplica los efectos según la opción de entretenimiento seleccionada."""
-        entertainment_options = ['Play Deftones', 'Read Book', 'Go Festival']
-        selected_entertainment = entertainment_options[entertainment_index]
-        self.record_selection(f'entertainment_{selected_entertainment}')  # Registrar la selección
-
-        # Define qué estadísticas se aumentan para cada opción de entretenimiento
-        entertainment_stat_increases = {
-            0: ['felicidad'],          # Play Deftones
-            1: ['felicidad'],          # Read Book
-            2: ['felicidad']           # Go Festival
-        }
-
-        # Verificar si alguna de las estadísticas que se aumentarían ya está por encima del 90%
-        stats_to_increase = entertainment_stat_increases.get(entertainment_index, [])
-        if self.is_stat_over_limit(stats_to_increase):
-            print(f"Acción '{selected_entertainment}' rechazada: alguna estadística está por encima del 90%.")
-            self.show_status_message("Too happy! Need rest")
-            self.play_immediately('ass', repeats=3)
-            return
-
-        if entertainment_index == 0:  # Play Deftones
-            self.felicidad = min(100, self.felicidad + 20)
-            self.show_status_message("Happy +20")
-            print("Play Deftones seleccionado")
-            # Encolar las animaciones 'guitar_1' hasta 'guitar_7' para reproducirlas secuencialmente
-            for i in range(1, 8):
-                self.enqueue_animation(f'guitar_{i}')
-        elif entertainment_index == 1:  # Read Book
-            self.felicidad = min(100, self.felicidad + 10)
-            self.show_status_message("Happy +10")
-            print("Read Book seleccionado")
-        elif entertainment_index == 2:  # Go Festival
-            self.felicidad = min(100, self.felicidad + 50)
-            self.show_status_message("Happy +50")
-            print("Go Festival seleccionado")
-
-        # Verificar condiciones para reproducir la animación 'ass' inmediatamente
-        if self.check_high_parameters() or self.check_selection_frequency(f'entertainment_{selected_entertainment}'):
-            self.play_immediately('ass', repeats=3)
-
-    def apply_health_effects(self, health_index):
-        """Aplica los efectos según la opción de salud seleccionada."""
-        health_options = ['A hug', 'Ibuprofeno']
-        selected_health = health_options[health_index]
-        self.record_selection(f'health_{selected_health}')  # Registrar la selección
-
-        # Define qué estadísticas se aumentan para cada opción de salud
-        health_stat_increases = {
-            0: ['salud', 'felicidad'],   # A hug
-            1: ['salud']                  # Ibuprofeno
-        }
-
-        # Verificar si alguna de las estadísticas que se aumentarían ya está por encima del 90%
-        stats_to_increase = health_stat_increases.get(health_index, [])
-        if self.is_stat_over_limit(stats_to_increase):
-            print(f"Acción '{selected_health}' rechazada: alguna estadística está por encima del 90%.")
-            self.show_status_message("Too healthy! No need")
-            self.play_immediately('ass', repeats=3)
-            return
-
-        if health_index == 0:  # A hug
-            self.salud = min(100, self.salud + 10)
-            self.felicidad = min(100, self.felicidad + 15)
-            self.show_status_message("Health +10 Happy +15")
-            print("A hug seleccionado")
-            # Encolar las animaciones 'love_1' y 'love_2' en secuencia, repetidas dos veces
-            for _ in range(2):
-                self.enqueue_animation('love_1')
-                self.enqueue_animation('love_2')
-        elif health_index == 1:  # Ibuprofeno
-            self.salud = min(100, self.salud + 30)
-            self.show_status_message("Health +30")
-            print("Ibuprofeno seleccionado")
-            # Encolar la animación 'talk' dos veces después de seleccionar "Ibuprofeno"
-            self.enqueue_animation('talk', repeats=2)
-
-        # Verificar condiciones para reproducir la animación 'ass' inmediatamente
-        if self.check_high_parameters() or self.check_selection_frequency(f'health_{selected_health}'):
+        # Reproducir la animación 'ass' inmediatamente si se ha rechazado, hay parámetros altos o se repite demasiado
+        if penalty:
             self.play_immediately('ass', repeats=3)
 
     def start_sleep(self, nap=False):
         """Inicia el sueño de la mascota por la duración especificada."""
         self.is_sleeping = True
-        if nap:
-            self.sleep_end_time = time.time() + 20 * 60  # 20 minutos
-            self.sueno = min(100, self.sueno + 20)      # Incremento de sueño por la siesta
-            self.show_status_message("Sleep +20")
-            print(f"Sueño incrementado a: {self.sueno}")
-            sleep_duration = "20 minutos"
-        else:
-            self.sleep_end_time = time.time() + 6 * 60 * 60  # 6 horas
-            self.sueno = min(100, self.sueno + 60)           # Incremento de sueño por dormir
-            self.show_status_message("Sleep +60")
-            print(f"Sueño incrementado a: {self.sueno}")
-            sleep_duration = "6 horas"
-
-        print(f"Pet started sleeping for {sleep_duration}.")
-        # Encolar las animaciones 'sleep_1' y 'sleep_2' repetidamente
-        self.enqueue_animation('sleep_1', repeats=20)  # Ajusta el número de repeticiones según sea necesario
-        self.enqueue_animation('sleep_2', repeats=20)
+        now = time.time()
+        self.sleep_end_time, effect = pet_model.fall_asleep(self.stats, now, nap)
+        self.show_status_message(effect.message)
+        print(f"Sueño incrementado a: {self.sueno}")
+
+        print(f"Pet started sleeping for {round((self.sleep_end_time - now) / 60)} minutes.")
+        # Alternar 'sleep_1' y 'sleep_2' en bucle hasta despertar; las reacciones las interrumpen
+        self.animation_queue.set_state(('sleep_1', 'sleep_2'))
+        if self.animation_queue.is_idle(self.current_animation):
+            self.trigger_next_animation()
 
     def wake_up(self):
         """Despierta a la mascota."""
@@ -896,7 +1131,10 @@ class Menu:
         self.sleep_end_time = 0
         print("Pet woke up.")
         # Limpiar la cola de animaciones de sueño y volver a la animación por defecto
-        self.animation_queue = []
+        self.animation_queue.clear()
+        self.animation_queue.set_state(())
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
         self.start_animation('default')
 
     def check_sleep_status(self):
@@ -906,27 +1144,33 @@ class Menu:
 
     def clear(self):
         """Incrementa las estadísticas de salud y felicidad y ejecuta animaciones de enojo."""
-        self.salud = min(100, self.salud + 10)
-        self.felicidad = min(100, self.felicidad + 5)
-        self.show_status_message("Health +10 Happy +5")
+        apply_deltas(self.stats, CLEAR.deltas)
+        self.show_status_message(CLEAR.message)
         self.poop_visible = False  # Ocultar la imagen 'poop.png' al limpiar
-        self.next_poop_time = time.time() + random.uniform(60, 120)  # Reprogramar la próxima aparición
+        self.next_poop_time = pet_model.next_poop_time(time.time())  # Reprogramar la próxima aparición
         print(f"Salud incrementado a: {self.salud}")
         print(f"Felicidad incrementado a: {self.felicidad}")
         # Encolar las animaciones 'angry_1' y 'angry_2' dos veces cada una
-        self.enqueue_animation('angry_1', repeats=2)
-        self.enqueue_animation('angry_2', repeats=2)
+        for name, repeats in CLEAR.animations:
+            self.enqueue_animation(name, repeats=repeats)
 
     def play_immediately(self, animation_name, repeats=1):
-        """Reproduce una animación inmediatamente, interrumpiendo la cola actual."""
-        # Limpiar la cola de animaciones
-        self.animation_queue = []
-        # Encolar la animación con las repeticiones deseadas
-        self.enqueue_animation(animation_name, repeats=repeats)
+        """Reproduce una animación inmediatamente, por delante del resto de la cola."""
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()  # Lo precargado era para la cola de antes de la reacción
+        # Encolar la animación con prioridad; lo que ya estaba encolado se reanuda después
+        self.animation_queue.push(animation_name, repeats, PRIORITY_IMMEDIATE)
         # Iniciar la animación inmediatamente
         self.trigger_next_animation()
         print(f"Reproduciendo animación '{animation_name}' inmediatamente con {repeats} repetición(es).")
 
+    def poop_key(self):
+        """Entero con la posición de la caca, o 0 si no está visible (se compara sin crear tuplas)."""
+        if not self.poop_visible:
+            return 0
+        x, y = self.poop_position
+        return 1 << 16 | x << 8 | y
+
     def update_poop(self):
         """Gestiona la aparición aleatoria de la imagen 'poop.png'."""
         current_time = time.time()
@@ -953,13 +1197,24 @@ class Menu:
             self.poop_visible = True
             print(f"'poop.png' apareció en el lado {side} en posición {self.poop_position}")
 
-# Creación de la instancia del menú
-menu = Menu()
-
-# Bucle principal
-while True:
-    menu.draw_menu()
-    menu.navigate()
-    menu.check_sleep_status()  # Verificar el estado de sueño
-    menu.update_poop()         # Verificar y actualizar la aparición de 'poop.png'
-    time.sleep(1.0 / 20)       # Actualizar a 20 FPS
+if __name__ == '__main__':
+    # Creación de la instancia del menú
+    menu = Menu()
+    clock = FrameClock(Menu.TARGET_FPS)
+    governor = PowerGovernor(menu, clock)  # Ajusta fps, retroiluminación y lightsleep según el estado
+
+    # Bucle principal
+    while True:
+        menu.draw_menu()
+        handled = menu.navigate()
+        menu.apply_due_stats()     # Minutos contados por el Timer de las estadísticas
+        menu.check_sleep_status()  # Verificar el estado de sueño
+        menu.update_poop()         # Verificar y actualizar la aparición de 'poop.png'
+        if menu.state_log is not None:
+            menu.state_log.update(menu)  # Guardar el estado si ha cambiado (agrupando escrituras)
+        if menu.profiler is not None:
+            menu.profiler.poll_serial()  # Comando `p` por el puerto serie: volcar el perfil
+        governor.update(handled)
+        menu.prefetch(clock.remaining_ms())  # Precargar la siguiente animación en el tiempo libre del frame
+        menu.collect_garbage(clock.remaining_ms())  # Recoger basura solo en el tiempo libre del frame
+        clock.wait(menu.input_pending)  # Esperar al siguiente frame o a una pulsación
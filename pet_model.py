@@ -0,0 +1,121 @@
+"""Reglas de la mascota sin hardware: bajada de estadísticas, acciones, sueño y caca.
+
+`Menu` aplica estas funciones sobre su propio estado y `PetModel` es una
+mascota completa sin display ni temporizadores, para simulaciones en el host
+(tools/host/fleet.py replica estas mismas reglas con arrays de NumPy para
+miles de mascotas a la vez). El tiempo siempre se pasa como argumento en
+segundos de `time.time()`, así que el modelo no depende del reloj real.
+"""
+import random
+from array import array
+
+from effects import LIMIT, CLEAR, NAP, SLEEP_NIGHT, apply_deltas, over_limit
+from rate_limit import RateLimiter
+
+HUNGER_DECAY = 0.023148     # 100% -> 0% in 72 hours
+SLEEP_DECAY = 0.069444      # 100% -> 0% in 24 hours
+HAPPINESS_DECAY = 0.034722  # 100% -> 0% in 48 hours
+DECAY = array('f', (HUNGER_DECAY, SLEEP_DECAY, HAPPINESS_DECAY, 0))  # Por minuto, en el orden de effects.STAT_NAMES; Health does not decrease with time
+
+NAP_S = 20 * 60             # 20 minutos
+NIGHT_S = 6 * 60 * 60       # 6 horas
+POOP_MIN_S = 60             # La caca aparece entre 1 y 2 minutos después de limpiar
+POOP_MAX_S = 120
+
+SELECTION_LIMIT = 2  # Más selecciones de una opción que estas en la ventana provocan la animación 'ass'
+SELECTION_WINDOW_S = 60
+COOLDOWNS = {'festival': 120, 'ibuprofen': 28800}  # Tiempo de espera de cada acción, en segundos
+
+
+def decay(stats, minutes):
+    """Aplica `minutes` minutos de bajada de estadísticas en un solo paso (lineal y con suelo en 0)."""
+    for i in range(len(stats)):
+        stats[i] = max(0, stats[i] - DECAY[i] * minutes)
+
+
+def high_stats(stats):
+    """Indica si alguna estadística supera el límite (la mascota se harta)."""
+    for value in stats:
+        if value > LIMIT:
+            return True
+    return False
+
+
+def apply_action(stats, limiter, effect, now):
+    """Registra y aplica una acción de la tabla de efectos.
+
+    Devuelve (aplicada, castigo): no se aplica si alguna estadística que
+    sube ya pasa del límite, y hay castigo (la animación 'ass') si se
+    rechaza, si queda alguna estadística alta o si se repite demasiado.
+    """
+    limiter.record(effect.action, now)
+    if over_limit(stats, effect.limited):
+        return False, True
+    apply_deltas(stats, effect.deltas)
+    return True, high_stats(stats) or limiter.exceeded(effect.action, SELECTION_LIMIT, SELECTION_WINDOW_S, now)
+
+
+def fall_asleep(stats, now, nap=False):
+    """Aplica el efecto de la siesta o de la noche; devuelve (fin del sueño, efecto)."""
+    effect = NAP if nap else SLEEP_NIGHT
+    apply_deltas(stats, effect.deltas)
+    return now + (NAP_S if nap else NIGHT_S), effect
+
+
+def next_poop_time(now, rng=random):
+    return now + rng.randint(POOP_MIN_S, POOP_MAX_S)
+
+
+class PetModel:
+    """Una mascota sin hardware que avanza con el tiempo que se le indica."""
+
+    def __init__(self, now=0, rng=random):
+        self.rng = rng
+        self.stats = array('f', (70, 70, 70, 70))
+        self.limiter = RateLimiter(capacity=SELECTION_LIMIT + 1)
+        self.is_sleeping = False
+        self.sleep_end_time = 0
+        self.poop_visible = False
+        self.next_poop_time = next_poop_time(now, rng)
+        self.now = now
+        self.penalties = 0  # Veces que se habría reproducido la animación 'ass'
+        self.rejected = 0
+
+    def advance(self, now):
+        """Lleva el estado hasta `now`: bajada de estadísticas, fin del sueño y aparición de la caca."""
+        if now > self.now:
+            decay(self.stats, (now - self.now) / 60)
+            self.now = now
+        if self.is_sleeping and now >= self.sleep_end_time:
+            self.wake_up()
+        if not self.poop_visible and now >= self.next_poop_time:
+            self.poop_visible = True
+
+    def cooldown_active(self, action):
+        return self.limiter.remaining(action, COOLDOWNS[action], self.now) > 0
+
+    def act(self, effect):
+        """Elige una opción de menú como lo hacen las pantallas; devuelve False si estaba en espera."""
+        if effect.cooldown is not None and self.cooldown_active(effect.cooldown):
+            return False
+        applied, penalty = apply_action(self.stats, self.limiter, effect, self.now)
+        if not applied:
+            self.rejected += 1
+        if penalty:
+            self.penalties += 1
+        if effect.cooldown is not None:
+            self.limiter.record(effect.cooldown, self.now)
+        return True
+
+    def start_sleep(self, nap=False):
+        self.is_sleeping = True
+        self.sleep_end_time, _ = fall_asleep(self.stats, self.now, nap)
+
+    def wake_up(self):
+        self.is_sleeping = False
+        self.sleep_end_time = 0
+
+    def clear(self):
+        apply_deltas(self.stats, CLEAR.deltas)
+        self.poop_visible = False
+        self.next_poop_time = next_poop_time(self.now, self.rng)
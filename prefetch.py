@@ -0,0 +1,94 @@
+"""Precarga de la siguiente animación de la cola en el tiempo libre de los frames.
+
+Al cambiar de animación, el primer frame de la nueva paga la apertura y la
+decodificación de un PNG distinto justo cuando el usuario espera la
+reacción. Cuando un frame termina antes de tiempo, `step` decodifica con
+`FrameCache` uno de los primeros frames de la animación que seguirá a la
+actual y lo deja en un área de espera con su propio presupuesto de bytes.
+Al empezar esa animación, `started` pasa lo precargado a la caché de
+frames; si empieza otra (play_immediately, wake_up) se descarta.
+"""
+import gc
+import time
+
+from anim_registry import frame_file, frame_key, frame_source
+from frame_cache import entry_size
+
+
+class Prefetcher:
+    def __init__(self, frame_cache, max_bytes=14 * 1024, min_idle_ms=10, sprites=None):
+        self.frame_cache = frame_cache
+        self.max_bytes = max_bytes
+        self.min_idle_ms = min_idle_ms
+        self.sprites = sprites  # Los frames de los sprites RLE no se decodifican: no se precargan
+        self.target = None  # Animación (registro de anim_registry) que se está precargando
+        self.staged = {}  # frame_key -> entrada de FrameCache (None si no se puede capturar)
+        self.bytes_used = 0
+        self.cost_ms = 0  # Lo que tardó la última precarga; no se empieza otra con menos tiempo libre
+        self.frames = 0  # Frames precargados
+        self.used = 0  # Frames precargados que llegaron a la caché al empezar su animación
+        self.cancelled = 0  # Frames precargados descartados
+
+    def step(self, anim, idle_ms):
+        """Precarga un frame de `anim` si cabe en `idle_ms`. Devuelve True si ha decodificado."""
+        if anim is not self.target:
+            self.cancel()
+            self.target = anim
+        if anim is None or idle_ms < max(self.min_idle_ms, self.cost_ms):
+            return False
+        cache = self.frame_cache
+        # Solo los primeros frames que caben en el presupuesto, recorridos desde el principio
+        # cada vez: uno que estaba en la caché puede haberse descartado (p. ej. al repetir la actual)
+        size = entry_size(anim.rect[2], anim.rect[3])
+        prefix = 0
+        for i in range(anim.num_frames):
+            key = frame_key(anim, i)
+            if self.is_sprite(key):
+                continue
+            prefix += size
+            if prefix > self.max_bytes:
+                return False
+            if key in self.staged or key in cache.entries:
+                continue
+            if cache.min_free and hasattr(gc, 'mem_free') and gc.mem_free() < cache.min_free + size:
+                return False  # Se reintenta después de la próxima recolección
+            t0 = time.ticks_ms()
+            try:
+                entry = cache.fetch(frame_file(anim, i), frame_source(anim, i))
+            except MemoryError:
+                self.cancel()
+                return False
+            self.cost_ms = time.ticks_diff(time.ticks_ms(), t0)
+            self.staged[key] = entry
+            if entry is not None:
+                self.bytes_used += size
+                self.frames += 1
+            return True
+        return False
+
+    def is_sprite(self, key):
+        return self.sprites is not None and key in self.sprites.keys
+
+    def started(self, anim):
+        """Empieza `anim`: si es la precargada, sus frames pasan a la caché de frames."""
+        if anim is self.target:
+            cache = self.frame_cache
+            for key, entry in self.staged.items():
+                if entry is not None and key not in cache.entries:
+                    cache.store(key, entry)
+                    self.used += 1
+            self.staged = {}
+        self.cancel()
+
+    def cancel(self):
+        """Descarta lo precargado (la cola ha cambiado)."""
+        for entry in self.staged.values():
+            if entry is not None:
+                self.cancelled += 1
+        self.staged = {}
+        self.bytes_used = 0
+        self.target = None
+
+    def report(self):
+        return [f"precarga: {self.frames} frames, {self.used} usados, {self.cancelled} descartados, "
+                f"{self.bytes_used} bytes en espera, última {self.cost_ms} ms"]
@@ -0,0 +1,162 @@
+"""Perfilador de frames: tiempos por etapa con `ticks_us` en colas circulares de tamaño fijo.
+
+Etapas: decodificación/copia del murciélago, iconos (y caca), texto, envío al
+display, gc.collect y el frame completo. Cada etapa acumula los µs del frame
+en curso y `end_frame()` los guarda en su cola de SIZE muestras, de la que
+se sacan mín/media/p95/máx. Los frames en los que empieza una animación
+nueva se guardan además en su propia cola (fila `cambio`): son los que
+pagan la apertura y decodificación del primer frame de otro PNG.
+
+Menu solo llama a las sondas cuando `menu.profile` no es None, así que con
+el perfilador apagado cada sonda cuesta una comprobación de atributo. Se
+enciende y apaga con el combo oculto (X tres veces seguidas en la pantalla
+principal), que también muestra la superposición en pantalla; escribir `p`
+y Enter por el puerto serie USB vuelca las estadísticas.
+"""
+import time
+from array import array
+
+try:
+    import select
+    import sys
+except ImportError:
+    select = None
+
+STAGE_PET = 0
+STAGE_ICONS = 1
+STAGE_TEXT = 2
+STAGE_UPDATE = 3
+STAGE_GC = 4
+STAGE_FRAME = 5
+STAGE_NAMES = ('pet', 'icons', 'text', 'update', 'gc', 'frame')
+
+
+def sample_stats(samples, count):
+    """(mín, media, p95, máx) de las `count` primeras muestras."""
+    if not count:
+        return 0, 0, 0, 0
+    values = sorted(samples[:count])
+    return values[0], sum(values) // count, values[min(count - 1, count * 95 // 100)], values[-1]
+
+
+class FrameProfiler:
+    SIZE = 64  # Muestras por etapa (potencia de dos)
+    BOUNDARY_SIZE = 16  # Muestras de frames con cambio de animación (potencia de dos)
+    REFRESH_MS = 1000  # Cada cuánto se recalculan las líneas de la superposición
+    COMBO_BUTTON = 'x'
+    COMBO_PRESSES = 3
+    COMBO_WINDOW_MS = 1500  # Las pulsaciones del combo tienen que caber en esta ventana
+
+    def __init__(self):
+        self.samples = [array('i', [0] * self.SIZE) for _ in STAGE_NAMES]
+        self.current = array('i', [0] * len(STAGE_NAMES))
+        self.index = 0
+        self.count = 0  # Muestras válidas en cada cola (hasta SIZE)
+        self.boundary = array('i', [0] * self.BOUNDARY_SIZE)
+        self.boundary_index = 0
+        self.boundary_count = 0
+        self.frame_start = 0
+        self.lines = []
+        self.version = 0  # Cambia cada vez que se recalculan las líneas
+        self.last_refresh = time.ticks_ms()
+        self.combo_times = array('i', [0] * self.COMBO_PRESSES)
+        self.combo_index = 0
+        self.sources = []  # Otros objetos con report() que se incluyen en el volcado (p. ej. DualCoreFlush)
+        self.poll = None
+        if select is not None and hasattr(select, 'poll'):
+            try:
+                self.poll = select.poll()
+                self.poll.register(sys.stdin, select.POLLIN)
+            except (OSError, ValueError, AttributeError):
+                self.poll = None
+
+    def start(self):
+        return time.ticks_us()
+
+    def stop(self, stage, t0):
+        self.current[stage] += time.ticks_diff(time.ticks_us(), t0)
+
+    def begin_frame(self):
+        self.frame_start = time.ticks_us()
+
+    def end_frame(self, boundary=False):
+        """Guarda los tiempos acumulados del frame y pone los contadores a cero.
+
+        `boundary` indica que en este frame se ha dibujado el primero de una animación nueva.
+        """
+        self.stop(STAGE_FRAME, self.frame_start)
+        if boundary:
+            self.boundary[self.boundary_index] = self.current[STAGE_FRAME]
+            self.boundary_index = (self.boundary_index + 1) & (self.BOUNDARY_SIZE - 1)
+            if self.boundary_count < self.BOUNDARY_SIZE:
+                self.boundary_count += 1
+        i = self.index
+        for stage in range(len(STAGE_NAMES)):
+            self.samples[stage][i] = self.current[stage]
+            self.current[stage] = 0
+        self.index = (i + 1) & (self.SIZE - 1)
+        if self.count < self.SIZE:
+            self.count += 1
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self.last_refresh) >= self.REFRESH_MS:
+            self.last_refresh = now
+            self.lines = self.report()
+            self.version += 1
+
+    def reset(self):
+        self.index = 0
+        self.count = 0
+        self.boundary_index = 0
+        self.boundary_count = 0
+        for stage in range(len(STAGE_NAMES)):
+            self.current[stage] = 0
+        self.lines = []
+        self.version += 1
+
+    def stage_stats(self, stage):
+        """(mín, media, p95, máx) en µs de las muestras de una etapa."""
+        return sample_stats(self.samples[stage], self.count)
+
+    def boundary_stats(self):
+        """(mín, media, p95, máx) en µs de los frames con cambio de animación."""
+        return sample_stats(self.boundary, self.boundary_count)
+
+    def report(self):
+        lines = [f"{'us':<6}{'min':>6}{'avg':>6}{'p95':>6}{'max':>6}"]
+        for stage, name in enumerate(STAGE_NAMES):
+            lo, avg, p95, hi = self.stage_stats(stage)
+            lines.append(f"{name:<6}{lo:6d}{avg:6d}{p95:6d}{hi:6d}")
+        if self.boundary_count:
+            lo, avg, p95, hi = self.boundary_stats()
+            lines.append(f"{'cambio':<6}{lo:6d}{avg:6d}{p95:6d}{hi:6d}")
+        return lines
+
+    def dump(self):
+        print(f"Perfil de los últimos {self.count} frames:")
+        for line in self.report():
+            print(line)
+        for source in self.sources:
+            for line in source.report():
+                print(line)
+
+    def combo(self, button):
+        """Registra una pulsación; devuelve True al completar el combo oculto."""
+        if button != self.COMBO_BUTTON:
+            return False
+        now = time.ticks_ms()
+        self.combo_times[self.combo_index] = now
+        self.combo_index = (self.combo_index + 1) % self.COMBO_PRESSES
+        # La pulsación más antigua de la ventana es la que se sobrescribirá a continuación
+        oldest = self.combo_times[self.combo_index]
+        if oldest and time.ticks_diff(now, oldest) <= self.COMBO_WINDOW_MS:
+            for i in range(self.COMBO_PRESSES):
+                self.combo_times[i] = 0
+            return True
+        return False
+
+    def poll_serial(self):
+        """Atiende el comando `p` del puerto serie sin bloquear."""
+        if self.poll is None or not self.poll.poll(0):
+            return
+        if sys.stdin.readline().strip() == 'p':
+            self.dump()
@@ -0,0 +1,84 @@
+"""Limitador de frecuencia: las últimas marcas de tiempo de cada acción en colas circulares preasignadas.
+
+Cada acción ocupa `capacity` enteros de un único `array('i')` reservado al
+crearse, así que la memoria no crece por mucho que se use ni por cuánto
+tiempo esté encendido el dispositivo. Las acciones se registran la primera
+vez que se usan, hasta `max_actions`.
+
+Las marcas son segundos de `time.time()` (no ticks) para que los tiempos de
+espera se puedan guardar en el log de estado y sigan valiendo tras apagar.
+
+    limiter.exceeded('food_Tofu', 2, 60, now)   # ¿más de 2 veces en 60 s?
+    limiter.remaining('festival', 120, now)     # segundos de espera que quedan
+
+Todas las consultas son O(1): la marca k-ésima más reciente está en una
+posición fija respecto a la cabeza de la cola.
+"""
+from array import array
+
+
+class RateLimiter:
+    def __init__(self, max_actions=16, capacity=3):
+        self.capacity = capacity
+        self.max_actions = max_actions
+        self.ids = {}  # acción -> índice de su cola
+        self.times = array('i', [0] * (max_actions * capacity))
+        self.heads = array('B', [0] * max_actions)   # Posición de la próxima escritura
+        self.counts = array('B', [0] * max_actions)  # Marcas válidas (hasta capacity)
+
+    def slot(self, action):
+        i = self.ids.get(action)
+        if i is None:
+            i = len(self.ids)
+            if i >= self.max_actions:
+                raise ValueError(f"Demasiadas acciones en el limitador: {action}")
+            self.ids[action] = i
+        return i
+
+    def recent(self, i, k):
+        """Marca k-ésima más reciente de la cola `i` (0 es la última)."""
+        return self.times[i * self.capacity + (self.heads[i] - 1 - k) % self.capacity]
+
+    def record(self, action, now):
+        i = self.slot(action)
+        head = self.heads[i]
+        self.times[i * self.capacity + head] = int(now)
+        self.heads[i] = (head + 1) % self.capacity
+        if self.counts[i] < self.capacity:
+            self.counts[i] += 1
+
+    def exceeded(self, action, n, window, now):
+        """True si la acción se ha registrado más de `n` veces (n < capacity) en los últimos `window` s."""
+        i = self.slot(action)
+        return self.counts[i] > n and now - self.recent(i, n) <= window
+
+    def last(self, action):
+        """Marca del último registro, o 0 si no hay ninguno."""
+        i = self.slot(action)
+        return self.recent(i, 0) if self.counts[i] else 0
+
+    def set_last(self, action, when):
+        """Sustituye la marca del último registro (0 lo borra todo); para restaurar el estado."""
+        i = self.slot(action)
+        if not when:
+            self.counts[i] = 0
+            self.heads[i] = 0
+        elif not self.counts[i]:
+            self.record(action, when)
+        else:
+            self.times[i * self.capacity + (self.heads[i] - 1) % self.capacity] = int(when)
+
+    def remaining(self, action, period, now):
+        """Segundos que faltan para que pasen `period` s desde el último registro (0 si ya han pasado)."""
+        i = self.slot(action)
+        if not self.counts[i]:
+            return 0
+        left = self.recent(i, 0) + period - now
+        return left if left > 0 else 0
+
+    def shift(self, delta):
+        """Desplaza todas las marcas `delta` segundos (p. ej. si el RTC se ha reiniciado)."""
+        delta = int(delta)
+        times = self.times
+        for j in range(len(times)):
+            times[j] += delta
@@ -0,0 +1,224 @@
+"""Pila de pantallas: la pantalla activa recibe las pulsaciones y decide cuándo se redibuja.
+
+La pantalla principal está siempre en el fondo de la pila y los menús se
+apilan encima al abrirlos. `Menu` despacha al tope de la pila sin recorrer
+banderas, así que cambiar de pantalla o atender una pulsación es O(1).
+
+Las pantallas animadas (ANIMATED = True) se dibujan en cada frame. Las
+estáticas devuelven en `state(menu)` un entero con todo lo que cambia su
+aspecto, y solo se redibujan cuando cambia ese entero (o la caca, el mensaje
+de estado o el perfilador) o cuando se llama a `invalidate()`; el resto de
+frames no tocan el framebuffer ni el SPI, y comparar no crea objetos.
+"""
+from effects import EFFECTS
+
+# Resultado de `Screen.changed`
+REDRAW_NONE = 0
+REDRAW_OVERLAY = 1  # Solo cambian el mensaje de estado o el perfilador: se restaura el fondo
+REDRAW_ALL = 2
+
+
+class Screen:
+    NAME = None
+    ANIMATED = False
+
+    def __init__(self):
+        self.drawn = False  # False obliga a redibujar
+        # Lo que se dibujó la última vez; se actualiza en su sitio
+        self.drawn_state = 0
+        self.drawn_poop = 0
+        self.drawn_status = None
+        self.drawn_profile = 0
+
+    def invalidate(self):
+        self.drawn = False
+
+    def changed(self, menu, profile):
+        """Compara lo que cambia el aspecto de la pantalla con el último dibujo y lo recuerda.
+
+        `profile` es la versión de las líneas del perfilador (-1 si está apagado).
+        Devuelve REDRAW_NONE, REDRAW_OVERLAY o REDRAW_ALL.
+        """
+        state = self.state(menu)
+        poop = menu.poop_key()
+        status = menu.status_message
+        if self.drawn and state == self.drawn_state and poop == self.drawn_poop:
+            if status == self.drawn_status and profile == self.drawn_profile:
+                return REDRAW_NONE
+            redraw = REDRAW_OVERLAY
+        else:
+            redraw = REDRAW_ALL
+        self.drawn = True
+        self.drawn_state = state
+        self.drawn_poop = poop
+        self.drawn_status = status
+        self.drawn_profile = profile
+        return redraw
+
+    def state(self, menu):
+        """Entero pequeño con el estado que cambia el aspecto de la pantalla."""
+        return 0
+
+    def draw(self, menu):
+        """Dibuja la parte estática de la pantalla (el fondo ya está limpio)."""
+
+    def press(self, menu, button):
+        """Aplica una pulsación del botón 'a', 'b', 'x' o 'y'."""
+
+
+class MainScreen(Screen):
+    NAME = 'main'
+    ANIMATED = True
+
+    # Icono seleccionado -> pantalla que abre
+    OPENS = {0: 'food', 1: 'sleep', 3: 'stats', 4: 'entertainment', 5: 'health'}
+
+    def press(self, menu, button):
+        if button == 'a':
+            menu.selected_icon = (menu.selected_icon - 1) % len(menu.icons)
+        elif button == 'b':
+            menu.selected_icon = (menu.selected_icon + 1) % len(menu.icons)
+        elif button == 'y':
+            selected = menu.selected_icon
+            if selected == 2:  # Clear
+                menu.clear()
+            elif selected in self.OPENS:
+                screen = menu.screens.get(self.OPENS[selected])
+                print(f"Ingresando al menú de {screen.TITLE}.")
+                menu.push_screen(screen)
+        elif button == 'x' and menu.profiler is not None and menu.profiler.combo(button):
+            menu.toggle_profile()  # Combo oculto del perfilador
+
+
+class OptionsScreen(Screen):
+    """Menú de acciones de la tabla de efectos: A/B mueven la selección, Y la aplica y X sale."""
+    HEADER = "Select type"
+    SELECTED = None  # Atributo de Menu con la opción seleccionada
+
+    def state(self, menu):
+        selected = getattr(menu, self.SELECTED)
+        cooldown = EFFECTS[self.NAME][selected].cooldown
+        return selected << 1 | (cooldown is not None and menu.cooldown_active(cooldown))
+
+    def draw(self, menu):
+        menu.show_options_menu(self.HEADER, EFFECTS[self.NAME], getattr(menu, self.SELECTED))
+
+    def press(self, menu, button):
+        options = EFFECTS[self.NAME]
+        selected = getattr(menu, self.SELECTED)
+        if button == 'a':
+            setattr(menu, self.SELECTED, (selected - 1) % len(options))
+        elif button == 'b':
+            setattr(menu, self.SELECTED, (selected + 1) % len(options))
+        elif button == 'y':
+            effect = options[selected]
+            if effect.cooldown is not None and menu.cooldown_active(effect.cooldown):
+                print(f"{effect.option} no está disponible aún")
+            else:
+                menu.apply_effect(effect)
+                if effect.cooldown is not None:
+                    menu.start_cooldown(effect.cooldown)
+                menu.pop_screen()
+        elif button == 'x':
+            menu.pop_screen()
+
+
+class FoodScreen(OptionsScreen):
+    NAME = 'food'
+    TITLE = 'comida'
+    HEADER = "Select food"
+    SELECTED = 'selected_food'
+
+
+class EntertainmentScreen(OptionsScreen):
+    NAME = 'entertainment'
+    TITLE = 'entretenimiento'
+    SELECTED = 'selected_entertainment'
+
+
+class HealthScreen(OptionsScreen):
+    NAME = 'health'
+    TITLE = 'salud'
+    SELECTED = 'selected_health'
+
+
+class SleepScreen(Screen):
+    NAME = 'sleep'
+    TITLE = 'sueño'
+
+    def state(self, menu):
+        return menu.selected_sleep_option << 1 | menu.is_sleeping
+
+    def draw(self, menu):
+        menu.show_sleep_menu()
+
+    def press(self, menu, button):
+        if button == 'a':
+            if not menu.is_sleeping:
+                menu.selected_sleep_option = (menu.selected_sleep_option - 1) % 2
+        elif button == 'b':
+            if not menu.is_sleeping:
+                menu.selected_sleep_option = (menu.selected_sleep_option + 1) % 2
+        elif button == 'y':
+            if menu.is_sleeping:
+                menu.wake_up()
+            elif menu.selected_sleep_option == 0:
+                menu.start_sleep(nap=True)
+            elif menu.selected_sleep_option == 1:
+                menu.start_sleep(nap=False)
+            menu.pop_screen()
+        elif button == 'x':
+            menu.pop_screen()
+
+
+class StatsScreen(Screen):
+    NAME = 'stats'
+    TITLE = 'estadísticas'
+
+    def state(self, menu):
+        # 7 bits por estadística (STAT_MAX = 100): cabe en un entero pequeño
+        return round(menu.hambre) << 21 | round(menu.sueno) << 14 | round(menu.felicidad) << 7 | round(menu.salud)
+
+    def draw(self, menu):
+        menu.show_stats()
+
+    def press(self, menu, button):
+        # Salir del menú de estadísticas
+        if button == 'x':
+            menu.pop_screen()
+
+
+class ScreenStack:
+    def __init__(self, screens):
+        self.by_name = {}
+        for screen in screens:
+            self.by_name[screen.NAME] = screen
+        self.stack = [screens[0]]
+        self.top = screens[0]
+
+    def get(self, name):
+        return self.by_name[name]
+
+    def push(self, screen):
+        self.stack.append(screen)
+        self.top = screen
+        screen.invalidate()
+
+    def pop(self):
+        """Vuelve a la pantalla anterior; la del fondo no se desapila nunca."""
+        if len(self.stack) > 1:
+            self.stack.pop()
+            self.top = self.stack[-1]
+            self.top.invalidate()
+        return self.top
+
+    def reset(self):
+        """Cierra todos los menús y vuelve a la pantalla del fondo."""
+        del self.stack[1:]
+        self.top = self.stack[0]
+        self.top.invalidate()
+
+
+def default_screens():
+    return ScreenStack([MainScreen(), FoodScreen(), EntertainmentScreen(),
+                        HealthScreen(), SleepScreen(), StatsScreen()])
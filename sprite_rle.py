@@ -0,0 +1,225 @@
+"""Sprites RLE: frames con paleta, con los tramos transparentes y opacos codificados por filas.
+
+El paquete usa la cabecera, el índice y la tabla de nombres de `atlas.py`
+(magic b'RLE2'), generado por tools/build_rle.py a partir de los PNG. Los
+datos de cada frame son:
+
+    1 byte con el número de colores de la paleta menos uno y 1 byte de relleno
+    la paleta: un color RGB565 big-endian por entrada, tal cual los espera el framebuffer
+    por fila: 1 byte con el número de tramos opacos, y por tramo:
+        1 byte de píxeles transparentes a saltar desde el tramo anterior
+        1 byte con el número de series del tramo, y por serie:
+            n < 128: n píxeles del color de índice del byte siguiente
+            n >= 128: n - 128 píxeles sueltos, un índice de la paleta por píxel
+
+Los sprites son pixel art con pocos colores y series largas del mismo
+color, así que el paquete ocupa en flash del orden de los PNG. Dibujar
+un frame es leerlo del archivo con un `seek` + `readinto` y recorrer las
+series escribiendo colores de la paleta en el framebuffer: no hay
+descompresión ni máscara, y los píxeles transparentes no cuestan nada.
+"""
+import sys
+
+from atlas import Atlas
+
+RLE_MAGIC = b'RLE2'
+MAX_SPAN = 255  # Los saltos y el número de series ocupan un byte
+MAX_RUN = 127  # Longitud máxima de una serie (el bit alto marca los píxeles sueltos)
+LITERAL = 0x80
+MAX_COLORS = 256
+
+
+def encode_span(indices):
+    """Series de un tramo opaco: las repeticiones de 3 o más píxeles se codifican como serie."""
+    out = bytearray()
+    runs = 0
+    literal = bytearray()
+    i = 0
+    while i < len(indices):
+        j = i + 1
+        while j < len(indices) and indices[j] == indices[i] and j - i < MAX_RUN:
+            j += 1
+        if j - i >= 3 or len(literal) == MAX_RUN:
+            if literal:
+                out.append(LITERAL | len(literal))
+                out += literal
+                runs += 1
+                literal = bytearray()
+            if j - i >= 3:
+                out.append(j - i)
+                out.append(indices[i])
+                runs += 1
+                i = j
+                continue
+        literal.append(indices[i])
+        i += 1
+    if literal:
+        out.append(LITERAL | len(literal))
+        out += literal
+        runs += 1
+    return runs, out
+
+
+def encode(w, h, pixels, mask):
+    """Codifica un frame RGB565 + máscara de 1 bit (el formato de `FrameCache`).
+
+    Lanza ValueError si el frame tiene más de MAX_COLORS colores opacos.
+    """
+    palette = {}
+    for i in range(w * h):
+        if mask[i >> 3] & (1 << (i & 7)):
+            color = bytes(pixels[i * 2:i * 2 + 2])
+            if color not in palette:
+                palette[color] = len(palette)
+    if len(palette) > MAX_COLORS:
+        raise ValueError(f"{len(palette)} colores (máximo {MAX_COLORS})")
+    out = bytearray((max(1, len(palette)) - 1, 0))
+    for color in sorted(palette, key=palette.get):
+        out += color
+    if not palette:
+        out += b'\x00\x00'
+    for row in range(h):
+        spans = []
+        col = 0
+        last = 0
+        while col < w:
+            i = row * w + col
+            if not mask[i >> 3] & (1 << (i & 7)):
+                col += 1
+                continue
+            start = col
+            indices = bytearray()
+            while col < w and col - start < MAX_SPAN:
+                i = row * w + col
+                if not mask[i >> 3] & (1 << (i & 7)):
+                    break
+                indices.append(palette[bytes(pixels[i * 2:i * 2 + 2])])
+                col += 1
+            skip = start - last
+            while skip > MAX_SPAN:
+                spans.append((MAX_SPAN, 0, b''))  # Tramo vacío solo para saltar
+                skip -= MAX_SPAN
+            runs, data = encode_span(indices)
+            spans.append((skip, runs, data))
+            last = col
+        out.append(len(spans))
+        for skip, runs, data in spans:
+            out.append(skip)
+            out.append(runs)
+            out += data
+    return bytes(out)
+
+
+if sys.implementation.name == 'micropython':
+    import micropython
+
+    @micropython.viper
+    def blit_rle(fb, fb_w: int, fb_h: int, x: int, y: int, h: int, data):
+        """Dibuja las series de un frame RLE en el framebuffer, recortando a los bordes."""
+        dst = ptr16(fb)  # noqa: F821 (tipos de viper)
+        src = ptr8(data)  # noqa: F821
+        palette = ptr16(data)  # noqa: F821 (la paleta empieza en la media palabra 1)
+        p = 2 + (src[0] + 1) * 2
+        for row in range(h):
+            py = y + row
+            visible = 0
+            if py >= 0 and py < fb_h:
+                visible = 1
+            base = py * fb_w
+            px = x
+            spans = src[p]
+            p += 1
+            while spans > 0:
+                px += src[p]
+                runs = src[p + 1]
+                p += 2
+                while runs > 0:
+                    n = src[p]
+                    p += 1
+                    if n & 0x80:
+                        n = n & 0x7F
+                        if visible:
+                            i = 0
+                            while i < n:
+                                c = px + i
+                                if c >= 0 and c < fb_w:
+                                    dst[base + c] = palette[1 + src[p + i]]
+                                i += 1
+                        p += n
+                    else:
+                        if visible:
+                            start = px
+                            end = px + n
+                            if start < 0:
+                                start = 0
+                            if end > fb_w:
+                                end = fb_w
+                            color = palette[1 + src[p]]
+                            while start < end:
+                                dst[base + start] = color
+                                start += 1
+                        p += 1
+                    px += n
+                    runs -= 1
+                spans -= 1
+else:
+    def blit_rle(fb, fb_w, fb_h, x, y, h, data):
+        """Dibuja las series de un frame RLE en el framebuffer, recortando a los bordes (host)."""
+        palette = bytes(data[2:2 + (data[0] + 1) * 2])
+        p = 2 + len(palette)
+        for row in range(h):
+            py = y + row
+            visible = 0 <= py < fb_h
+            base = py * fb_w
+            px = x
+            spans = data[p]
+            p += 1
+            for _ in range(spans):
+                px += data[p]
+                runs = data[p + 1]
+                p += 2
+                for _ in range(runs):
+                    n = data[p]
+                    p += 1
+                    if n & LITERAL:
+                        n &= MAX_RUN
+                        if visible:
+                            for i in range(n):
+                                c = px + i
+                                if 0 <= c < fb_w:
+                                    k = data[p + i] * 2
+                                    fb[(base + c) * 2:(base + c) * 2 + 2] = palette[k:k + 2]
+                        p += n
+                    else:
+                        start = max(px, 0)
+                        end = min(px + n, fb_w)
+                        if visible and start < end:
+                            k = data[p] * 2
+                            fb[(base + start) * 2:(base + end) * 2] = palette[k:k + 2] * (end - start)
+                        p += 1
+                    px += n
+
+
+class RleSprites(Atlas):
+    """Paquete de sprites RLE; se dibuja directamente, sin pasar por `pngdec`."""
+    MAGIC = RLE_MAGIC
+
+    def __init__(self, path, display):
+        super().__init__(path, None)
+        self.fb = memoryview(display)
+        self.WIDTH, self.HEIGHT = display.get_bounds()
+
+    def draw(self, key, x, y):
+        """Dibuja un frame por su clave (ver `Atlas.add_keys`). Devuelve False si no está empaquetado."""
+        entry = self.keys.get(key)
+        if entry is None:
+            return False
+        self.blit(entry, x, y)
+        return True
+
+    def blit(self, entry, x, y):
+        """Dibuja una entrada del índice."""
+        offset, _, _, height, data = entry
+        self.file.seek(offset)
+        self.file.readinto(data)
+        blit_rle(self.fb, self.WIDTH, self.HEIGHT, x, y, height, data)
@@ -0,0 +1,140 @@
+"""Estado persistente de la mascota en un log de registros binarios de tamaño fijo.
+
+Cada registro guarda las estadísticas, los tiempos de enfriamiento, el sueño y
+la caca, con un número de secuencia, la hora de escritura (para poner al día
+el tiempo apagado, ver Menu.catch_up) y un CRC32. Los registros se añaden al
+final del archivo (nunca se reescribe en su sitio) y al arrancar se restaura
+el último registro válido; uno cortado por un reinicio a mitad de escritura
+falla el CRC y se ignora. Cuando el archivo pasa de MAX_LOG_BYTES se compacta
+a un único registro.
+
+Para no bloquear el bucle de render ni gastar la flash, los cambios se agrupan:
+los de estado (sueño, caca, enfriamientos) se escriben en la siguiente
+comprobación y los que solo tocan estadísticas, como mucho cada FLUSH_PERIOD_MS.
+"""
+import os
+import struct
+import time
+
+try:
+    from binascii import crc32
+except ImportError:
+    from zlib import crc32
+
+# magic, seq, saved_at (time.time() al escribir), hambre, sueno, felicidad, salud,
+# last_festival_time, last_ibuprofen_time, sleep_end_time, next_poop_time,
+# is_sleeping, poop_visible, poop_x, poop_y
+DATA_FORMAT = '<2sHiffffiiiiBBhh'
+DATA_SIZE = struct.calcsize(DATA_FORMAT)
+RECORD_SIZE = DATA_SIZE + 4  # + CRC32 de los datos
+RECORD_MAGIC = b'PS'
+
+STATS_START = 8  # Bytes de las estadísticas dentro del registro
+STATS_END = 24   # A partir de aquí, el resto del estado
+
+
+class StateLog:
+    CHECK_PERIOD_MS = 1000  # Cada cuánto se compara el estado con el último registro
+    FLUSH_PERIOD_MS = 5 * 60 * 1000  # Cambios solo de estadísticas: un registro cada 5 min como mucho
+    MAX_LOG_BYTES = 4096  # Al pasar de aquí se compacta a un solo registro
+
+    def __init__(self, path):
+        self.path = path
+        self.ticks_ms = time.ticks_ms  # Sustituible en las simulaciones
+        self.buffer = bytearray(RECORD_SIZE)
+        self.last = bytearray(RECORD_SIZE)  # Último registro escrito
+        self.seq = 0
+        self.size = 0
+        self.last_check = self.ticks_ms()
+        self.last_write = self.last_check
+        # Estadísticas de escritura
+        self.writes = 0
+        self.compactions = 0
+        self.bytes_written = 0
+        self.write_us_max = 0
+        self.write_us_total = 0
+
+    def restore(self, menu):
+        """Aplica a `menu` el último registro válido del log.
+
+        Devuelve el `time.time()` en que se escribió (para poner al día el
+        tiempo transcurrido desde entonces) o None si no había ninguno.
+        """
+        found = False
+        valid_size = 0
+        try:
+            with open(self.path, 'rb') as f:
+                while f.readinto(self.buffer) == RECORD_SIZE:
+                    if self.buffer[:2] != RECORD_MAGIC or self.crc() != struct.unpack_from('<I', self.buffer, DATA_SIZE)[0]:
+                        break
+                    self.last[:] = self.buffer
+                    valid_size += RECORD_SIZE
+                    found = True
+                self.size = f.seek(0, 2)
+        except OSError:
+            return None
+        if self.size != valid_size:
+            # Registro cortado o dañado al final: compactar en la próxima escritura
+            print(f"Log de estado dañado a partir del byte {valid_size}; se compactará")
+            self.size = self.MAX_LOG_BYTES
+        if not found:
+            return None
+        (_, self.seq, saved_at, menu.hambre, menu.sueno, menu.felicidad, menu.salud,
+         menu.last_festival_time, menu.last_ibuprofen_time, menu.sleep_end_time, menu.next_poop_time,
+         is_sleeping, poop_visible, poop_x, poop_y) = struct.unpack_from(DATA_FORMAT, self.last)
+        menu.is_sleeping = bool(is_sleeping)
+        menu.poop_visible = bool(poop_visible)
+        menu.poop_position = (poop_x, poop_y)
+        return saved_at
+
+    def crc(self):
+        return crc32(memoryview(self.buffer)[:DATA_SIZE]) & 0xffffffff
+
+    def pack(self, menu):
+        struct.pack_into(DATA_FORMAT, self.buffer, 0, RECORD_MAGIC, (self.seq + 1) & 0xffff, int(time.time()),
+                         menu.hambre, menu.sueno, menu.felicidad, menu.salud,
+                         int(menu.last_festival_time), int(menu.last_ibuprofen_time),
+                         int(menu.sleep_end_time), int(menu.next_poop_time),
+                         menu.is_sleeping, menu.poop_visible, menu.poop_position[0], menu.poop_position[1])
+        struct.pack_into('<I', self.buffer, DATA_SIZE, self.crc())
+
+    def update(self, menu, force=False):
+        """Se llama en cada vuelta del bucle; escribe un registro si el estado ha cambiado lo suficiente."""
+        now = self.ticks_ms()
+        if not force and time.ticks_diff(now, self.last_check) < self.CHECK_PERIOD_MS:
+            return False
+        self.last_check = now
+        self.pack(menu)
+        buffer = self.buffer
+        last = self.last
+        if buffer[STATS_END:DATA_SIZE] == last[STATS_END:DATA_SIZE]:
+            if buffer[STATS_START:STATS_END] == last[STATS_START:STATS_END]:
+                return False
+            if not force and time.ticks_diff(now, self.last_write) < self.FLUSH_PERIOD_MS:
+                return False
+        self.write()
+        self.last_write = now
+        return True
+
+    def write(self):
+        """Añade el registro de `buffer` al log, compactando antes si hace falta."""
+        t0 = time.ticks_us()
+        if self.size + RECORD_SIZE > self.MAX_LOG_BYTES:
+            # Escribir un archivo nuevo con solo este registro y sustituir el log de golpe
+            tmp = self.path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(self.buffer)
+            os.rename(tmp, self.path)
+            self.size = RECORD_SIZE
+            self.compactions += 1
+        else:
+            with open(self.path, 'ab') as f:
+                f.write(self.buffer)
+            self.size += RECORD_SIZE
+        elapsed = time.ticks_diff(time.ticks_us(), t0)
+        self.last[:] = self.buffer
+        self.seq = (self.seq + 1) & 0xffff
+        self.writes += 1
+        self.bytes_written += RECORD_SIZE
+        self.write_us_total += elapsed
+        self.write_us_max = max(self.write_us_max, elapsed)
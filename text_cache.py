@@ -0,0 +1,131 @@
+"""Caché de textos rasterizados: cada (texto, escala, pen) se dibuja una vez y luego se copia.
+
+El texto se rasteriza con `display.text` en la esquina superior izquierda del
+framebuffer (guardando y restaurando esa región), dos veces sobre dos colores
+clave como en FrameCache, y se guarda como máscara de 1 bit por píxel más el
+color. Las entradas se descartan por orden de uso (LRU) cuando se supera el
+presupuesto de bytes.
+"""
+import micropython
+
+FONT_HEIGHT = 8  # Alto de la fuente bitmap8 a escala 1
+
+
+@micropython.native
+def blit_mask(fb, fb_w, fb_h, x, y, w, h, mask, hi, lo):
+    """Pinta con el color (hi, lo) los píxeles marcados en la máscara, recortando a los bordes."""
+    for row in range(h):
+        py = y + row
+        if py < 0 or py >= fb_h:
+            continue
+        for col in range(w):
+            px = x + col
+            if px < 0 or px >= fb_w:
+                continue
+            i = row * w + col
+            if mask[i >> 3] & (1 << (i & 7)):
+                o = (py * fb_w + px) << 1
+                fb[o] = hi
+                fb[o + 1] = lo
+
+
+class TextCache:
+    KEY_A = (255, 0, 255)
+    KEY_B = (0, 255, 0)
+
+    def __init__(self, display, max_bytes=6 * 1024):
+        self.display = display
+        self.fb = memoryview(display)
+        self.WIDTH, self.HEIGHT = display.get_bounds()
+        self.key_a = display.create_pen(*self.KEY_A)
+        self.key_b = display.create_pen(*self.KEY_B)
+        self.max_bytes = max_bytes
+        self.entries = {}  # (texto, escala, pen) -> (ancho, alto, máscara, hi, lo)
+        self.order = []    # Claves de la menos a la más recientemente usada
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def draw(self, text, x, y, scale, pen):
+        key = (text, scale, pen)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.render(text, scale, pen)
+            if entry is None:
+                # Demasiado grande para la caché: dibujar directamente
+                self.display.set_pen(pen)
+                self.display.text(text, x, y, scale=scale)
+                return
+            self.store(key, entry)
+        else:
+            self.hits += 1
+            if self.order[-1] != key:
+                self.order.remove(key)
+                self.order.append(key)
+        w, h, mask, hi, lo = entry
+        if hi is not None:
+            blit_mask(self.fb, self.WIDTH, self.HEIGHT, x, y, w, h, mask, hi, lo)
+
+    def store(self, key, entry):
+        size = len(entry[2])
+        while self.order and self.bytes_used + size > self.max_bytes:
+            oldest = self.order.pop(0)
+            self.bytes_used -= len(self.entries.pop(oldest)[2])
+            self.evictions += 1
+        self.entries[key] = entry
+        self.order.append(key)
+        self.bytes_used += size
+
+    def clear(self):
+        self.entries = {}
+        self.order = []
+        self.bytes_used = 0
+
+    def render(self, text, scale, pen):
+        """Rasteriza el texto en la esquina superior izquierda y devuelve su máscara.
+
+        La región usada se guarda antes y se restaura después, así que se puede
+        llamar en mitad de un frame.
+        """
+        w = min(self.WIDTH, self.display.measure_text(text, scale=scale))
+        h = min(self.HEIGHT, FONT_HEIGHT * scale)
+        mask = bytearray((w * h + 7) // 8)
+        if not w or len(mask) > self.max_bytes:
+            return None
+        fb = self.fb
+        row_bytes = w * 2
+        stride = self.WIDTH * 2
+        saved = bytearray(row_bytes * h)
+        first = bytearray(row_bytes * h)
+        for row in range(h):
+            saved[row * row_bytes:(row + 1) * row_bytes] = fb[row * stride:row * stride + row_bytes]
+
+        # Dos pasadas sobre colores clave distintos: los píxeles del texto no cambian
+        self.display.set_pen(self.key_a)
+        self.display.rectangle(0, 0, w, h)
+        self.display.set_pen(pen)
+        self.display.text(text, 0, 0, scale=scale)
+        for row in range(h):
+            first[row * row_bytes:(row + 1) * row_bytes] = fb[row * stride:row * stride + row_bytes]
+        self.display.set_pen(self.key_b)
+        self.display.rectangle(0, 0, w, h)
+        self.display.set_pen(pen)
+        self.display.text(text, 0, 0, scale=scale)
+        hi = lo = None
+        for row in range(h):
+            o = row * stride
+            p = row * row_bytes
+            for col in range(w):
+                if fb[o] == first[p] and fb[o + 1] == first[p + 1]:
+                    i = row * w + col
+                    mask[i >> 3] |= 1 << (i & 7)
+                    hi = fb[o]
+                    lo = fb[o + 1]
+                o += 2
+                p += 2
+
+        for row in range(h):
+            fb[row * stride:row * stride + row_bytes] = saved[row * row_bytes:(row + 1) * row_bytes]
+        return w, h, mask, hi, lo
@@ -0,0 +1,67 @@
+"""Benchmark: coste de abrir archivos frente a decodificar, con PNG sueltos y con atlas.
+
+Funciona en el host (con los sustitutos de tools/host) y en el dispositivo
+(copiando este archivo y ejecutándolo con `mpremote run`), donde mide
+el coste real de abrir archivos en littlefs.
+"""
+import sys
+import time
+
+if sys.implementation.name != 'micropython':
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+
+from anim_registry import frame_sources  # noqa: E402
+import menu  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def measure(pet, frames):
+    """Suma los µs de abrir y de decodificar cada (archivo, origen)."""
+    open_us = 0
+    decode_us = 0
+    for filename, source in frames:
+        t0 = time.ticks_us()
+        try:
+            decode_source = pet.open_png(filename, source)
+        except OSError:
+            continue  # Asset ausente (p. ej. sleep.png)
+        t1 = time.ticks_us()
+        pet.png.decode(0, 0, source=decode_source)
+        t2 = time.ticks_us()
+        open_us += time.ticks_diff(t1, t0)
+        decode_us += time.ticks_diff(t2, t1)
+    return open_us, decode_us
+
+
+def all_frames(pet):
+    frames = []
+    for anim in pet.animations:
+        frames.extend(frame_sources((anim,)))
+    for icon_pair in pet.icons:
+        frames.extend((icon, None) for icon in icon_pair)
+    return frames
+
+
+def main():
+    pet = menu.Menu()
+    frames = all_frames(pet)
+    atlas = pet.atlas
+    pet.atlas = None
+    results = [('PNG sueltos', measure(pet, frames))]
+    if atlas is not None:
+        pet.atlas = atlas
+        results.append(('atlas', measure(pet, frames)))
+    else:
+        print("Sin atlas: ejecuta tools/build_atlas.py y copia sprites.atlas")
+    print(f"{len(frames)} frames")
+    for name, (open_us, decode_us) in results:
+        total = open_us + decode_us
+        print(f"{name:<12} abrir {open_us / 1000:8.1f} ms  decodificar {decode_us / 1000:8.1f} ms  "
+              f"abrir = {100 * open_us / total:4.1f}% del total")
+
+
+main()
@@ -0,0 +1,71 @@
+"""Benchmark de arranque: desde `import menu` hasta el primer frame dibujado.
+
+Funciona en el host (con los sustitutos de tools/host) y en el dispositivo
+(`mpremote run tools/bench_boot.py`). Para comparar, mide también la
+comprobación antigua (abrir y decodificar el primer frame de cada PNG) y la
+comprobación con CRC32 (Menu.VERIFY_CHECKSUMS).
+"""
+import sys
+import time
+
+if sys.implementation.name != 'micropython':
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+
+
+def elapsed_ms(t0):
+    return time.ticks_diff(time.ticks_us(), t0) / 1000
+
+
+def decode_pass(pet):
+    """La comprobación que hacía verify_pngs antes del manifiesto."""
+    from anim_registry import frame_file
+    for anim in pet.animations:
+        for filename in set(frame_file(anim, i) for i in range(anim.num_frames)):
+            try:
+                pet.png.open_file(filename)
+                pet.png.decode(0, 0, source=(0, 0, anim.rect[2], anim.rect[3]))
+            except OSError:
+                pass
+
+
+def main():
+    t0 = time.ticks_us()
+    import menu
+    import_ms = elapsed_ms(t0)
+    menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+    t1 = time.ticks_us()
+    pet = menu.Menu(use_timer=False)
+    init_ms = elapsed_ms(t1)
+
+    t2 = time.ticks_us()
+    pet.draw_menu()
+    frame_ms = elapsed_ms(t2)
+    total_ms = elapsed_ms(t0)
+
+    t3 = time.ticks_us()
+    pet.verify_assets()
+    stat_ms = elapsed_ms(t3)
+
+    pet.VERIFY_CHECKSUMS = True
+    t4 = time.ticks_us()
+    pet.verify_assets()
+    crc_ms = elapsed_ms(t4)
+
+    t5 = time.ticks_us()
+    decode_pass(pet)
+    decode_ms = elapsed_ms(t5)
+
+    print(f"import menu:        {import_ms:8.1f} ms")
+    print(f"Menu():             {init_ms:8.1f} ms")
+    print(f"primer frame:       {frame_ms:8.1f} ms")
+    print(f"total hasta frame:  {total_ms:8.1f} ms")
+    print(f"comprobación stat:  {stat_ms:8.1f} ms ({len(menu.ASSETS)} assets)")
+    print(f"comprobación crc32: {crc_ms:8.1f} ms")
+    print(f"decodif. antigua:   {decode_ms:8.1f} ms (verify_pngs antes del manifiesto)")
+
+
+main()
@@ -0,0 +1,181 @@
+"""Benchmark del motor de flota (tools/host/fleet.py) frente a simular mascotas una a una.
+
+Mide mascota-minutos simulados por segundo con tres motores y las mismas
+reglas: N mascotas `Menu` (con los sustitutos de hardware del host y el
+reloj virtual), N `PetModel` en un bucle de Python y la flota de NumPy.
+Cada paso avanza un minuto y cada mascota elige una acción al azar con
+probabilidad --actions. Antes comprueba que PetModel y la flota dan el
+mismo resultado con las mismas acciones. La creación de cada motor se mide
+aparte: un Menu reserva display, cachés y capas aunque no dibuje.
+
+Uso:
+    python tools/bench_fleet.py [--pets 10000] [--minutes 1440] [--menus 5]
+                                [--models 200] [--actions 0.05]
+
+Requiere NumPy (pip install numpy). Termina con código 1 si la flota y
+PetModel no coinciden.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+try:
+    import numpy as np
+    from fleet import Fleet
+except ImportError:
+    print("bench_fleet requiere NumPy: pip install numpy")
+    sys.exit(1)
+
+import pet_model  # noqa: E402
+from simulator import VirtualClock  # noqa: E402
+
+STEP_S = 60
+
+
+def model_action(pet, action):
+    """Aplica a un PetModel la acción `action` (índice de Fleet.ACTIONS) como lo haría el menú."""
+    effects = len(Fleet.EFFECTS)
+    if action < effects:
+        pet.act(Fleet.EFFECTS[action])
+    elif action == effects:
+        pet.clear()
+    elif pet.is_sleeping:
+        pet.wake_up()
+    else:
+        pet.start_sleep(nap=action == effects + 1)
+
+
+def menu_action(menu, action):
+    """Lo mismo sobre un Menu, por los mismos métodos que llaman las pantallas."""
+    effects = len(Fleet.EFFECTS)
+    if action < effects:
+        effect = Fleet.EFFECTS[action]
+        if effect.cooldown is not None and menu.cooldown_active(effect.cooldown):
+            return
+        menu.apply_effect(effect)
+        if effect.cooldown is not None:
+            menu.start_cooldown(effect.cooldown)
+    elif action == effects:
+        menu.clear()
+    elif menu.is_sleeping:
+        menu.wake_up()
+    else:
+        menu.start_sleep(nap=action == effects + 1)
+
+
+def action_plan(count, minutes, probability, seed):
+    """Acciones por minuto y mascota, las mismas para todos los motores."""
+    rng = np.random.default_rng(seed)
+    plan = rng.integers(0, len(Fleet.ACTIONS), (minutes, count), dtype=np.int16)
+    plan[rng.random((minutes, count)) >= probability] = -1
+    return plan
+
+
+def run_fleet(count, plan):
+    t0 = time.perf_counter()
+    fleet = Fleet(count, seed=1)
+    t1 = time.perf_counter()
+    for actions in plan:
+        fleet.step(STEP_S, actions)
+    return t1 - t0, time.perf_counter() - t1, fleet
+
+
+def run_models(count, plan):
+    rng = random.Random(1)
+    t0 = time.perf_counter()
+    pets = [pet_model.PetModel(0, rng) for _ in range(count)]
+    t1 = time.perf_counter()
+    now = 0
+    for actions in plan:
+        now += STEP_S
+        for pet, action in zip(pets, actions.tolist()):
+            pet.advance(now)
+            if action >= 0:
+                model_action(pet, action)
+    return t1 - t0, time.perf_counter() - t1, pets
+
+
+def run_menus(count, plan):
+    import menu
+    clock = VirtualClock()
+    clock.install()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # Los print de Menu no interesan aquí
+            menu_class = type('FleetMenu', (menu.Menu,), {'PERSIST_STATE': False, 'PROFILER': False})
+            t0 = time.perf_counter()
+            pets = [menu_class(use_timer=False) for _ in range(count)]
+            t1 = time.perf_counter()
+            for actions in plan:
+                clock.ms += STEP_S * 1000
+                for pet, action in zip(pets, actions.tolist()):
+                    # Lo que hacen en un minuto el Timer de las estadísticas y el bucle principal
+                    pet.decrease_stats(None)
+                    pet.check_sleep_status()
+                    pet.update_poop()
+                    if action >= 0:
+                        menu_action(pet, action)
+            return t1 - t0, time.perf_counter() - t1, pets
+    finally:
+        clock.uninstall()
+
+
+def check_equivalence(count, minutes, probability):
+    """Flota y PetModel con las mismas acciones: mismas estadísticas, sueño y contadores."""
+    plan = action_plan(count, minutes, probability, seed=7)
+    _, _, fleet = run_fleet(count, plan)
+    _, _, pets = run_models(count, plan)
+    stats = np.array([list(pet.stats) for pet in pets], dtype=np.float32)
+    problems = []
+    if not np.allclose(stats, fleet.stats, atol=1e-2):
+        worst = int(np.abs(stats - fleet.stats).max(axis=1).argmax())
+        problems.append(f"estadísticas distintas (mascota {worst}: {stats[worst]} frente a {fleet.stats[worst]})")
+    if not (np.array([pet.is_sleeping for pet in pets]) == fleet.is_sleeping).all():
+        problems.append("estado de sueño distinto")
+    for name in ('rejected', 'penalties'):
+        model_total = sum(getattr(pet, name) for pet in pets)
+        if model_total != getattr(fleet, name):
+            problems.append(f"{name}: {model_total} frente a {getattr(fleet, name)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pets', type=int, default=10000)
+    parser.add_argument('--minutes', type=int, default=1440)
+    parser.add_argument('--menus', type=int, default=5)
+    parser.add_argument('--models', type=int, default=200)
+    parser.add_argument('--actions', type=float, default=0.05)
+    args = parser.parse_args()
+
+    problems = check_equivalence(args.models, args.minutes, args.actions)
+    for line in problems:
+        print(f"DISTINTO {line}")
+    if problems:
+        sys.exit(1)
+    print(f"PetModel y la flota coinciden ({args.models} mascotas, {args.minutes} minutos)")
+
+    print(f"{'motor':<10} {'mascotas':>9} {'minutos':>8} {'creación s':>11} {'s':>8} {'mascota-min/s':>14}")
+    results = {}
+    for name, count, run in (('Menu', args.menus, run_menus),
+                             ('PetModel', args.models, run_models),
+                             ('flota', args.pets, run_fleet)):
+        plan = action_plan(count, args.minutes, args.actions, seed=3)
+        setup, elapsed, _ = run(count, plan)
+        rate = count * args.minutes / elapsed
+        results[name] = rate
+        print(f"{name:<10} {count:9d} {args.minutes:8d} {setup:11.2f} {elapsed:8.2f} {rate:14,.0f}")
+    print(f"flota frente a Menu: x{results['flota'] / results['Menu']:,.0f}, "
+          f"frente a PetModel: x{results['flota'] / results['PetModel']:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
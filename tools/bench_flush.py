@@ -0,0 +1,112 @@
+"""Rendimiento del envío al display con y sin Menu.DUAL_CORE_FLUSH, en el simulador de host.
+
+El envío por SPI se simula con una espera de la duración real de la
+transferencia (64800 bytes a --spi-mhz, o los de la región con
+PARTIAL_UPDATE, que con un núcleo está activo) que libera el GIL, así que con
+el modo de dos núcleos el hilo de envío de CPython se solapa con la
+composición del frame siguiente como lo haría el núcleo 1, que envía siempre
+el frame completo. Para cada escenario se miden
+los frames por segundo (sin esperas entre frames) y los ms por frame que el
+bucle principal pasa bloqueado en `flush`.
+
+Uso:
+    python tools/bench_flush.py [--frames 60] [--repeat 3] [--spi-mhz 62.5]
+
+Cada medida es la mejor de --repeat ejecuciones: en el host el tiempo de
+composición (decodificación en Python) varía mucho más que el de envío.
+
+En el dispositivo, las mismas cifras salen del perfilador (etapa `update`,
+y la línea `flush 2 núcleos` de DualCoreFlush al volcar con `p`).
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+from simulator import Simulator  # noqa: E402
+
+SCENARIOS = ('default', 'eat', 'drunk', 'guitar_1')
+
+
+def spi_transfer(spi_hz):
+    def send(buffer):
+        time.sleep(len(buffer) * 8 / spi_hz)
+    return send
+
+
+def run(animation, frames, dual_core, spi_hz):
+    send = spi_transfer(spi_hz)
+    options = {'PERSIST_STATE': False, 'DUAL_CORE_FLUSH': dual_core,
+               'flush_sender': lambda self: send}
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = Simulator(**options)
+    menu = sim.menu
+    try:
+        if not dual_core:
+            # display.update() del sustituto no tarda nada: que tarde lo mismo que el SPI
+            display_update = menu.display.update
+
+            def update():
+                display_update()
+                send(menu.display)
+            menu.display.update = update
+            send_rect = menu.send_rect
+
+            def timed_send_rect(x, y, w, h):
+                send_rect(x, y, w, h)
+                time.sleep(w * h * 2 * 8 / spi_hz)
+            menu.send_rect = timed_send_rect
+        with contextlib.redirect_stdout(io.StringIO()):
+            menu.play_immediately(animation)
+
+        blocked = [0.0]
+        flush = menu.flush
+
+        def timed_flush(rects):
+            t0 = time.perf_counter()
+            flush(rects)
+            blocked[0] += time.perf_counter() - t0
+        menu.flush = timed_flush
+
+        flushes = menu.display.update_count
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # Los print de Menu no interesan aquí
+            sim.run(frames)
+        if menu.flusher is not None:
+            menu.flusher.wait()  # El último envío también cuenta
+            sent = menu.flusher.frames
+        else:
+            sent = menu.display.update_count - flushes
+        elapsed = time.perf_counter() - t0
+        return frames / elapsed, blocked[0] * 1000 / frames, sent
+    finally:
+        sim.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--spi-mhz', type=float, default=62.5)
+    args = parser.parse_args()
+    spi_hz = args.spi_mhz * 1e6
+
+    print(f"{'escenario':<12} {'envíos':>7} {'fps 1 núcleo':>13} {'fps 2 núcleos':>14} "
+          f"{'bloqueo 1 (ms/f)':>17} {'bloqueo 2 (ms/f)':>17}")
+    for animation in SCENARIOS:
+        fps1, blocked1, sent = max(run(animation, args.frames, False, spi_hz) for _ in range(args.repeat))
+        fps2, blocked2, sent2 = max(run(animation, args.frames, True, spi_hz) for _ in range(args.repeat))
+        if sent2 != sent:
+            print(f"Aviso: {animation}: {sent} envíos con un núcleo y {sent2} con dos")
+        print(f"{animation:<12} {sent:7d} {fps1:13.1f} {fps2:14.1f} {blocked1:17.2f} {blocked2:17.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark de host: decodificar cada frame frente a copiar desde `FrameCache`.
+
+Usa los sustitutos de `pngdec` y `picographics` de tools/host, así que los
+tiempos absolutos no son los del RP2040; lo relevante es la proporción.
+Después reproduce una sesión típica (animación por defecto entre acciones,
+iconos del menú principal) con varios presupuestos de la caché LRU y
+muestra la tasa de aciertos, los descartes y los bytes retenidos.
+
+Uso:
+    python tools/bench_frame_cache.py [frames_por_animación]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+import pngdec  # noqa: E402
+import menu  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+# Sesión típica: la animación por defecto entre acciones; 'hug' y 'ass' comparten archivo
+SESSION = ('default', 'eat', 'default', 'hug', 'default', 'ass', 'default', 'guitar_3', 'default', 'drunk', 'default')
+BUDGETS_KB = (16, 32, 64, 96, 128)
+
+
+def time_animation(pet, animation, frames):
+    pet.start_animation(animation)
+    start = time.perf_counter()
+    for i in range(frames):
+        pet.current_frame = i % pet.num_frames
+        pet.draw_bat()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main(frames=20):
+    frames = int(frames)
+    pet = menu.Menu()
+    cache = pet.frame_cache
+    cache.cache_dir = None  # Medir la captura en el primer uso, no el conversor
+    # Sin límite para medir el blit en régimen estable; la columna KB indica la RAM
+    # necesaria para que la animación completa quepa en `Menu.frame_cache`
+    cache.max_bytes = 1 << 30
+    print(f"{'animación':<10} {'decode ms':>10} {'cache ms':>10} {'speedup':>8} {'KB':>6}")
+    for animation in pet.animation_ids:
+        pet.frame_cache = None
+        decode_ms = time_animation(pet, animation, frames)
+        pet.frame_cache = cache
+        cache.clear()
+        time_animation(pet, animation, pet.num_frames)  # Calentar la caché
+        cache_ms = time_animation(pet, animation, frames)
+        kb = cache.bytes_used / 1024
+        print(f"{animation:<10} {decode_ms:>10.2f} {cache_ms:>10.2f} {decode_ms / cache_ms:>7.1f}x {kb:>6.1f}")
+    print(f"llamadas pngdec: {pngdec.stats}")
+
+    print(f"{'presupuesto KB':>14} {'aciertos':>9} {'descartes':>10} {'compartidos':>12} {'KB retenidos':>13}")
+    for budget in BUDGETS_KB:
+        cache.max_bytes = budget * 1024
+        cache.clear()
+        cache.hits = cache.misses = cache.evictions = cache.shared = 0
+        with contextlib.redirect_stdout(io.StringIO()):  # Los print de Menu no interesan aquí
+            for animation in SESSION:
+                time_animation(pet, animation, pet.num_frames * 2)
+                for icon_pair in pet.icons:
+                    pet.draw_icon(icon_pair[0], 0, 0)
+        lookups = cache.hits + cache.misses
+        print(f"{budget:>14} {cache.hits * 100 / lookups:>8.1f}% {cache.evictions:>10} {cache.shared:>12} "
+              f"{cache.bytes_used / 1024:>13.1f}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,105 @@
+"""Benchmark de host: frames de cambio de animación con y sin precarga (prefetch.py).
+
+Para cada escenario se lanza una acción que encola varias animaciones
+seguidas y se simula hasta volver a la animación por defecto. Se miden los
+frames en los que empieza una animación nueva (el frame en que se dibuja
+su primer frame): el peor tiempo, la media y las decodificaciones de PNG
+en esos frames. El primer cambio es la reacción a la acción, que empieza
+al momento y no se puede precargar; se muestra aparte (`reacción`) y el
+resto son los cambios entre animaciones encoladas. Con precarga, el
+simulador da --idle-ms de tiempo libre por frame a `Menu.prefetch` (fuera
+de la medida).
+
+Uso:
+    python tools/bench_prefetch.py [--idle-ms 1000] [--frames 200]
+
+Los tiempos son los del decodificador de host; en el dispositivo la fila
+`cambio` del perfilador (y la línea `precarga` del volcado) da lo mismo.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+import pngdec  # noqa: E402
+from effects import EFFECTS  # noqa: E402
+from simulator import Simulator  # noqa: E402
+
+SCENARIOS = (
+    ('guitar', lambda m: m.apply_effect(EFFECTS['entertainment'][0])),  # guitar_1 ... guitar_7
+    ('hug', lambda m: m.apply_effect(EFFECTS['health'][0])),            # love_1, love_2 x2
+    ('clear', lambda m: m.clear()),                                     # angry_1 x2, angry_2 x2
+    ('nap', lambda m: m.start_sleep(nap=True)),                         # sleep_1, sleep_2 en bucle
+)
+
+
+def run(action, frames, prefetch, idle_ms):
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = Simulator(PERSIST_STATE=False, USE_PREFETCH=prefetch)
+    menu = sim.menu
+    if prefetch:
+        sim.idle_ms = idle_ms
+    boundaries = []  # (ms, decodificaciones) de cada frame de cambio
+    started = [False]
+    try:
+        start_animation = menu.start_animation
+
+        def mark_start(name):
+            start_animation(name)
+            started[0] = True
+        menu.start_animation = mark_start
+
+        draw_menu = menu.draw_menu
+
+        def timed_draw():
+            decodes = pngdec.stats['decode']
+            t0 = time.perf_counter()
+            draw_menu()
+            if started[0]:
+                started[0] = False
+                boundaries.append(((time.perf_counter() - t0) * 1000, pngdec.stats['decode'] - decodes))
+        menu.draw_menu = timed_draw
+
+        with contextlib.redirect_stdout(io.StringIO()):  # Los print de Menu no interesan aquí
+            sim.run(5)  # Animación por defecto ya en la caché
+            boundaries.clear()
+            action(menu)
+            sim.run(frames)
+        return boundaries, menu.prefetcher
+    finally:
+        sim.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--idle-ms', type=int, default=1000)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'escenario':<10} {'reacción ms':>12} {'cambios':>8} {'peor ms sin':>12} {'peor ms con':>12} "
+          f"{'media sin':>10} {'media con':>10} {'dec/cambio sin':>15} {'dec/cambio con':>15} {'usados/precargados':>19}")
+    for name, action in SCENARIOS:
+        without, _ = run(action, args.frames, False, args.idle_ms)
+        with_prefetch, prefetcher = run(action, args.frames, True, args.idle_ms)
+        if len(without) != len(with_prefetch):
+            print(f"Aviso: {name}: {len(without)} cambios sin precarga y {len(with_prefetch)} con ella")
+        reaction = without[0][0] if without else 0
+        results = []
+        for boundaries in (without[1:], with_prefetch[1:]):
+            times = [ms for ms, _ in boundaries] or [0]
+            decodes = sum(d for _, d in boundaries) / max(1, len(boundaries))
+            results.append((max(times), sum(times) / len(times), decodes))
+        (worst1, mean1, dec1), (worst2, mean2, dec2) = results
+        print(f"{name:<10} {reaction:12.1f} {len(without) - 1:8d} {worst1:12.1f} {worst2:12.1f} {mean1:10.1f} "
+              f"{mean2:10.1f} {dec1:15.2f} {dec2:15.2f} {prefetcher.used:>9}/{prefetcher.frames:<9}")
+
+
+if __name__ == '__main__':
+    main()
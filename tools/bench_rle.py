@@ -0,0 +1,112 @@
+"""Benchmark: sprites RLE (sprite_rle.py) frente a `pngdec` en cada animación de sprite_sheets.
+
+Para cada animación mide el tiempo medio por frame de abrir y decodificar el
+PNG frente a dibujar el frame RLE, y compara lo que ocupa en flash (PNG
+originales, RLE y RGB565 crudo) y la RAM que necesita cada forma de
+dibujarla sin decodificar: el buffer de lectura de los sprites RLE (el frame
+RLE más grande) frente a tener todos los frames decodificados en
+`FrameCache` (RGB565 + máscara). `pngdec` no necesita RAM por animación.
+
+Funciona en el host (con los sustitutos de tools/host; si no hay
+sprites.rle se genera uno temporal con tools/build_rle.py) y en el
+dispositivo (copiando este archivo y sprites.rle y ejecutándolo con
+`mpremote run`), donde los tiempos son los reales del RP2040.
+
+Uso:
+    python tools/bench_rle.py [repeticiones]
+"""
+import os
+import sys
+import time
+
+if sys.implementation.name != 'micropython':
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+
+from anim_registry import frame_sources  # noqa: E402
+import menu  # noqa: E402
+from sprite_rle import RleSprites  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def time_frames(draw, frames, repeat):
+    """µs medios por frame de `draw(archivo, origen)`."""
+    t0 = time.ticks_us()
+    for _ in range(repeat):
+        for filename, source in frames:
+            draw(filename, source)
+    return time.ticks_diff(time.ticks_us(), t0) / (repeat * len(frames))
+
+
+def file_size(filename):
+    try:
+        return os.stat(filename)[6]
+    except OSError:
+        return 0
+
+
+def host_sprites(pet):
+    """Genera un sprites.rle temporal en el host si no hay uno en la raíz."""
+    import tempfile
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import build_rle
+    path = os.path.join(tempfile.mkdtemp(), 'sprites.rle')
+    build_rle.build(pet, path)
+    return RleSprites(path, pet.display)
+
+
+def main(repeat=3):
+    repeat = int(repeat)
+    pet = menu.Menu()
+    sprites = pet.sprites
+    if sprites is None:
+        if sys.implementation.name == 'micropython':
+            print("Sin sprites.rle: ejecuta tools/build_rle.py y copia el archivo")
+            return
+        sprites = host_sprites(pet)
+    x, y = pet.bat_x, pet.bat_y
+
+    def draw_png(filename, source):
+        pet.png.decode(x, y, source=pet.open_png(filename, source))
+
+    def draw_rle(filename, source):
+        sprites.blit(sprites.index[(filename, source[0])], x, y)
+
+    print(f"{'animación':<10} {'frames':>6} {'png us/f':>9} {'rle us/f':>9} {'speedup':>8} "
+          f"{'PNG KB':>7} {'RLE KB':>7} {'crudo KB':>9} {'RAM RLE KB':>11} {'RAM caché KB':>13}")
+    totals = [0, 0, 0]
+    for anim in pet.animations:
+        frames = []
+        for frame in frame_sources((anim,)):
+            if frame not in frames and (frame[0], frame[1][0]) in sprites.index:
+                frames.append(frame)
+        if not frames:
+            print(f"{anim.name:<10} no está en sprites.rle")
+            continue
+        png_us = time_frames(draw_png, frames, repeat)
+        rle_us = time_frames(draw_rle, frames, repeat)
+
+        png_bytes = sum(file_size(f) for f in set(f for f, _ in frames))
+        entries = {}
+        raw_bytes = 0
+        cache_bytes = 0
+        for filename, source in frames:
+            offset, size, w, h, _ = sprites.index[(filename, source[0])]
+            entries[offset] = size  # Los frames idénticos comparten offset
+            raw_bytes += w * h * 2
+            cache_bytes += w * h * 2 + (w * h + 7) // 8
+        rle_bytes = sum(entries.values())
+        totals[0] += png_bytes
+        totals[1] += rle_bytes
+        totals[2] += raw_bytes
+        print(f"{anim.name:<10} {len(frames):6d} {png_us:9.0f} {rle_us:9.0f} {png_us / rle_us:7.1f}x "
+              f"{png_bytes / 1024:7.1f} {rle_bytes / 1024:7.1f} {raw_bytes / 1024:9.1f} "
+              f"{max(entries.values()) / 1024:11.1f} {cache_bytes / 1024:13.1f}")
+    print(f"total flash: PNG {totals[0] / 1024:.1f} KB, RLE {totals[1] / 1024:.1f} KB, "
+          f"crudo {totals[2] / 1024:.1f} KB; buffer de sprites.rle {len(sprites.buffer) / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
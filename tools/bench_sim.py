@@ -0,0 +1,186 @@
+"""Suite de benchmarks de host sobre el simulador headless (tools/host/simulator.py).
+
+Cada escenario arranca un `Menu` nuevo, lo lleva a una pantalla o animación y
+mide frame a frame: tiempo (p50/p95/máx), llamadas a open/decode de `pngdec`
+y memoria asignada (pico de tracemalloc, en una segunda pasada para no
+distorsionar los tiempos).
+
+Uso:
+    python tools/bench_sim.py [--frames N] [--alloc-frames N] [--save tools/sim_baseline.json]
+                              [--baseline tools/sim_baseline.json] [--tolerance 0.25]
+
+Con --baseline termina con código 1 si algún escenario empeora: más
+open/decode por frame que la referencia, o más tiempo/memoria que la
+referencia más la tolerancia. Los tiempos dependen de la máquina; con
+--counts-only solo se comparan los contadores.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+import pngdec  # noqa: E402
+from simulator import Simulator  # noqa: E402
+
+# Opciones fijas para que los resultados no dependan del estado guardado
+SIM_OPTIONS = {'PERSIST_STATE': False}
+
+
+def animation(name):
+    def setup(sim):
+        sim.menu.play_immediately(name)
+    return setup
+
+
+def open_menu(icon):
+    def setup(sim):
+        sim.menu.selected_icon = icon
+        sim.press('y')
+        sim.step()
+    return setup
+
+
+def sleeping(sim):
+    sim.menu.start_sleep(nap=True)
+
+
+# (nombre, preparación, botones que se pulsan por turnos en cada frame)
+SCENARIOS = (
+    ('main:default', None, ()),
+    ('main:eat', animation('eat'), ()),
+    ('main:drunk', animation('drunk'), ()),
+    ('main:guitar_1', animation('guitar_1'), ()),
+    ('main:sleep', sleeping, ()),
+    ('main:nav', None, ('a', 'b')),
+    ('menu:food', open_menu(0), ()),
+    ('menu:stats', open_menu(3), ()),
+    ('menu:food+nav', open_menu(0), ('a', 'b')),
+)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_scenario(setup, buttons, frames, trace):
+    with contextlib.redirect_stdout(io.StringIO()):  # Los print de Menu no interesan aquí
+        return _run_scenario(setup, buttons, frames, trace)
+
+
+def _run_scenario(setup, buttons, frames, trace):
+    sim = Simulator(**SIM_OPTIONS)
+    try:
+        if setup is not None:
+            setup(sim)
+        times = []
+        allocs = []
+        counts = dict(pngdec.stats)
+        for i in range(frames):
+            if buttons:
+                sim.press(buttons[i % len(buttons)])
+                sim.advance(sim.menu.DEBOUNCE_TIME)
+            if trace:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            times.append(sim.step() / 1e6)
+            if trace:
+                allocs.append(tracemalloc.get_traced_memory()[1] - before)
+        counts = {k: (pngdec.stats[k] - counts[k]) / frames for k in counts}
+        return times, allocs, counts, sim.menu
+    finally:
+        sim.close()
+
+
+def run_suite(frames, alloc_frames):
+    results = {}
+    config = None
+    for name, setup, buttons in SCENARIOS:
+        times, _, counts, pet = run_scenario(setup, buttons, frames, trace=False)
+        # tracemalloc hace el decodificador de host decenas de veces más lento: menos frames
+        tracemalloc.start()
+        _, allocs, _, _ = run_scenario(setup, buttons, alloc_frames, trace=True)
+        tracemalloc.stop()
+        config = {'atlas': pet.atlas is not None,
+                  'frame_cache_files': bool(pet.frame_cache and os.path.isdir(pet.FRAME_CACHE_DIR)),
+                  'rle_sprites': pet.sprites is not None}
+        results[name] = {
+            'p50_ms': round(percentile(times, 0.5), 3),
+            'p95_ms': round(percentile(times, 0.95), 3),
+            'max_ms': round(max(times), 3),
+            'open': round(counts['open'] + counts['open_ram'], 3),
+            'decode': round(counts['decode'], 3),
+            'alloc_bytes': int(sum(allocs) / len(allocs)),
+        }
+    return {'frames': frames, 'config': config, 'scenarios': results}
+
+
+def print_results(report):
+    print(f"{'escenario':<16} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} {'open/f':>7} {'decode/f':>9} {'alloc B/f':>10}")
+    for name, r in report['scenarios'].items():
+        print(f"{name:<16} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['max_ms']:8.2f} "
+              f"{r['open']:7.2f} {r['decode']:9.2f} {r['alloc_bytes']:10d}")
+
+
+def compare(report, baseline, tolerance, counts_only):
+    """Devuelve la lista de regresiones respecto a `baseline`."""
+    regressions = []
+    if baseline.get('config') != report['config']:
+        print(f"Aviso: configuración distinta de la referencia ({baseline.get('config')} frente a {report['config']})")
+    if baseline.get('frames') != report['frames']:
+        print(f"Aviso: la referencia se midió con {baseline.get('frames')} frames; los contadores por frame no son comparables")
+    for name, ref in baseline['scenarios'].items():
+        r = report['scenarios'].get(name)
+        if r is None:
+            continue
+        for key in ('open', 'decode'):
+            if r[key] > ref[key] + 1e-9:
+                regressions.append(f"{name}: {key}/frame {r[key]} > {ref[key]}")
+        if counts_only:
+            continue
+        for key in ('p95_ms', 'alloc_bytes'):
+            if r[key] > ref[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {r[key]} > {ref[key]} (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=40)
+    parser.add_argument('--alloc-frames', type=int, default=5)
+    parser.add_argument('--save')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--counts-only', action='store_true')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    report = run_suite(args.frames, args.alloc_frames)
+    print_results(report)
+    print(f"({time.perf_counter() - t0:.1f} s)")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.counts_only)
+        for line in regressions:
+            print(f"REGRESIÓN {line}")
+        if regressions:
+            sys.exit(1)
+        print("Sin regresiones respecto a la referencia.")
+
+
+if __name__ == '__main__':
+    main()
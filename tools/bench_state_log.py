@@ -0,0 +1,107 @@
+"""Benchmark del log de estado: latencia de escritura y bytes escritos en un día simulado.
+
+Funciona en el host y en el dispositivo (`mpremote run tools/bench_state_log.py`,
+que escribe de verdad en littlefs). El día se simula con un reloj falso, una
+comprobación por segundo: las estadísticas bajan cada minuto, la caca aparece
+cada 1-2 minutos y se limpia al rato mientras la mascota está despierta, se
+come cada pocas horas y se duerme de 23:00 a 7:00.
+
+Se compara con reescribir el estado en cada cambio (un registro por cambio).
+"""
+import random
+import sys
+from array import array
+
+if sys.implementation.name != 'micropython':
+    import os
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+    import tempfile
+    LOG_PATH = os.path.join(tempfile.mkdtemp(), 'state.log')
+else:
+    import os
+    LOG_PATH = 'bench_state.log'
+
+from menu import Menu  # noqa: E402
+from state_log import RECORD_SIZE, StateLog  # noqa: E402
+
+DAY_S = 24 * 60 * 60
+
+
+class SimPet:
+    """Solo los atributos que guarda StateLog (no hace falta el display)."""
+    decay_stats = Menu.decay_stats
+    hambre = Menu.hambre
+    sueno = Menu.sueno
+    felicidad = Menu.felicidad
+    salud = Menu.salud
+
+    def __init__(self):
+        self.stats = array('f', (70, 70, 70, 70))
+        self.last_festival_time = 0
+        self.last_ibuprofen_time = 0
+        self.is_sleeping = False
+        self.sleep_end_time = 0
+        self.poop_visible = False
+        self.poop_position = (0, 0)
+        self.next_poop_time = 90
+        self.last_stats_tick = 0
+
+
+def simulate(log):
+    pet = SimPet()
+    clock = [0]
+    log.ticks_ms = lambda: clock[0]
+    log.last_check = log.last_write = 0
+    rng = random.Random(1)
+    clean_at = None
+    changes = 0
+    previous = None
+    for second in range(DAY_S):
+        clock[0] = second * 1000
+        hour = second // 3600
+        if second % 60 == 0:
+            pet.decay_stats(1)
+        if not pet.is_sleeping and hour >= 23:
+            pet.is_sleeping = True
+            pet.sleep_end_time = second + 8 * 3600
+        elif pet.is_sleeping and second >= pet.sleep_end_time:
+            pet.is_sleeping = False
+            pet.sleep_end_time = 0
+        if not pet.poop_visible and second >= pet.next_poop_time:
+            pet.poop_visible = True
+            pet.poop_position = (rng.randint(5, 200), 101)
+            clean_at = second + rng.randint(5, 30) * 60
+        if pet.poop_visible and not pet.is_sleeping and clean_at is not None and second >= clean_at:
+            pet.poop_visible = False
+            pet.next_poop_time = second + rng.randint(60, 120)
+        if not pet.is_sleeping and second % (3 * 3600) == 2 * 3600:
+            pet.hambre = min(100, pet.hambre + 30)
+            pet.last_festival_time = second
+        state = (pet.hambre, pet.sueno, pet.felicidad, pet.salud, pet.last_festival_time,
+                 pet.is_sleeping, pet.sleep_end_time, pet.poop_visible, pet.next_poop_time)
+        if state != previous:
+            changes += 1
+            previous = state
+        log.update(pet)
+    log.update(pet, force=True)
+    return changes
+
+
+def main():
+    log = StateLog(LOG_PATH)
+    changes = simulate(log)
+    print(f"registro:             {RECORD_SIZE} bytes")
+    print(f"escrituras/día:       {log.writes} ({log.compactions} compactaciones)")
+    print(f"bytes escritos/día:   {log.bytes_written}")
+    print(f"latencia escritura:   media {log.write_us_total / max(1, log.writes):.0f} µs, máx {log.write_us_max} µs")
+    print(f"reescribir en cada cambio: {changes} escrituras, {changes * RECORD_SIZE} bytes/día")
+
+    restored = SimPet()
+    print(f"restauración:         {'ok' if StateLog(LOG_PATH).restore(restored) else 'FALLO'} "
+          f"(hambre {restored.hambre:.2f}, durmiendo {restored.is_sleeping})")
+    os.remove(LOG_PATH)
+
+
+main()
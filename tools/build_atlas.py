@@ -0,0 +1,79 @@
+"""Empaqueta todos los frames, iconos y `poop.png` en un único atlas.
+
+Uso (en el host, desde la raíz del repositorio):
+    python tools/build_atlas.py [sprites.atlas]
+
+Cada frame de un sprite sheet se recorta y se recodifica como PNG propio,
+así `pngdec` solo descomprime el frame pedido y no la tira completa.
+Copia el archivo resultante a la raíz del dispositivo; `Menu` lo usa si existe.
+"""
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+from atlas import ATLAS_MAGIC, ENTRY_FORMAT, ENTRY_SIZE, HEADER_FORMAT, HEADER_SIZE  # noqa: E402
+from anim_registry import frame_sources  # noqa: E402
+from pngcodec import crop_rgba, decode_rgba, encode_rgba  # noqa: E402
+import menu  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def atlas_sources(pet, animations=None):
+    """(archivo, origen) de cada frame (de `animations`, o de todas), icono y de `poop.png`."""
+    yield from frame_sources(pet.animations if animations is None else animations)
+    for icon_pair in pet.icons:
+        for icon in icon_pair:
+            yield icon, None
+    yield pet.poop_image, None
+
+
+def build(pet, path):
+    decoded = {}
+    blobs = {}  # PNG -> offset relativo, para compartir frames idénticos
+    entries = []
+    data = bytearray()
+    for filename, source in atlas_sources(pet):
+        if filename not in decoded:
+            try:
+                decoded[filename] = decode_rgba(filename)
+            except OSError as e:
+                print(f"Omitiendo {filename}: {e}")
+                decoded[filename] = None
+        if decoded[filename] is None:
+            continue
+        width, height, rgba = decoded[filename]
+        if source is None:
+            source = (0, 0, width, height)
+        sx, sy, sw, sh = source
+        sw = min(sw, width - sx)
+        sh = min(sh, height - sy)
+        blob = encode_rgba(sw, sh, crop_rgba(width, rgba, (sx, sy, sw, sh)))
+        if blob not in blobs:
+            blobs[blob] = len(data)
+            data += blob
+        entries.append((filename, blobs[blob], len(blob), sw, sh, sx))
+
+    names = '\n'.join(e[0] for e in entries).encode()
+    data_start = HEADER_SIZE + len(entries) * ENTRY_SIZE + len(names)
+    with open(path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, ATLAS_MAGIC, len(entries), len(names)))
+        for _, offset, size, w, h, sx in entries:
+            f.write(struct.pack(ENTRY_FORMAT, data_start + offset, size, w, h, sx))
+        f.write(names)
+        f.write(data)
+    return len(entries), data_start + len(data)
+
+
+def main(path='sprites.atlas'):
+    count, size = build(menu.Menu(), path)
+    print(f"{path}: {count} entradas, {size} bytes")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,35 @@
+"""Conversor offline: genera los frames RGB565 + máscara de todas las animaciones.
+
+Uso (en el host, desde la raíz del repositorio):
+    python tools/build_frame_cache.py [directorio_salida]
+
+Copia el directorio resultante (por defecto `cache/`) a la raíz del
+dispositivo para que `FrameCache` cargue los frames sin decodificar PNGs.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+from anim_registry import frame_sources  # noqa: E402
+from frame_cache import cache_name  # noqa: E402
+import menu  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def main(out_dir='cache'):
+    pet = menu.Menu()
+    os.makedirs(out_dir, exist_ok=True)
+    total = 0
+    for filename, source in frame_sources(pet.animations):
+        size = pet.frame_cache.save(filename, source, os.path.join(out_dir, cache_name(filename, source)))
+        total += size
+    print(f"{out_dir}: {total} bytes")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,77 @@
+"""Genera `asset_manifest.py`: la tabla congelada de assets que se comprueba al arrancar.
+
+Uso (en el host, desde la raíz del repositorio):
+    python tools/build_manifest.py [asset_manifest.py]
+
+Solo lee la cabecera IHDR de cada PNG (ancho y alto), el tamaño del archivo
+y su CRC32. El número de frames sale de `sprite_sheet_config()`; el tamaño de
+cada frame se deduce de ahí en `anim_registry`, así que no hace falta
+escribirlo a mano en la configuración. Vuelve a ejecutarlo y copia el módulo
+al dispositivo (o congélalo en el firmware) cada vez que cambie un PNG.
+"""
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+from pngcodec import read_header  # noqa: E402
+from menu import Menu, sprite_sheet_config  # noqa: E402
+
+
+def asset_frames():
+    """(archivo -> número de frames, archivos con 'frame_width' fijado a mano)."""
+    frames = {}
+    fixed_width = set()
+
+    def add(filename, count):
+        if frames.setdefault(filename, count) != count:
+            print(f"Aviso: {filename} se usa con {frames[filename]} y con {count} frames")
+
+    for details in sprite_sheet_config().values():
+        if details['type'] == 'sprite_sheet':
+            add(details['file'], details['num_frames'])
+            if 'frame_width' in details:
+                fixed_width.add(details['file'])
+        else:
+            for filename in details['frames']:
+                add(filename, 1)
+    for icon_pair in Menu.ICONS:
+        for icon in icon_pair:
+            add(icon, 1)
+    add(Menu.POOP_IMAGE, 1)
+    return frames, fixed_width
+
+
+def build(path):
+    lines = [
+        '"""Manifiesto de assets generado por tools/build_manifest.py; no editar a mano."""',
+        '',
+        '# archivo: (ancho, alto, frames, tamaño en bytes, crc32)',
+        'ASSETS = {',
+    ]
+    count = 0
+    frame_counts, fixed_width = asset_frames()
+    for filename, frames in frame_counts.items():
+        try:
+            width, height = read_header(filename)[:2]
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Omitiendo {filename}: {e}")
+            continue
+        if width % frames and filename not in fixed_width:
+            print(f"Aviso: {filename} mide {width} px, no divisible entre {frames} frames")
+        lines.append(f"    {filename!r}: ({width}, {height}, {frames}, {len(data)}, 0x{zlib.crc32(data):08x}),")
+        count += 1
+    lines.append('}')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    print(f"{path}: {count} assets")
+
+
+if __name__ == '__main__':
+    build(sys.argv[1] if len(sys.argv) > 1 else 'asset_manifest.py')
@@ -0,0 +1,82 @@
+"""Convierte los frames, iconos y `poop.png` al paquete de sprites RLE de sprite_rle.py.
+
+Uso (en el host, desde la raíz del repositorio):
+    python tools/build_rle.py [sprites.rle] [animación ...]
+
+Sin animaciones se empaquetan todas; tools/bench_rle.py da lo que ocupa y
+lo que se gana con cada una. Lo que no está en el paquete (las animaciones
+no indicadas y los frames de más de 256 colores) se sigue dibujando desde
+los PNG.
+
+Cada frame se recorta del PNG original y se codifica por filas en tramos
+transparentes y opacos, con series de un color de su paleta. Copia el archivo resultante a la raíz del
+dispositivo; `Menu` dibuja desde él los frames empaquetados sin usar `pngdec`.
+"""
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+from atlas import ENTRY_FORMAT, ENTRY_SIZE, HEADER_FORMAT, HEADER_SIZE  # noqa: E402
+from build_atlas import atlas_sources  # noqa: E402
+from pngcodec import crop_rgba, decode_rgba, rgba_to_rgb565  # noqa: E402
+from sprite_rle import RLE_MAGIC, encode  # noqa: E402
+import menu  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def build(pet, path, names=()):
+    decoded = {}
+    blobs = {}  # Frame RLE -> offset relativo, para compartir frames idénticos
+    entries = []
+    data = bytearray()
+    animations = [anim for anim in pet.animations if anim.name in names] if names else None
+    for filename, source in atlas_sources(pet, animations):
+        if filename not in decoded:
+            try:
+                decoded[filename] = decode_rgba(filename)
+            except OSError as e:
+                print(f"Omitiendo {filename}: {e}")
+                decoded[filename] = None
+        if decoded[filename] is None:
+            continue
+        width, height, rgba = decoded[filename]
+        if source is None:
+            source = (0, 0, width, height)
+        sx, sy, sw, sh = source
+        sw = min(sw, width - sx)
+        sh = min(sh, height - sy)
+        pixels, mask = rgba_to_rgb565(sw, sh, crop_rgba(width, rgba, (sx, sy, sw, sh)))
+        try:
+            blob = encode(sw, sh, pixels, mask)
+        except ValueError as e:
+            print(f"Omitiendo {filename} {source}: {e}")
+            continue
+        if blob not in blobs:
+            blobs[blob] = len(data)
+            data += blob
+        entries.append((filename, blobs[blob], len(blob), sw, sh, sx))
+
+    names = '\n'.join(e[0] for e in entries).encode()
+    data_start = HEADER_SIZE + len(entries) * ENTRY_SIZE + len(names)
+    with open(path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, RLE_MAGIC, len(entries), len(names)))
+        for _, offset, size, w, h, sx in entries:
+            f.write(struct.pack(ENTRY_FORMAT, data_start + offset, size, w, h, sx))
+        f.write(names)
+        f.write(data)
+    return len(entries), data_start + len(data)
+
+
+def main(path='sprites.rle', *names):
+    count, size = build(menu.Menu(), path, names)
+    print(f"{path}: {count} entradas, {size} bytes")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,132 @@
+"""Comprobación de memoria del bucle de render: el heap no debe crecer en N frames.
+
+Funciona en el dispositivo (`mpremote run tools/check_heap.py`, con gc.mem_alloc)
+y en el host (con instantáneas de tracemalloc). Tras unos frames de
+calentamiento (para llenar cachés y capas de fondo) recoge la basura, ejecuta
+N vueltas del bucle principal y vuelve a recoger: el heap ocupado debe ser el
+mismo. Se mide en la pantalla principal y con cada menú de SCREENS abierto. En el host se comparan las instantáneas filtradas a los módulos de la
+raíz del repositorio, porque el intérprete y los sustitutos de tools/host
+asignan donde MicroPython no; se listan las líneas que han crecido. En el
+dispositivo, con el gc desactivado, mide además los bytes asignados por frame.
+
+Uso:
+    python tools/check_heap.py [frames]
+
+Termina con código 1 si el heap ha crecido.
+"""
+import gc
+import sys
+import time
+from array import array
+
+if sys.implementation.name != 'micropython':
+    import os
+    import tracemalloc
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+
+    ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def allocated():
+        """Instantánea de lo asignado desde los módulos de la raíz (no desde tools/)."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(True, os.path.join(ROOT, '*.py')),
+            tracemalloc.Filter(False, os.path.join(ROOT, 'tools', '*')),
+        ))
+
+    def growth_of(before, after):
+        """Bytes que han crecido, listando las líneas responsables."""
+        growth = 0
+        for stat in after.compare_to(before, 'lineno'):
+            if stat.size_diff:
+                print(f"  {stat.size_diff:+d} B ({stat.count_diff:+d}) {stat.traceback}")
+                growth += stat.size_diff
+        return growth
+
+    def start():
+        tracemalloc.start()
+else:
+    def allocated():
+        return gc.mem_alloc()
+
+    def growth_of(before, after):
+        return after - before
+
+    def start():
+        pass
+
+from menu import Menu  # noqa: E402
+
+WARMUP_FRAMES = 60
+SCREENS = (None, 'food', 'stats')  # Pantalla principal y menús estáticos que se miden
+SETTLE_FRAMES = 20  # Con la medición ya activa, para que tracemalloc vea los objetos que se reemplazan
+
+
+class HeapCheckMenu(Menu):
+    PERSIST_STATE = False  # Sin escrituras en flash durante la comprobación
+
+
+def frame(pet):
+    """Una vuelta del bucle principal, sin esperar."""
+    pet.draw_menu()
+    pet.navigate()
+    pet.check_sleep_status()
+    pet.update_poop()
+
+
+def measure(pet, name, frames, period_ms, per_frame):
+    """Crecimiento del heap en `frames` vueltas con la pantalla `name` (None: la principal)."""
+    pet.screens.reset()
+    if name is not None:
+        pet.push_screen(pet.screens.get(name))
+    for _ in range(WARMUP_FRAMES):
+        frame(pet)
+        time.sleep_ms(period_ms)
+    start()
+    for _ in range(SETTLE_FRAMES):
+        frame(pet)
+        time.sleep_ms(period_ms)
+
+    on_device = sys.implementation.name == 'micropython'
+    gc.collect()
+    before = allocated()
+    for i in range(frames):
+        if on_device:
+            gc.disable()
+            a = gc.mem_alloc()
+            frame(pet)
+            per_frame[i] = gc.mem_alloc() - a
+            gc.enable()
+        else:
+            frame(pet)
+        time.sleep_ms(period_ms)
+    gc.collect()
+    growth = growth_of(before, allocated())
+
+    if on_device:
+        zero = sum(1 for n in per_frame if n == 0)
+        print(f"asignado por frame: media {sum(per_frame) // len(per_frame)} B, máx {max(per_frame)} B, "
+              f"{zero}/{len(per_frame)} frames sin asignar")
+    print(f"{name or 'main'}: crecimiento del heap en {frames} frames: {growth} bytes")
+    return growth
+
+
+def main(frames=200):
+    frames = int(frames)
+    period_ms = 1000 // Menu.TARGET_FPS
+    pet = HeapCheckMenu(use_timer=False)
+    pet.next_poop_time = time.time() + 3600  # Régimen estable: que no aparezca la caca a mitad de la medición
+    on_device = sys.implementation.name == 'micropython'
+    per_frame = array('i', [0] * (frames if on_device else 0))  # Reservado antes de medir
+    failed = False
+    for name in SCREENS:
+        if measure(pet, name, frames, period_ms, per_frame) > 0:
+            failed = True
+    if failed:
+        print("FALLO: el heap ha crecido")
+        sys.exit(1)
+    print("OK")
+
+
+main(*sys.argv[1:])
@@ -0,0 +1,113 @@
+"""Comprobación: los sprites RLE (sprite_rle.py) dibujan lo mismo que `pngdec`.
+
+El `blit_rle` del dispositivo es viper y solo se define en MicroPython, así
+que en el host se comprueban dos cosas por separado sobre cada frame de
+sprite_sheets, en la posición de la mascota y en posiciones recortadas por
+los bordes de la pantalla:
+
+- el `blit_rle` del host (el que usa `RleSprites.blit` aquí);
+- el cuerpo del `blit_rle` viper, tomado tal cual de sprite_rle.py sin el
+  decorador ni las anotaciones y ejecutado con `ptr8`/`ptr16` emulados
+  (`ptr16` lee y escribe medias palabras little-endian, como el RP2040).
+
+Ambos se comparan byte a byte con el framebuffer que deja `pngdec`, partiendo
+de un framebuffer con ruido para que se note cualquier píxel de más o de
+menos. Termina con código 1 si algún frame no coincide.
+
+Uso:
+    python tools/check_rle.py
+"""
+import ast
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv  # noqa: E402
+hostenv.install()
+
+from anim_registry import frame_sources  # noqa: E402
+import menu  # noqa: E402
+import sprite_rle  # noqa: E402
+
+menu.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+class Ptr16:
+    """`ptr16` de viper sobre un buffer: medias palabras little-endian."""
+
+    def __init__(self, buffer):
+        self.bytes = memoryview(buffer).cast('B')
+
+    def __getitem__(self, i):
+        return self.bytes[2 * i] | self.bytes[2 * i + 1] << 8
+
+    def __setitem__(self, i, value):
+        self.bytes[2 * i] = value & 0xFF
+        self.bytes[2 * i + 1] = (value >> 8) & 0xFF
+
+
+def viper_blit():
+    """El `blit_rle` viper de sprite_rle.py, ejecutable en el host."""
+    with open(sprite_rle.__file__) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if not isinstance(node, ast.If):
+            continue
+        for func in node.body:
+            if isinstance(func, ast.FunctionDef) and func.name == 'blit_rle':
+                func.decorator_list = []
+                for arg in func.args.args:
+                    arg.annotation = None
+                namespace = {'ptr8': lambda b: memoryview(b).cast('B'), 'ptr16': Ptr16}
+                exec(compile(ast.Module(body=[func], type_ignores=[]), sprite_rle.__file__, 'exec'), namespace)
+                return namespace['blit_rle']
+    raise SystemExit("No se encontró el blit_rle viper en sprite_rle.py")
+
+
+def main():
+    pet = menu.Menu(use_timer=False)
+    pet.frame_cache = None
+    sprites = pet.sprites
+    if sprites is None:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from bench_rle import host_sprites
+        sprites = host_sprites(pet)
+    blit = viper_blit()
+    fb = memoryview(pet.display)
+    width, height = sprites.WIDTH, sprites.HEIGHT
+    rng = random.Random(1)
+    cases = 0
+    failures = 0
+    for filename, source in frame_sources(pet.animations):
+        w, h = source[2], source[3]
+        positions = ((pet.bat_x, pet.bat_y), (-w // 2, -h // 2), (width - w // 2, height - h // 2),
+                     (rng.randint(-w, width), rng.randint(-h, height)))
+        for x, y in positions:
+            noise = bytes(rng.getrandbits(8) for _ in range(len(fb)))
+            fb[:] = noise
+            pet.png.decode(x, y, source=pet.open_png(filename, source))
+            expected = bytes(fb)
+
+            fb[:] = noise
+            sprites.blit(sprites.index[(filename, source[0])], x, y)
+            host_ok = bytes(fb) == expected
+
+            fb[:] = noise
+            offset, size, _, rows, _ = sprites.index[(filename, source[0])]
+            sprites.file.seek(offset)
+            blit(pet.display, width, height, x, y, rows, sprites.file.read(size))
+            viper_ok = bytes(fb) == expected
+
+            cases += 1
+            if not (host_ok and viper_ok):
+                failures += 1
+                print(f"FALLO {filename} x={source[0]} en ({x}, {y}): "
+                      f"host {'ok' if host_ok else 'distinto'}, viper {'ok' if viper_ok else 'distinto'}")
+    print(f"{cases} casos, {failures} distintos de pngdec")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Motor de flota: N mascotas como arrays de NumPy (estructura de arrays), para simulaciones en el host.
+
+Aplica las mismas reglas que `pet_model` (y por tanto que `Menu`), pero a
+todas las mascotas a la vez: la bajada de estadísticas, los incrementos de
+la tabla de efectos con su límite del 90%, los tiempos de espera, el castigo
+por repetir una opción, el sueño y la caca son operaciones vectorizadas.
+
+    fleet = Fleet(10000, seed=1)
+    for _ in range(1440):
+        fleet.step(60, fleet.random_actions(0.05))
+    print(fleet.summary())
+
+Las acciones de cada paso son un array de enteros con un índice de
+`Fleet.ACTIONS` por mascota, o -1 para no hacer nada. Todas las mascotas
+comparten el reloj; cada paso primero avanza el tiempo y luego aplica las
+acciones, como el bucle principal de menu.py.
+"""
+import numpy as np
+
+import hostenv
+
+hostenv.install()
+
+import pet_model  # noqa: E402
+from effects import EFFECTS, CLEAR, NAP, SLEEP_NIGHT, LIMIT, STAT_MAX, STAT_NAMES  # noqa: E402
+
+# Acciones fuera de la tabla de efectos, detrás de las de los menús
+CLEAR_ACTION = 'clear'
+NAP_ACTION = 'nap'
+NIGHT_ACTION = 'sleep'
+
+
+class Fleet:
+    # Opciones de menú en el orden de la tabla de efectos, y después las especiales
+    EFFECTS = tuple(effect for menu in EFFECTS for effect in EFFECTS[menu])
+    ACTIONS = tuple(effect.action for effect in EFFECTS) + (CLEAR_ACTION, NAP_ACTION, NIGHT_ACTION)
+    COOLDOWNS = tuple(pet_model.COOLDOWNS)
+
+    def __init__(self, n, seed=0, now=0.0):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.now = float(now)
+        stats = len(STAT_NAMES)
+        effects = len(self.EFFECTS)
+
+        # Tabla de efectos compilada a matrices: una fila por opción de menú
+        self.deltas = np.array([list(e.deltas) for e in self.EFFECTS], dtype=np.float32)
+        self.limited = np.zeros((effects, stats), dtype=bool)
+        for a, effect in enumerate(self.EFFECTS):
+            self.limited[a, list(effect.limited)] = True
+        self.cooldown_of = np.array([self.COOLDOWNS.index(e.cooldown) if e.cooldown else -1
+                                     for e in self.EFFECTS], dtype=np.int8)
+        self.cooldown_s = np.array([pet_model.COOLDOWNS[c] for c in self.COOLDOWNS], dtype=np.float64)
+        self.decay = np.array(pet_model.DECAY, dtype=np.float32)
+        self.clear_deltas = np.array(CLEAR.deltas, dtype=np.float32)
+        self.sleep_deltas = np.array([list(NAP.deltas), list(SLEEP_NIGHT.deltas)],
+                                     dtype=np.float32)
+        self.sleep_s = np.array([pet_model.NAP_S, pet_model.NIGHT_S], dtype=np.float64)
+
+        # Estado: una fila (o un elemento) por mascota
+        self.stats = np.full((n, stats), 70, dtype=np.float32)
+        self.is_sleeping = np.zeros(n, dtype=bool)
+        self.sleep_end_time = np.zeros(n)
+        self.poop_visible = np.zeros(n, dtype=bool)
+        self.next_poop_time = self.now + self.poop_delays(n)
+        # Colas circulares de selecciones, como RateLimiter: (mascota, opción, SELECTION_LIMIT + 1)
+        self.capacity = pet_model.SELECTION_LIMIT + 1
+        self.selections = np.zeros((n, effects, self.capacity))
+        self.heads = np.zeros((n, effects), dtype=np.int8)
+        self.counts = np.zeros((n, effects), dtype=np.int8)
+        self.cooldown_last = np.full((n, len(self.COOLDOWNS)), -np.inf)
+
+        # Contadores agregados
+        self.pet_seconds = 0.0
+        self.applied = 0
+        self.rejected = 0
+        self.penalties = 0
+        self.on_cooldown = 0
+
+    def poop_delays(self, count):
+        return self.rng.integers(pet_model.POOP_MIN_S, pet_model.POOP_MAX_S + 1, count).astype(np.float64)
+
+    def random_actions(self, probability):
+        """Cada mascota elige una acción al azar con esa probabilidad (si no, -1)."""
+        actions = self.rng.integers(0, len(self.ACTIONS), self.n, dtype=np.int16)
+        actions[self.rng.random(self.n) >= probability] = -1
+        return actions
+
+    def step(self, dt, actions=None):
+        """Avanza `dt` segundos y aplica las acciones elegidas por cada mascota."""
+        self.advance(self.now + dt)
+        if actions is not None:
+            self.act(actions)
+
+    def advance(self, now):
+        dt = now - self.now
+        if dt > 0:
+            # Bajada lineal de todas las estadísticas de todas las mascotas, con suelo en 0
+            self.stats -= self.decay * np.float32(dt / 60)
+            np.maximum(self.stats, 0, out=self.stats)
+            self.pet_seconds += dt * self.n
+            self.now = now
+        self.is_sleeping &= self.sleep_end_time > now
+        self.poop_visible |= self.next_poop_time <= now
+
+    def act(self, actions):
+        effects = len(self.EFFECTS)
+        now = self.now
+
+        # Opciones de menú: tiempo de espera, registro, límite, incrementos y castigo
+        pets = np.nonzero((actions >= 0) & (actions < effects))[0]
+        if len(pets):
+            chosen = actions[pets].astype(np.intp)
+            cooldown = self.cooldown_of[chosen]
+            has_cooldown = cooldown >= 0
+            waiting = np.zeros(len(pets), dtype=bool)
+            waiting[has_cooldown] = (now - self.cooldown_last[pets[has_cooldown], cooldown[has_cooldown]]
+                                     < self.cooldown_s[cooldown[has_cooldown]])
+            self.on_cooldown += int(waiting.sum())
+            pets, chosen, cooldown = pets[~waiting], chosen[~waiting], cooldown[~waiting]
+
+            self.record(pets, chosen, now)
+            rejected = (self.limited[chosen] & (self.stats[pets] > LIMIT)).any(axis=1)
+            ok = pets[~rejected]
+            stats = self.stats[ok] + self.deltas[chosen[~rejected]]
+            np.clip(stats, 0, STAT_MAX, out=stats)
+            self.stats[ok] = stats
+            frequent = self.exceeded(ok, chosen[~rejected], now)
+            high = (stats > LIMIT).any(axis=1)
+            self.applied += len(ok)
+            self.rejected += int(rejected.sum())
+            self.penalties += int(rejected.sum()) + int((high | frequent).sum())
+
+            # Las pantallas empiezan el tiempo de espera aunque la acción se rechace
+            timed = cooldown >= 0
+            self.cooldown_last[pets[timed], cooldown[timed]] = now
+
+        # Limpiar la caca
+        pets = np.nonzero(actions == effects)[0]
+        if len(pets):
+            stats = self.stats[pets] + self.clear_deltas
+            np.clip(stats, 0, STAT_MAX, out=stats)
+            self.stats[pets] = stats
+            self.poop_visible[pets] = False
+            self.next_poop_time[pets] = now + self.poop_delays(len(pets))
+
+        # Menú de sueño: despierta a la mascota dormida o la pone a dormir (siesta o noche)
+        for kind in (0, 1):
+            pets = np.nonzero(actions == effects + 1 + kind)[0]
+            if not len(pets):
+                continue
+            asleep = self.is_sleeping[pets]
+            self.is_sleeping[pets[asleep]] = False
+            self.sleep_end_time[pets[asleep]] = 0
+            awake = pets[~asleep]
+            stats = self.stats[awake] + self.sleep_deltas[kind]
+            np.clip(stats, 0, STAT_MAX, out=stats)
+            self.stats[awake] = stats
+            self.is_sleeping[awake] = True
+            self.sleep_end_time[awake] = now + self.sleep_s[kind]
+
+    def record(self, pets, chosen, now):
+        """Añade `now` a la cola de selecciones de cada (mascota, opción)."""
+        heads = self.heads[pets, chosen]
+        self.selections[pets, chosen, heads] = now
+        self.heads[pets, chosen] = (heads + 1) % self.capacity
+        self.counts[pets, chosen] = np.minimum(self.counts[pets, chosen] + 1, self.capacity)
+
+    def exceeded(self, pets, chosen, now):
+        """Como RateLimiter.exceeded: más de SELECTION_LIMIT selecciones en SELECTION_WINDOW_S."""
+        limit = pet_model.SELECTION_LIMIT
+        oldest = self.selections[pets, chosen, (self.heads[pets, chosen] - 1 - limit) % self.capacity]
+        return (self.counts[pets, chosen] > limit) & (now - oldest <= pet_model.SELECTION_WINDOW_S)
+
+    def summary(self):
+        means = self.stats.mean(axis=0)
+        return {
+            'pets': self.n,
+            'pet_minutes': self.pet_seconds / 60,
+            'mean': {name: round(float(means[i]), 2) for i, name in enumerate(STAT_NAMES)},
+            'zero': {name: int((self.stats[:, i] <= 0).sum()) for i, name in enumerate(STAT_NAMES)},
+            'sleeping': int(self.is_sleeping.sum()),
+            'poop_visible': int(self.poop_visible.sum()),
+            'applied': self.applied,
+            'rejected': self.rejected,
+            'penalties': self.penalties,
+            'on_cooldown': self.on_cooldown,
+        }
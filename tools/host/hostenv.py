@@ -0,0 +1,46 @@
+"""Prepara un intérprete CPython para importar los módulos del dispositivo.
+
+Añade este directorio (sustitutos de `picographics`, `machine`, `pngdec` y
+`micropython`) y la raíz del repositorio a `sys.path`, y completa el módulo
+`time` con las funciones `ticks_*` de MicroPython.
+"""
+import os
+import sys
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(os.path.dirname(HOST_DIR))
+
+_TICKS_PERIOD = 1 << 30
+
+
+def _ticks_ms():
+    return int(time.monotonic() * 1000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_us():
+    return int(time.monotonic() * 1000000) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_add(ticks, delta):
+    return (ticks + delta) & (_TICKS_PERIOD - 1)
+
+
+def _ticks_diff(a, b):
+    return ((a - b + _TICKS_PERIOD // 2) & (_TICKS_PERIOD - 1)) - _TICKS_PERIOD // 2
+
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000)
+
+
+def install():
+    for path in (HOST_DIR, REPO_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    for name, func in (('ticks_ms', _ticks_ms), ('ticks_us', _ticks_us),
+                       ('ticks_add', _ticks_add), ('ticks_diff', _ticks_diff),
+                       ('sleep_ms', _sleep_ms)):
+        if not hasattr(time, name):
+            setattr(time, name, func)
+    os.chdir(REPO_DIR)
@@ -0,0 +1,49 @@
+"""Sustituto de host para el módulo `machine` de MicroPython."""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, pin_id, mode=IN, pull=None):
+        self.id = pin_id
+        self._value = 1  # Botones con pull-up: 1 = suelto
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+    def irq(self, handler=None, trigger=IRQ_FALLING):
+        self.handler = handler
+
+
+class Timer:
+    PERIODIC = 1
+    ONE_SHOT = 0
+
+    def __init__(self, timer_id=-1):
+        self.callback = None
+        self.period = 0
+
+    def init(self, period=0, mode=PERIODIC, callback=None):
+        self.period = period
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
+
+
+def lightsleep(time_ms=None):
+    import time
+    if time_ms is not None:
+        time.sleep(time_ms / 1000)
+
+
+def idle():
+    # En el dispositivo espera a la siguiente interrupción; aquí basta con ceder un poco la CPU
+    import time
+    time.sleep(0.001)
@@ -0,0 +1,19 @@
+"""Sustituto de host para el módulo `micropython`.
+
+En el dispositivo, `@micropython.native` y `@micropython.viper` los procesa
+el compilador al ver el decorador literal; no existen como atributos del
+módulo en tiempo de ejecución. En el host son decoradores identidad, así
+que las funciones decoradas se ejecutan como Python normal.
+"""
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
+
+
+def const(value):
+    return value
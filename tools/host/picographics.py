@@ -0,0 +1,73 @@
+"""Sustituto de host para el módulo `picographics` de Pimoroni.
+
+Mantiene un framebuffer RGB565 en memoria con la misma disposición que el
+firmware (2 bytes por píxel, big-endian). La clase hereda de `bytearray` para
+exponer el protocolo de buffer igual que el objeto real (`memoryview(display)`).
+"""
+
+DISPLAY_PICO_DISPLAY = 0
+PEN_RGB565 = 6
+
+_BOUNDS = {
+    DISPLAY_PICO_DISPLAY: (240, 135),
+}
+
+
+class PicoGraphics(bytearray):
+    def __init__(self, display=DISPLAY_PICO_DISPLAY, pen_type=PEN_RGB565, rotate=0):
+        self._width, self._height = _BOUNDS[display]
+        super().__init__(self._width * self._height * 2)
+        self._pen = 0
+        self.backlight = 1.0
+        self.update_count = 0
+        self.pixels_sent = 0  # Píxeles enviados por SPI (update + partial_update)
+
+    def get_bounds(self):
+        return self._width, self._height
+
+    def set_backlight(self, brightness):
+        self.backlight = brightness
+
+    def create_pen(self, r, g, b):
+        return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+    def set_pen(self, pen):
+        self._pen = pen
+
+    def pixel(self, x, y):
+        if 0 <= x < self._width and 0 <= y < self._height:
+            i = (y * self._width + x) * 2
+            self[i] = self._pen >> 8
+            self[i + 1] = self._pen & 0xFF
+
+    def rectangle(self, x, y, w, h):
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self._width, x + w)
+        y1 = min(self._height, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        row = bytes((self._pen >> 8, self._pen & 0xFF)) * (x1 - x0)
+        for yy in range(y0, y1):
+            i = (yy * self._width + x0) * 2
+            self[i:i + len(row)] = row
+
+    def clear(self):
+        self[:] = bytes((self._pen >> 8, self._pen & 0xFF)) * (self._width * self._height)
+
+    def measure_text(self, text, scale=2, spacing=1):
+        return len(text) * 6 * scale
+
+    def text(self, text, x, y, wordwrap=-1, scale=2, angle=0, spacing=1):
+        # Aproximación: cada carácter visible es un bloque de 5x7 escalado
+        for i, ch in enumerate(text):
+            if ch != ' ':
+                self.rectangle(x + i * 6 * scale, y, 5 * scale, 7 * scale)
+
+    def update(self):
+        self.update_count += 1
+        self.pixels_sent += self._width * self._height
+
+    def partial_update(self, x, y, w, h):
+        self.update_count += 1
+        self.pixels_sent += w * h
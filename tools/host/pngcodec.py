@@ -0,0 +1,192 @@
+"""Codificador/decodificador PNG mínimo en Python puro para las herramientas de host.
+
+Decodifica los formatos usados por los assets del proyecto: escala de grises,
+RGB, paleta (1/2/4/8 bits) y RGBA de 8 bits, sin entrelazado. Codifica siempre
+RGBA de 8 bits.
+"""
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Número de canales por tipo de color PNG
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def read_header(path):
+    """Lee solo la cabecera IHDR: devuelve (width, height, bit_depth, color_type)."""
+    with open(path, 'rb') as f:
+        head = f.read(33)
+    if head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+        raise ValueError(f"{path} no es un PNG válido")
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', head[16:26])
+    return width, height, bit_depth, color_type
+
+
+def _chunks(data):
+    pos = 8
+    while pos < len(data):
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        yield kind, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def _unfilter(raw, stride, height, bpp):
+    """Deshace los filtros por scanline y devuelve la imagen sin filtrar."""
+    out = bytearray(stride * height)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if ftype == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif ftype == 2:
+            for i in range(stride):
+                line[i] = (line[i] + prev[i]) & 0xFF
+        elif ftype == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                upleft = prev[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + _paeth(left, prev[i], upleft)) & 0xFF
+        elif ftype != 0:
+            raise ValueError(f"Filtro PNG desconocido: {ftype}")
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def decode_rgba(path):
+    """Decodifica un archivo PNG completo y devuelve (width, height, rgba_bytes)."""
+    with open(path, 'rb') as f:
+        return decode_rgba_bytes(f.read(), path)
+
+
+def decode_rgba_bytes(data, path='<RAM>'):
+    """Decodifica un PNG en memoria y devuelve (width, height, rgba_bytes)."""
+    data = bytes(data)
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError(f"{path} no es un PNG válido")
+
+    idat = bytearray()
+    palette = None
+    trns = None
+    for kind, body in _chunks(data):
+        if kind == b'IHDR':
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', body)
+        elif kind == b'PLTE':
+            palette = body
+        elif kind == b'tRNS':
+            trns = body
+        elif kind == b'IDAT':
+            idat += body
+        elif kind == b'IEND':
+            break
+
+    if interlace:
+        raise ValueError(f"{path}: PNG entrelazado no soportado")
+    channels = _CHANNELS[color_type]
+    bits_per_pixel = channels * bit_depth
+    stride = (width * bits_per_pixel + 7) // 8
+    bpp = max(1, bits_per_pixel // 8)
+    pixels = _unfilter(zlib.decompress(bytes(idat)), stride, height, bpp)
+
+    rgba = bytearray(width * height * 4)
+    o = 0
+    for y in range(height):
+        row = y * stride
+        for x in range(width):
+            if bit_depth < 8:
+                bit = x * bit_depth
+                shift = 8 - bit_depth - (bit & 7)
+                v = (pixels[row + (bit >> 3)] >> shift) & ((1 << bit_depth) - 1)
+            else:
+                v = pixels[row + x * channels]
+            if color_type == 3:
+                r, g, b = palette[v * 3:v * 3 + 3]
+                a = trns[v] if trns is not None and v < len(trns) else 255
+            elif color_type == 6:
+                i = row + x * 4
+                r, g, b, a = pixels[i:i + 4]
+            elif color_type == 2:
+                i = row + x * 3
+                r, g, b = pixels[i:i + 3]
+                a = 255
+            elif color_type == 4:
+                i = row + x * 2
+                r = g = b = pixels[i]
+                a = pixels[i + 1]
+            else:
+                if bit_depth < 8:
+                    v = v * 255 // ((1 << bit_depth) - 1)
+                r = g = b = v
+                a = 255
+            rgba[o] = r
+            rgba[o + 1] = g
+            rgba[o + 2] = b
+            rgba[o + 3] = a
+            o += 4
+    return width, height, rgba
+
+
+def crop_rgba(width, rgba, source):
+    """Recorta el rectángulo (x, y, w, h) de una imagen RGBA."""
+    sx, sy, sw, sh = source
+    out = bytearray()
+    for row in range(sy, sy + sh):
+        start = (row * width + sx) * 4
+        out += rgba[start:start + sw * 4]
+    return out
+
+
+def _chunk(kind, body):
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+
+def encode_rgba(width, height, rgba):
+    """Codifica una imagen RGBA de 8 bits como PNG (filtro 0, compresión máxima)."""
+    stride = width * 4
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)
+        raw += rgba[y * stride:(y + 1) * stride]
+    return (PNG_SIGNATURE
+            + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + _chunk(b'IDAT', zlib.compress(bytes(raw), 9))
+            + _chunk(b'IEND', b''))
+
+
+def rgb565(r, g, b):
+    """Convierte un color a RGB565 con el orden de bytes de PicoGraphics (big-endian)."""
+    return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+
+
+def rgba_to_rgb565(width, height, rgba):
+    """Píxeles RGB565 big-endian y máscara de 1 bit (opaco si alfa >= 128, como `pngdec`)."""
+    pixels = bytearray(width * height * 2)
+    mask = bytearray((width * height + 7) // 8)
+    for i in range(width * height):
+        if rgba[i * 4 + 3] >= 128:
+            pen = rgb565(rgba[i * 4], rgba[i * 4 + 1], rgba[i * 4 + 2])
+            pixels[i * 2] = pen >> 8
+            pixels[i * 2 + 1] = pen & 0xFF
+            mask[i >> 3] |= 1 << (i & 7)
+    return pixels, mask
@@ -0,0 +1,113 @@
+"""Simulador headless: ejecuta `Menu` frame a frame con un reloj virtual, sin esperas.
+
+    sim = Simulator(PERSIST_STATE=False)
+    sim.press('y')
+    sim.run(50)
+
+El reloj virtual sustituye a `time.ticks_ms`, `time.ticks_us` y `time.time`,
+así que las animaciones, la caca, el sueño y la bajada de estadísticas
+avanzan al ritmo de Menu.TARGET_FPS aunque el host vaya a toda velocidad.
+Las opciones con nombre sobrescriben constantes de `Menu` solo para esta
+instancia (se crea una subclase).
+"""
+import random
+import time
+
+import hostenv
+
+_TICKS_PERIOD = 1 << 30
+
+
+class VirtualClock:
+    def __init__(self):
+        self.ms = 0
+        self.epoch = int(time.time())
+        self.saved = None
+
+    def ticks_ms(self):
+        return self.ms & (_TICKS_PERIOD - 1)
+
+    def ticks_us(self):
+        return (self.ms * 1000) & (_TICKS_PERIOD - 1)
+
+    def time(self):
+        return self.epoch + self.ms / 1000
+
+    def install(self):
+        self.saved = (time.ticks_ms, time.ticks_us, time.time)
+        time.ticks_ms = self.ticks_ms
+        time.ticks_us = self.ticks_us
+        time.time = self.time
+
+    def uninstall(self):
+        if self.saved is not None:
+            time.ticks_ms, time.ticks_us, time.time = self.saved
+            self.saved = None
+
+
+class Simulator:
+    def __init__(self, seed=0, fps=None, **options):
+        hostenv.install()
+        self.clock = VirtualClock()
+        self.clock.install()
+        random.seed(seed)
+        import menu
+        menu_class = type('SimMenu', (menu.Menu,), options) if options else menu.Menu
+        self.menu = menu_class(use_timer=False)
+        self.frame_ms = 1000 // (fps or menu_class.TARGET_FPS)
+        self.frames = 0
+        self.released = []  # Pines pulsados sin interrupciones, se sueltan tras el frame
+        # Tiempo libre que se da a Menu.prefetch en cada frame; en el host no hay tiempo libre
+        # real (decodificar es mucho más lento), así que por defecto no se precarga
+        self.idle_ms = None
+
+    def close(self):
+        if self.menu.flusher is not None:
+            self.menu.flusher.close()
+        self.clock.uninstall()
+
+    def screen(self):
+        """Nombre de la pantalla actual, para agrupar las mediciones."""
+        return self.menu.screens.top.NAME
+
+    def press(self, button):
+        """Pulsa un botón: dispara la interrupción del pin, o lo deja bajo hasta el siguiente frame."""
+        pin = self.menu.buttons[button]
+        pin.value(0)
+        if self.menu.button_events is not None:
+            pin.handler(pin)
+            pin.value(1)
+            pin.handler(pin)  # Flanco de subida al soltar
+        else:
+            self.released.append(pin)
+
+    def step(self):
+        """Una vuelta del bucle principal de menu.py; devuelve los ns reales que ha tardado."""
+        m = self.menu
+        t0 = time.perf_counter_ns()
+        m.draw_menu()
+        m.navigate()
+        m.check_sleep_status()
+        m.update_poop()
+        if m.state_log is not None:
+            m.state_log.update(m)
+        elapsed = time.perf_counter_ns() - t0
+        if self.idle_ms is not None:
+            m.prefetch(self.idle_ms)  # Fuera de la medida: ocurre en el tiempo libre del frame
+        for pin in self.released:
+            pin.value(1)
+        self.released = []
+        # machine.Timer de las estadísticas
+        if time.ticks_diff(time.ticks_ms(), m.last_stats_tick) >= m.STATS_PERIOD_MS:
+            m.decrease_stats(None)
+        self.clock.ms += self.frame_ms
+        self.frames += 1
+        return elapsed
+
+    def run(self, frames):
+        for _ in range(frames):
+            self.step()
+
+    def advance(self, ms):
+        """Avanza el reloj sin dibujar (p. ej. para saltar hasta el fin de una animación)."""
+        self.clock.ms += ms
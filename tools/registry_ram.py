@@ -0,0 +1,43 @@
+"""Compara la RAM de la configuración de animaciones (dict de dicts) con el registro compilado.
+
+Funciona en el dispositivo (`mpremote run tools/registry_ram.py`, con gc.mem_alloc)
+y en el host (con tracemalloc; las cifras de CPython no son las de MicroPython).
+"""
+import gc
+import sys
+
+if sys.implementation.name != 'micropython':
+    import os
+    import tracemalloc
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+    import hostenv
+    hostenv.install()
+    tracemalloc.start()
+
+    def allocated():
+        return tracemalloc.get_traced_memory()[0]
+else:
+    def allocated():
+        return gc.mem_alloc()
+
+from anim_registry import compile_registry  # noqa: E402
+from menu import ASSETS, Menu, sprite_sheet_config  # noqa: E402
+
+
+def measure(build):
+    gc.collect()
+    before = allocated()
+    result = build()
+    gc.collect()
+    return allocated() - before, result
+
+
+def main():
+    config_bytes, config = measure(sprite_sheet_config)
+    registry_bytes, registry = measure(lambda: compile_registry(config, Menu.ONE_SHOT_ANIMATIONS, ASSETS, 240, 135))
+    print(f"dict de dicts:      {config_bytes} bytes")
+    print(f"registro compilado: {registry_bytes} bytes (incluye rectángulos y posiciones precalculados)")
+    print(f"ahorro:             {config_bytes - registry_bytes} bytes (negativo: el registro ocupa más)")
+
+
+main()
@@ -0,0 +1,26 @@
+"""Ejecuta el bucle de async_main en el host con asyncio de CPython.
+
+Uso:
+    python tools/run_async.py [duración_ms]
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'host'))
+import hostenv
+
+hostenv.install()
+
+import async_main  # noqa: E402
+
+async_main.Menu.PERSIST_STATE = False  # Sin leer ni escribir el log de estado de la mascota
+
+
+def main(duration_ms=3000):
+    pet = asyncio.run(async_main.main(duration_ms=int(duration_ms)))
+    print(f"display.update: {pet.display.update_count}, animación: {pet.current_animation}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])